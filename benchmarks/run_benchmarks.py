@@ -0,0 +1,254 @@
+"""Pipeline benchmarks on synthetic lockfiles.
+
+Each size gets a deterministic lockfile from synthetic_lockfile.py, written to
+a temporary file so parsing is measured from disk like a real upload. Every
+pipeline stage is timed on its own (median of --repeat runs) and then run once
+more under tracemalloc to record its peak allocation. Results are written as
+JSON, tagged with the current git commit, so two runs can be compared:
+
+    python benchmarks/run_benchmarks.py                      # 800 / 1k / 5k / 50k
+    python benchmarks/run_benchmarks.py --sizes 1000 --repeat 5
+    python benchmarks/run_benchmarks.py --compare reports/benchmarks/bench-abc1234.json
+
+Cold start of the ``depblast`` CLI (``--help`` and a scan of the small test
+lockfile, each in a fresh interpreter) is recorded as well, since CI runs it
+in short-lived containers.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "ingestion" / "npm"))
+sys.path.insert(0, str(ROOT_DIR / "webapp"))
+
+from synthetic_lockfile import DEFAULT_SEED, generate_lockfile  # noqa: E402
+from graph_layout import FORCE_LAYOUT_MAX_NODES  # noqa: E402
+from extract_dependencies import (  # noqa: E402
+    extract_dependencies,
+    analyze_dependency_map,
+    compute_fanout,
+    compute_blast_radii,
+    detect_chokepoints,
+    compute_dominators,
+    compute_risk_scores,
+    compute_structural_health,
+)
+
+DEFAULT_SIZES = (FORCE_LAYOUT_MAX_NODES, 1000, 5000, 50000)  # the first still gets the force layout
+DEFAULT_REPEAT = 3
+RESULTS_DIR = ROOT_DIR / "reports" / "benchmarks"
+REGRESSION_THRESHOLD = 1.20  # flag stages that got more than 20% slower
+MIN_COMPARED_SECONDS = 0.05  # faster stages are too noisy to flag
+COLD_START_RUNS = 5          # fresh-interpreter runs per cold-start command (median reported)
+COLD_START_LOCKFILE = ROOT_DIR / "test" / "package-lock.json"
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+def _render_stage():
+    """build_dependency_graph, or None when the web app's dependencies are missing."""
+    try:
+        from app import build_dependency_graph
+    except ImportError:
+        return None
+    from graph_core import DependencyGraph
+
+    def render(deps, workdir):
+        build_dependency_graph(DependencyGraph.from_dependency_map(deps), Path(workdir) / "graph.json")
+    return render
+
+
+def _stages(lockfile_path: Path, workdir: str) -> list:
+    """(name, fn(state)) pairs in pipeline order; fn may read and set keys of state."""
+    stages = [
+        ("extract_dependencies", lambda state: state.update(deps=extract_dependencies(lockfile=lockfile_path))),
+        ("compute_fanout", lambda state: compute_fanout(state["deps"])),
+        ("compute_blast_radii", lambda state: compute_blast_radii(state["deps"])),
+        ("detect_chokepoints", lambda state: detect_chokepoints(state["deps"])),
+        ("compute_dominators", lambda state: compute_dominators(state["deps"])),
+        ("compute_risk_scores", lambda state: compute_risk_scores(state["deps"])),
+        ("analyze_dependency_map", lambda state: analyze_dependency_map(state["deps"])),
+        ("compute_structural_health", lambda state: compute_structural_health(state["deps"])),
+    ]
+    render = _render_stage()
+    if render is not None:
+        stages.append(("build_dependency_graph", lambda state: render(state["deps"], workdir)))
+    return stages
+
+
+def _measure(fn, state: dict, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(state)
+        runs.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": round(statistics.median(runs), 6),
+        "runs": [round(run, 6) for run in runs],
+        "peak_bytes": peak,
+    }
+
+
+def benchmark_size(packages: int, repeat: int, seed: int, skip=()) -> dict:
+    lock_data = generate_lockfile(packages, seed=seed)
+    with tempfile.TemporaryDirectory(prefix="depblast-bench-") as workdir:
+        lockfile_path = Path(workdir) / "package-lock.json"
+        with open(lockfile_path, "w", encoding="utf-8") as f:
+            json.dump(lock_data, f)
+        del lock_data
+
+        state: dict = {}
+        stages = {}
+        for name, fn in _stages(lockfile_path, workdir):
+            if name in skip:
+                continue
+            print(f"  {name:<28}", end="", flush=True)
+            stages[name] = _measure(fn, state, repeat)
+            print(f"{stages[name]['seconds']:>9.3f}s  peak {stages[name]['peak_bytes'] / 2**20:8.1f} MiB")
+
+        deps = state["deps"]
+        return {
+            "packages": packages,
+            "nodes": len(deps),
+            "edges": sum(len(meta["dependencies"]) for meta in deps.values()),
+            "lockfile_bytes": lockfile_path.stat().st_size,
+            "stages": stages,
+        }
+
+
+def benchmark_cold_start(runs: int = COLD_START_RUNS) -> dict:
+    """Median wall time of depblast commands, each in a new Python process."""
+    commands = {
+        "help": ["--help"],
+        "scan": ["scan", str(COLD_START_LOCKFILE), "--output", ""],
+    }
+    results = {}
+    for name, args in commands.items():
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(ROOT_DIR / "depblast"), *args], cwd=ROOT_DIR,
+                           capture_output=True, check=True)
+            timings.append(time.perf_counter() - start)
+        results[name] = {"seconds": statistics.median(timings)}
+        print(f"  depblast {name:<19}{results[name]['seconds']:>9.3f}s")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def compare(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """Stages slower than threshold × baseline, as (packages, stage, old, new) tuples."""
+    previous = {result["packages"]: result["stages"] for result in baseline["results"]}
+    regressions = []
+    print(f"\nCompared with {baseline['meta']['commit']}:")
+    for result in current["results"]:
+        old_stages = previous.get(result["packages"])
+        if old_stages is None:
+            continue
+        for name, stage in result["stages"].items():
+            old = old_stages.get(name)
+            if old is None or not old["seconds"]:
+                continue
+            ratio = stage["seconds"] / old["seconds"]
+            regressed = ratio > threshold and max(old["seconds"], stage["seconds"]) >= MIN_COMPARED_SECONDS
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {result['packages']:>7} {name:<28}{old['seconds']:>9.3f}s → "
+                  f"{stage['seconds']:>8.3f}s  ×{ratio:.2f}{flag}")
+            if regressed:
+                regressions.append((result["packages"], name, old["seconds"], stage["seconds"]))
+
+    for name, entry in current.get("cold_start", {}).items():
+        old = baseline.get("cold_start", {}).get(name)
+        if old is None:
+            continue
+        ratio = entry["seconds"] / old["seconds"]
+        regressed = ratio > threshold and max(old["seconds"], entry["seconds"]) >= MIN_COMPARED_SECONDS
+        print(f"  {'cold':>7} {'depblast ' + name:<28}{old['seconds']:>9.3f}s → "
+              f"{entry['seconds']:>8.3f}s  ×{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(("cold", name, old["seconds"], entry["seconds"]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the DepBlast pipeline on synthetic lockfiles.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("-o", "--output", help=f"results file (default: {RESULTS_DIR.relative_to(ROOT_DIR)}/bench-<commit>.json)")
+    parser.add_argument("--skip", nargs="+", default=[], metavar="STAGE",
+                        help="stages to leave out, e.g. build_dependency_graph or cold_start")
+    parser.add_argument("--compare", help="earlier results file; exit 1 if any stage regressed")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    results = []
+    for packages in args.sizes:
+        print(f"[bench] {packages} packages")
+        results.append(benchmark_size(packages, max(1, args.repeat), args.seed, set(args.skip)))
+    cold_start = {}
+    if "cold_start" not in args.skip:
+        print("[bench] cold start")
+        cold_start = benchmark_cold_start()
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+        "cold_start": cold_start,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults → {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
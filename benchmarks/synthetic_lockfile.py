@@ -0,0 +1,173 @@
+"""Deterministic synthetic package-lock.json (v3) generator for benchmarks.
+
+Graphs are layered by depth: the root depends on the level-1 packages, every
+deeper package gets one parent from the level above (so the whole lockfile is
+reachable) plus extra parents drawn with Zipf-skewed popularity, which gives
+the long-tailed fan-in real npm trees have. A share of edges pin an older
+major version installed under the parent's nested node_modules, and a share
+point back up the tree to create cycles. The same arguments and seed always
+produce the same lockfile.
+
+    python benchmarks/synthetic_lockfile.py 5000 -o /tmp/package-lock.json
+"""
+
+import argparse
+import bisect
+import json
+import random
+import sys
+from collections import deque
+
+DEFAULT_SEED = 1337
+
+
+def generate_lockfile(packages: int = 1000, max_depth: int = 8, avg_children: float = 3.0,
+                      fanin_skew: float = 1.1, nested_ratio: float = 0.05,
+                      cycle_ratio: float = 0.01, dev_ratio: float = 0.25,
+                      scoped_ratio: float = 0.2, seed: int = DEFAULT_SEED) -> dict:
+    """Return lock data with about `packages` installed entries.
+
+    fanin_skew is the Zipf exponent of package popularity (0 = uniform fan-in);
+    nested_ratio is the share of edges resolved to a nested node_modules copy;
+    cycle_ratio is the share of packages given a dependency back up the tree.
+    """
+    rnd = random.Random(seed)
+    nested_budget = int(packages * nested_ratio)
+    hoisted = max(1, packages - nested_budget)
+
+    names = [
+        f"@scope-{i % 50}/pkg-{i}" if rnd.random() < scoped_ratio else f"pkg-{i}"
+        for i in range(hoisted)
+    ]
+
+    # Level 1 holds the direct dependencies; the rest spread evenly below it
+    direct = min(hoisted, max(5, hoisted // 50))
+    levels = [1] * direct
+    deeper = hoisted - direct
+    for i in range(deeper):
+        levels.append(2 + i * max(1, max_depth - 1) // max(1, deeper))
+    level_start = {}
+    for i, level in enumerate(levels):
+        level_start.setdefault(level, i)
+
+    # Zipf popularity over a random permutation, so fan-in is independent of depth
+    ranks = list(range(hoisted))
+    rnd.shuffle(ranks)
+    cumulative = []
+    total = 0.0
+    for i in range(hoisted):
+        total += 1.0 / (ranks[i] + 1) ** fanin_skew
+        cumulative.append(total)
+
+    def popular_from(lo: int) -> int:
+        low = cumulative[lo - 1] if lo else 0.0
+        return min(hoisted - 1, bisect.bisect_left(cumulative, rnd.uniform(low, cumulative[-1])))
+
+    children = [dict() for _ in range(hoisted)]  # child index → version range
+    first_parent = [None] * hoisted
+    for i in range(direct, hoisted):
+        parent = rnd.randrange(level_start[levels[i] - 1], level_start[levels[i]])
+        children[parent][i] = "^1.0.0"
+        first_parent[i] = parent
+
+    extra_edges = int(hoisted * max(0.0, avg_children - 1.0))
+    for _ in range(extra_edges):
+        parent = rnd.randrange(hoisted)
+        nxt = level_start.get(levels[parent] + 1)
+        if nxt is None:
+            continue
+        child = popular_from(nxt)
+        if child != parent:
+            children[parent][child] = "^1.0.0"
+
+    # A dependency on one of its own ancestors closes a cycle
+    for _ in range(int(hoisted * cycle_ratio)):
+        child = rnd.randrange(direct, hoisted)
+        ancestor = child
+        for _ in range(rnd.randint(1, levels[child] - 1)):
+            if first_parent[ancestor] is None:
+                break
+            ancestor = first_parent[ancestor]
+        if ancestor != child:
+            children[child][ancestor] = "^1.0.0"
+
+    # Dev flags: packages reachable only through devDependencies of the root
+    dev_roots = set(rnd.sample(range(direct), int(direct * dev_ratio)))
+    prod = set()
+    queue = deque(i for i in range(direct) if i not in dev_roots)
+    prod.update(queue)
+    while queue:
+        for child in children[queue.popleft()]:
+            if child not in prod:
+                prod.add(child)
+                queue.append(child)
+
+    lock_packages = {
+        "": {
+            "name": "synthetic-project",
+            "version": "1.0.0",
+            "dependencies": {names[i]: "^1.0.0" for i in range(direct) if i not in dev_roots},
+            "devDependencies": {names[i]: "^1.0.0" for i in sorted(dev_roots)},
+        }
+    }
+    for i in range(hoisted):
+        entry = {"version": "1.0.0", "resolved": f"https://registry.npmjs.org/{names[i]}/-/x-1.0.0.tgz"}
+        if children[i]:
+            entry["dependencies"] = {names[c]: spec for c, spec in children[i].items()}
+        if i not in prod:
+            entry["dev"] = True
+        lock_packages[f"node_modules/{names[i]}"] = entry
+
+    # Older majors nested under a parent that pins them
+    parents = [i for i in range(hoisted) if children[i]]
+    for _ in range(nested_budget if parents else 0):
+        parent = rnd.choice(parents)
+        child = rnd.choice(list(children[parent]))
+        key = f"node_modules/{names[parent]}/node_modules/{names[child]}"
+        if key in lock_packages:
+            continue
+        children[parent][child] = "^0.9.0"
+        lock_packages[f"node_modules/{names[parent]}"]["dependencies"][names[child]] = "^0.9.0"
+        nested = {"version": "0.9.0"}
+        grandchildren = {names[c]: "^1.0.0" for c in children[child]}
+        if grandchildren:
+            nested["dependencies"] = grandchildren
+        if parent not in prod:
+            nested["dev"] = True
+        lock_packages[key] = nested
+
+    return {
+        "name": "synthetic-project",
+        "version": "1.0.0",
+        "lockfileVersion": 3,
+        "requires": True,
+        "packages": lock_packages,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("packages", type=int, nargs="?", default=1000)
+    parser.add_argument("-o", "--output", help="write here instead of stdout")
+    parser.add_argument("--max-depth", type=int, default=8)
+    parser.add_argument("--avg-children", type=float, default=3.0)
+    parser.add_argument("--fanin-skew", type=float, default=1.1)
+    parser.add_argument("--nested-ratio", type=float, default=0.05)
+    parser.add_argument("--cycle-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    lock_data = generate_lockfile(
+        args.packages, max_depth=args.max_depth, avg_children=args.avg_children,
+        fanin_skew=args.fanin_skew, nested_ratio=args.nested_ratio,
+        cycle_ratio=args.cycle_ratio, seed=args.seed,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(lock_data, f, indent=2)
+    else:
+        json.dump(lock_data, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""End-to-end timing of one /analyze upload against a running web app.
+
+    python benchmarks/upload_timing.py                     # test/package-lock.json
+    python benchmarks/upload_timing.py path/to/yarn.lock   # any supported lockfile
+    python benchmarks/upload_timing.py --synthetic 20000   # see synthetic_lockfile.py
+
+Per-stage pipeline timings live in run_benchmarks.py; this script
+measures the whole request including upload, queueing and rendering.
+"""
+
+import io
+import json
+import os
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SERVER = os.environ.get('DEPBLAST_URL', 'http://127.0.0.1:5000')
+sys.path.insert(0, str(ROOT_DIR / 'ingestion' / 'npm'))
+
+from lockfile_formats import load_any_lockfile
+
+if '--synthetic' in sys.argv:
+    from synthetic_lockfile import generate_lockfile
+
+    size = int(sys.argv[sys.argv.index('--synthetic') + 1])
+    data = json.dumps(generate_lockfile(size)).encode('utf-8')
+    filename = 'package-lock.json'
+else:
+    lock_path = Path(sys.argv[1]) if len(sys.argv) > 1 else ROOT_DIR / 'test' / 'package-lock.json'
+    if not lock_path.exists():
+        print('ERROR: File not found at', lock_path)
+        sys.exit(1)
+    data = lock_path.read_bytes()
+    filename = lock_path.name
+
+pkg_count = len(load_any_lockfile(io.BytesIO(data)).get('packages', {}))
+print(f'Package count in lockfile: {pkg_count}')
+print(f'File size: {len(data)/1024:.0f} KB')
+
+boundary = b'----DepBlastBoundary'
+body = (
+    b'--' + boundary + b'\r\n' +
+    b'Content-Disposition: form-data; name="enrich"\r\n\r\nfalse\r\n' +
+    b'--' + boundary + b'\r\n' +
+    b'Content-Disposition: form-data; name="file"; filename="' + filename.encode('utf-8') + b'"\r\n' +
+    b'Content-Type: application/octet-stream\r\n\r\n' + data + b'\r\n' +
+    b'--' + boundary + b'--\r\n'
+)
+
+req = urllib.request.Request(
+    SERVER + '/analyze',
+    data=body,
+    method='POST',
+    headers={'Content-Type': 'multipart/form-data; boundary=----DepBlastBoundary'}
+)
+
+print('Sending request...')
+t0 = time.time()
+try:
+    with urllib.request.urlopen(req, timeout=120) as resp:
+        queued = json.loads(resp.read())
+    if 'error' in queued:
+        raise RuntimeError(queued['error'])
+
+    # /analyze returns a job; poll it until the pipeline finishes
+    status_url = SERVER + queued['status_url']
+    while True:
+        with urllib.request.urlopen(status_url, timeout=30) as resp:
+            job = json.loads(resp.read())
+        if job['state'] in ('done', 'failed'):
+            break
+        time.sleep(0.5)
+
+    elapsed = time.time() - t0
+    if job['state'] == 'failed':
+        print(f'ERROR from server ({elapsed:.1f}s): {job["error"]}')
+    else:
+        result = job['result']
+        h = result.get('health', {})
+        print(f'SUCCESS in {elapsed:.1f}s')
+        print(f'  Total deps:   {h.get("total")}')
+        print(f'  Direct:       {h.get("direct")}')
+        print(f'  Chokepoints:  {h.get("chokepoint_count")}')
+        print(f'  Max depth:    {h.get("max_depth")}')
+        dist = h.get('risk_distribution', {})
+        print(f'  Risk dist:    critical={dist.get("critical")} high={dist.get("high")} medium={dist.get("medium")} low={dist.get("low")}')
+        print(f'  Enrich auto-disabled: {result.get("enrich_auto_disabled")}')
+except Exception as e:
+    elapsed = time.time() - t0
+    print(f'FAILED after {elapsed:.1f}s: {e}')
@@ -0,0 +1,114 @@
+"""Attack paths: how a compromised package reaches the project.
+
+A compromise travels upward, from a package to every package that depends
+on it, until it reaches a direct dependency and through it the project. One
+breadth-first walk up the reverse-dependency graph from the compromised
+package gives parent pointers to every impacted package. The shortest chain
+to any of them is then a walk back along those pointers. The k shortest
+chains use Yen's algorithm, with the same walk as the inner shortest-path
+search.
+
+Paths are lists of package IDs, starting at the compromised package and
+ending at the entry point (a direct dependency).
+"""
+
+import heapq
+from collections import deque
+
+
+def upward_tree(reverse_map: dict, target: str) -> dict:
+    """BFS parent pointers up from target: {package: the package it was reached
+    from}, with target → None. Keys are in order of distance from target."""
+    tree = {target: None}
+    queue = deque([target])
+    while queue:
+        node = queue.popleft()
+        for parent in reverse_map.get(node, ()):
+            if parent not in tree:
+                tree[parent] = node
+                queue.append(parent)
+    return tree
+
+
+def tree_path(tree: dict, node: str) -> list:
+    """Shortest path from the tree's target up to node, or [] if node is not impacted."""
+    if node not in tree:
+        return []
+    path = []
+    while node is not None:
+        path.append(node)
+        node = tree[node]
+    path.reverse()
+    return path
+
+
+def chain_nodes(dependency_map: dict, tree: dict, entry: str) -> set:
+    """Packages on some chain from the tree's target up to entry: entry's own
+    dependencies, transitively, among the packages the target impacts."""
+    nodes = {entry}
+    stack = [entry]
+    while stack:
+        for child in dependency_map[stack.pop()]["dependencies"]:
+            if child in tree and child not in nodes:
+                nodes.add(child)
+                stack.append(child)
+    return nodes
+
+
+def _shortest_path(reverse_map: dict, source: str, goals, blocked_nodes=(), blocked_edges=(),
+                   allowed=None):
+    """BFS from source up to the nearest goal, avoiding blocked nodes and edges
+    and, if allowed is given, staying inside it."""
+    if source in goals:
+        return [source]
+    previous = {source: None}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for parent in reverse_map.get(node, ()):
+            if parent in previous or parent in blocked_nodes or (node, parent) in blocked_edges:
+                continue
+            if allowed is not None and parent not in allowed:
+                continue
+            previous[parent] = node
+            if parent in goals:
+                path = [parent]
+                while previous[path[-1]] is not None:
+                    path.append(previous[path[-1]])
+                path.reverse()
+                return path
+            queue.append(parent)
+    return None
+
+
+def k_shortest_paths(reverse_map: dict, source: str, goals, k: int, first: list = None,
+                     allowed=None) -> list:
+    """Up to k loopless shortest paths from source to any of goals (Yen's
+    algorithm), shortest first. first, if given, is a known shortest path;
+    allowed (e.g. chain_nodes) bounds every search."""
+    first = first or _shortest_path(reverse_map, source, goals, allowed=allowed)
+    if not first or k < 1:
+        return []
+    paths = [first]
+    seen = {tuple(first)}
+    candidates: list = []
+    counter = 0
+    while len(paths) < k:
+        last = paths[-1]
+        for i in range(len(last) - 1):
+            root = last[:i + 1]
+            blocked_edges = {(path[i], path[i + 1]) for path in paths
+                             if len(path) > i + 1 and path[:i + 1] == root}
+            spur = _shortest_path(reverse_map, last[i], goals, set(root[:-1]), blocked_edges, allowed)
+            if spur is None:
+                continue
+            candidate = root[:-1] + spur
+            key = tuple(candidate)
+            if key not in seen:
+                seen.add(key)
+                counter += 1
+                heapq.heappush(candidates, (len(candidate), counter, candidate))
+        if not candidates:
+            break
+        paths.append(heapq.heappop(candidates)[2])
+    return paths
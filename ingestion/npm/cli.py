@@ -0,0 +1,438 @@
+"""``depblast`` command line.
+
+    depblast scan [LOCKFILE] [--enrich] [-o reports/dependency_analysis.json] [--snapshot FILE]
+    depblast simulate TARGET... [--analysis FILE] [--where EXPR] [--json]
+    depblast paths TARGET [-k 3] [--entry DIRECT_DEP] [--analysis FILE] [--json]
+    depblast export SOURCE OUTPUT [--format json|snapshot]
+    depblast portfolio DIR [--impact PACKAGE] [--enrich] [-o FILE]
+    depblast serve [--host 127.0.0.1] [--port 5000]
+
+Only argparse is imported up front. Each subcommand imports what it needs
+when it runs (NumPy for analysis, Flask for serve, the registry client only
+with --enrich), so ``--help`` and short CI scans pay no extra startup cost.
+
+``python extract_dependencies.py ARGS`` and ``python portfolio.py ARGS`` run
+``depblast scan ARGS`` and ``depblast portfolio ARGS``; this module is the
+only place their flags are defined.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_EXPORT = "reports/dependency_analysis.json"
+PROFILE_OUTPUT = "reports/profile.pstats"  # cProfile dump written by scan --profile
+PROFILE_TOP = 25                           # functions listed by scan --profile
+
+
+def _load_analysis(path):
+    """Dependency map from a JSON export or a binary snapshot."""
+    from snapshot import SNAPSHOT_SUFFIX, load_snapshot
+
+    if Path(path).suffix == SNAPSHOT_SUFFIX:
+        return load_snapshot(path)[0]
+    import json
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _open_index(path) -> tuple:
+    """(dependency map, GraphIndex) of a JSON export or a binary snapshot. A
+    snapshot stays mapped: the map is its graph's read-through view, so a
+    query only decodes the packages it touches."""
+    from graph_index import GraphIndex
+    from snapshot import SNAPSHOT_SUFFIX, open_snapshot
+
+    if Path(path).suffix == SNAPSHOT_SUFFIX:
+        graph, _ = open_snapshot(path)
+        return graph.view(), GraphIndex.from_graph(graph)
+    deps = _load_analysis(path)
+    return deps, GraphIndex(deps)
+
+
+def _write_analysis(deps: dict, path, fmt: str = None, meta: dict = None) -> None:
+    from snapshot import SNAPSHOT_SUFFIX, write_snapshot
+
+    if fmt is None:
+        fmt = "snapshot" if Path(path).suffix == SNAPSHOT_SUFFIX else "json"
+    if fmt == "snapshot":
+        write_snapshot(deps, path, meta=meta)
+    else:
+        from extract_dependencies import export_to_json
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        export_to_json(deps, path)
+
+
+def _print_json(data) -> None:
+    import json
+
+    json.dump(data, sys.stdout, indent=2)
+    print()
+
+
+def _print_profile(profiler, recorder) -> None:
+    """Per-stage timings and counters of recorder, then the top of profiler's stats."""
+    import pstats
+
+    report = recorder.report()
+    print("Pipeline stages:")
+    for name, entry in report["stages"].items():
+        peak = entry["peak_bytes"]
+        print(f"  {name:<8} wall {entry['wall_seconds']:8.3f}s  cpu {entry['cpu_seconds']:8.3f}s"
+              + (f"  peak {peak / 2**20:7.1f} MiB" if peak is not None else ""))
+    for name, value in report["counters"].items():
+        print(f"  {name}: {value}")
+    profiler.dump_stats(PROFILE_OUTPUT)
+    print(f"\ncProfile (top {PROFILE_TOP} by cumulative time, full stats → {PROFILE_OUTPUT}):")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+
+def _print_sensitivity(deps: dict, profiles: dict) -> None:
+    """Score deps under every profile and list the packages whose level moves."""
+    from graph_core import DependencyGraph
+    from risk_scoring import sensitivity_report
+
+    graph = DependencyGraph.from_dependency_map(deps)
+    names = list(profiles)
+    _, levels = graph.score_profiles([profiles[name] for name in names])
+    report = sensitivity_report(graph.ids, levels, names)
+    print(f"Risk sensitivity ({len(names)} profiles, {report['unstable_count']} packages change level):")
+    for name, counts in report["distribution"].items():
+        print(f"  {name:<20} " + "  ".join(f"{level}={count}" for level, count in counts.items()))
+    for item in report["unstable"][:10]:
+        print(f"  ~ {item['name']}: {item['lowest']} … {item['highest']}")
+
+
+def _simulate(deps: dict, index, targets: list, where: str = None, as_json: bool = False) -> int:
+    """Batch-simulate targets plus the packages matching where, and print the result."""
+    from graph_index import overlap_stats
+
+    targets = list(targets)
+    if where:
+        from package_filter import select_packages
+
+        try:
+            targets += select_packages(deps, where)
+        except ValueError as err:
+            print(f"error: invalid --where expression: {err}", file=sys.stderr)
+            return 2
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        print("error: give at least one target or --where", file=sys.stderr)
+        return 2
+    unknown = [target for target in targets if target not in deps]
+    if unknown:
+        print(f"error: packages not found in analysis: {', '.join(unknown[:10])}", file=sys.stderr)
+        return 1
+
+    per_target = index.simulate_batch(targets)
+    stats = overlap_stats(per_target)
+    if as_json:
+        _print_json({
+            "targets": {target: sorted(impacted) for target, impacted in per_target.items()},
+            "union_count": stats["union_count"],
+            "shared_count": stats["shared_count"],
+        })
+        return 0
+    for target, impacted in sorted(per_target.items(), key=lambda item: -len(item[1])):
+        print(f"☢ {target}: {len(impacted)} impacted")
+    if len(targets) > 1:
+        print(f"Union: {stats['union_count']} packages, {stats['shared_count']} reached by more than one target")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Subcommands
+# ---------------------------------------------------------------------------
+
+def cmd_scan(args) -> int:
+    from extract_dependencies import (
+        LOCK_FILE,
+        analyze_dependency_map,
+        compute_structural_health,
+        extract_dependencies,
+    )
+    from instrumentation import Recorder, stage
+    from lockfile_stream import LockfileFormatError
+
+    simulate = bool(args.targets or args.where)
+    if args.json and (simulate or args.sensitivity or args.profile):
+        print("error: --json cannot be combined with --targets, --where, --sensitivity or --profile",
+              file=sys.stderr)
+        return 2
+
+    profiles = profile = None
+    if args.risk_profile or args.sensitivity:
+        from risk_scoring import load_profiles
+
+        profiles = load_profiles()
+    if args.risk_profile:
+        if args.risk_profile not in profiles:
+            print(f"error: unknown risk profile {args.risk_profile!r}; available: {', '.join(profiles)}",
+                  file=sys.stderr)
+            return 2
+        profile = profiles[args.risk_profile]
+
+    # --profile: per-stage timings plus a cProfile dump of the whole pipeline
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        from instrumentation import enable_allocation_tracking
+
+        enable_allocation_tracking()
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    lockfile = args.lockfile or LOCK_FILE
+    delta = None
+    recorder = Recorder()
+    try:
+        with recorder.activate():
+            if args.from_snapshot:
+                # Reopen a previous analysis instead of running the pipeline
+                with stage("load"):
+                    deps = _load_analysis(args.from_snapshot)
+            elif args.baseline:
+                from incremental import reanalyze
+
+                deps, delta = reanalyze(_load_analysis(args.baseline), lockfile, enrich_npm=args.enrich,
+                                        offline=args.offline, profile=profile)
+            else:
+                deps = extract_dependencies(enrich_npm=args.enrich, lockfile=lockfile, offline=args.offline)
+                analyze_dependency_map(deps, profile=profile)
+            with stage("health"):
+                health = compute_structural_health(deps)
+    except (OSError, LockfileFormatError) as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+    if args.output:
+        _write_analysis(deps, args.output)
+    if args.snapshot:
+        _write_analysis(deps, args.snapshot, fmt="snapshot", meta={"health": health})
+
+    if args.json:
+        _print_json({"health": health, "delta": delta["summary"] if delta else None})
+        return 0
+    if profiler is not None:
+        _print_profile(profiler, recorder)
+        print()
+    print(f"Scanned {args.from_snapshot or lockfile}: {health.get('total', 0)} packages")
+    for key, value in health.items():
+        if not isinstance(value, (dict, list)):
+            print(f"  {key}: {value}")
+    if health:
+        print("  risk: " + "  ".join(f"{level}={n}" for level, n in health["risk_distribution"].items()))
+    if delta is not None:
+        print(f"  recomputed: {delta['recomputed']} packages")
+        for change in delta["escalated"][:10]:
+            print(f"  ▲ {change['name']}: {change['from_level']} → {change['to_level']}")
+    if args.sensitivity:
+        print()
+        _print_sensitivity(deps, profiles)
+    if simulate:
+        from graph_index import GraphIndex
+
+        targets = []
+        if args.targets:
+            with open(args.targets, "r", encoding="utf-8") as f:
+                targets = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        print()
+        status = _simulate(deps, GraphIndex(deps), targets, args.where)
+        if status:
+            return status
+    for path in filter(None, (args.output, args.snapshot)):
+        print(f"Exported → {path}")
+    return 0
+
+
+def cmd_simulate(args) -> int:
+    deps, index = _open_index(args.analysis)
+    return _simulate(deps, index, args.targets, args.where, as_json=args.json)
+
+
+def cmd_paths(args) -> int:
+    from graph_index import MAX_PATHS
+
+    deps, index = _open_index(args.analysis)
+    for pkg_id in filter(None, (args.target, args.entry)):
+        if pkg_id not in deps:
+            print(f"error: package not found in analysis: {pkg_id}", file=sys.stderr)
+            return 1
+    if args.entry is not None and not deps[args.entry]["direct"]:
+        print(f"error: {args.entry} is not a direct dependency", file=sys.stderr)
+        return 2
+    if not 1 <= args.k <= MAX_PATHS:
+        print(f"error: -k must be between 1 and {MAX_PATHS}", file=sys.stderr)
+        return 2
+
+    result = index.attack_paths(args.target, args.k, args.entry)
+    if args.json:
+        _print_json(result)
+        return 0
+    if not result["to_root"]:
+        print(f"{args.target} reaches no direct dependency")
+        return 0
+    print(f"Shortest chains from {args.target} to the project:")
+    for path in result["to_root"]:
+        print(f"  {len(path)} hops: " + " → ".join(path + ["(project)"]))
+    if args.entry is None:
+        print(f"\nVia each of {len(result['entries'])} impacted direct dependencies:")
+        for entry, paths in result["entries"].items():
+            print(f"  {entry}")
+            for path in paths:
+                print("    " + " → ".join(path))
+    return 0
+
+
+def cmd_export(args) -> int:
+    from snapshot import SNAPSHOT_SUFFIX
+
+    deps = _load_analysis(args.source)
+    fmt = args.format or ("snapshot" if Path(args.output).suffix == SNAPSHOT_SUFFIX else "json")
+    meta = None
+    if fmt == "snapshot":
+        from extract_dependencies import compute_structural_health
+
+        meta = {"health": compute_structural_health(deps)}
+    _write_analysis(deps, args.output, fmt=fmt, meta=meta)
+    print(f"Exported → {args.output}")
+    return 0
+
+
+def cmd_portfolio(args) -> int:
+    import json
+
+    from portfolio import Portfolio
+
+    if not Path(args.root).is_dir():
+        print(f"error: {args.root} is not a directory", file=sys.stderr)
+        return 2
+
+    portfolio = Portfolio.load(args.root, workers=args.workers, enrich_npm=args.enrich,
+                               offline=args.offline)
+    summary = portfolio.summary()
+    print(f"Portfolio: {summary['projects']} projects, {summary['package_instances']} package instances, "
+          f"{summary['unique_packages']} unique (×{summary['dedup_ratio']} shared)")
+    for name, error in portfolio.errors.items():
+        print(f"  ✗ {name}: {error}")
+    print("\nMost shared packages:")
+    for item in summary["most_shared"][:10]:
+        print(f"  {item['package']:<50} {item['projects']} projects")
+
+    for target in args.impact:
+        result = portfolio.impact(target)
+        if not result["packages"]:
+            print(f"\n{target}: not found in any project")
+            continue
+        print(f"\nCompromise of {target}: {result['projects_hit']}/{result['projects_total']} projects, "
+              f"{result['impacted_total']} impacted packages")
+        for project, hit in result["projects"].items():
+            flags = (" direct" if hit["direct"] else "") + (" dev-only" if hit["dev_only"] else "")
+            print(f"  ☢ {project:<40} {hit['impacted_count']:>6} / {hit['project_size']} "
+                  f"[{', '.join(hit['versions'])}]{flags}")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(portfolio.to_json(), f, indent=2)
+        print(f"\nExported → {output}")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    sys.path.insert(0, str(ROOT_DIR / "webapp"))
+    from app import app
+
+    app.run(host=args.host, port=args.port, debug=args.debug)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="depblast", description="npm supply-chain blast-radius analysis.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="analyze a package-lock.json, yarn.lock or pnpm-lock.yaml")
+    scan.add_argument("lockfile", nargs="?", help="default: target_project/package-lock.json")
+    scan.add_argument("--enrich", action="store_true", help="fetch registry data (age, maintainers)")
+    scan.add_argument("--offline", action="store_true", help="enrich from the metadata cache only")
+    scan.add_argument("--risk-profile", metavar="NAME", help="profile from config/risk_profiles.json")
+    source = scan.add_mutually_exclusive_group()
+    source.add_argument("--baseline", metavar="FILE", help="earlier export or snapshot; recompute only what changed")
+    source.add_argument("--from-snapshot", metavar="FILE",
+                        help="reopen an earlier export or snapshot instead of running the pipeline")
+    scan.add_argument("-o", "--output", default=DEFAULT_EXPORT,
+                      help=f"analysis file, .json or .dbs (default: {DEFAULT_EXPORT}; '' to skip)")
+    scan.add_argument("--snapshot", metavar="FILE", help="also write a binary snapshot")
+    scan.add_argument("--sensitivity", action="store_true",
+                      help="also score under every risk profile and list packages whose level changes")
+    scan.add_argument("--targets", metavar="FILE", help="simulate the package IDs listed in FILE, one per line")
+    scan.add_argument("--where", metavar="EXPR", help='simulate the packages matching EXPR')
+    scan.add_argument("--profile", action="store_true",
+                      help=f"print per-stage timings and write a cProfile dump to {PROFILE_OUTPUT}")
+    scan.add_argument("--json", action="store_true", help="print the health summary as JSON")
+    scan.set_defaults(handler=cmd_scan)
+
+    simulate = commands.add_parser("simulate", help="compromise simulation on a saved analysis")
+    simulate.add_argument("targets", nargs="*", metavar="TARGET", help="package IDs (name@version)")
+    simulate.add_argument("--analysis", default=DEFAULT_EXPORT, help="JSON export or .dbs snapshot")
+    simulate.add_argument("--where", metavar="EXPR", help='select targets, e.g. "maintainer_count == 1"')
+    simulate.add_argument("--json", action="store_true", help="print impacted sets as JSON")
+    simulate.set_defaults(handler=cmd_simulate)
+
+    paths = commands.add_parser("paths", help="attack paths from a package up to the project")
+    paths.add_argument("target", help="compromised package ID (name@version)")
+    paths.add_argument("-k", type=int, default=1, help="chains per destination (default: 1)")
+    paths.add_argument("--entry", metavar="PACKAGE", help="only chains through this direct dependency")
+    paths.add_argument("--analysis", default=DEFAULT_EXPORT, help="JSON export or .dbs snapshot")
+    paths.add_argument("--json", action="store_true", help="print the chains as JSON")
+    paths.set_defaults(handler=cmd_paths)
+
+    export = commands.add_parser("export", help="convert between JSON exports and snapshots")
+    export.add_argument("source", help="JSON export or .dbs snapshot")
+    export.add_argument("output")
+    export.add_argument("--format", choices=("json", "snapshot"), help="default: from the output suffix")
+    export.set_defaults(handler=cmd_export)
+
+    portfolio = commands.add_parser("portfolio", help="analyze every lockfile under a directory")
+    portfolio.add_argument("root", help="directory searched recursively for npm, yarn and pnpm lockfiles")
+    portfolio.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    portfolio.add_argument("--enrich", action="store_true", help="fetch registry data once for the whole portfolio")
+    portfolio.add_argument("--offline", action="store_true", help="enrich from the metadata cache only")
+    portfolio.add_argument("--impact", action="append", default=[], metavar="PACKAGE",
+                           help="name or name@version to simulate across every project (repeatable)")
+    portfolio.add_argument("-o", "--output", help="write the summary, per-project health and package index as JSON")
+    portfolio.set_defaults(handler=cmd_portfolio)
+
+    serve = commands.add_parser("serve", help="run the web app")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=5000)
+    serve.add_argument("--debug", action="store_true")
+    serve.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as err:
+        # Unreadable or malformed analysis files, including SnapshotError
+        print(f"error: {err}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,189 +1,162 @@
 import sys
 import json
-import urllib.request
-import urllib.parse
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from lockfile_formats import load_any_lockfile, walk_any_lockfile
+from reachability import transitive_dependent_counts
+from dominators import dominator_tree
+from graph_core import DependencyGraph
+from instrumentation import count, stage
+from risk_scoring import RISK_LEVELS, score_risk
 
 LOCK_FILE = Path("target_project/package-lock.json")
 NPM_REGISTRY = "https://registry.npmjs.org"
 REQUEST_TIMEOUT = 4   # seconds per package lookup
-NPM_WORKERS    = 20   # concurrent threads for registry fetching
-BLAST_RADIUS_LIMIT = 150  # only pre-compute blast radius for top-N packages by fan-in
+NPM_WORKERS    = 20   # concurrent registry requests (pooled keep-alive connections)
+NPM_OFFLINE    = False  # serve enrichment from the metadata cache only
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _fetch_npm_metadata(package_name: str) -> dict:
-    """Query the NPM registry for age / maintainer info.
-    Returns an empty dict on any failure so the caller can gracefully degrade.
-    Designed to be called concurrently from a thread pool."""
+def _days_since(iso_timestamp: str):
+    if not iso_timestamp:
+        return None
+    from datetime import datetime, timezone
     try:
-        safe_name = urllib.parse.quote(package_name, safe="@%")
-        url = f"{NPM_REGISTRY}/{safe_name}"
-        req = urllib.request.Request(url, headers={"Accept": "application/json"})
-        with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-
-        time_block = data.get("time", {})
-        modified_str = time_block.get("modified", "")
-        created_str = time_block.get("created", "")
-
-        days_since_publish = None
-        package_age_days = None
-
-        if modified_str:
-            from datetime import datetime, timezone
-            try:
-                modified_dt = datetime.fromisoformat(modified_str.replace("Z", "+00:00"))
-                days_since_publish = (datetime.now(timezone.utc) - modified_dt).days
-            except Exception:
-                pass
-
-        if created_str:
-            from datetime import datetime, timezone
-            try:
-                created_dt = datetime.fromisoformat(created_str.replace("Z", "+00:00"))
-                package_age_days = (datetime.now(timezone.utc) - created_dt).days
-            except Exception:
-                pass
-
-        maintainers = data.get("maintainers", [])
-        maintainer_count = len(maintainers) if maintainers else 1
-
-        latest_version = data.get("dist-tags", {}).get("latest", "")
-        downloads_hint = len(data.get("versions", {}))  # proxy for popularity
-
-        return {
-            "days_since_publish": days_since_publish,
-            "package_age_days": package_age_days,
-            "maintainer_count": maintainer_count,
-            "latest_version": latest_version,
-            "version_count": downloads_hint,
-        }
-
+        then = datetime.fromisoformat(iso_timestamp.replace("Z", "+00:00"))
+        return (datetime.now(timezone.utc) - then).days
     except Exception:
+        return None
+
+
+def _metadata_from_summary(summary: dict) -> dict:
+    if not summary:
         return {}
+    return {
+        "days_since_publish": _days_since(summary.get("modified")),
+        "package_age_days": _days_since(summary.get("created")),
+        "maintainer_count": summary.get("maintainer_count"),
+        "latest_version": summary.get("latest_version"),
+        "version_count": summary.get("version_count"),
+    }
 
 
 # ---------------------------------------------------------------------------
 # Core dependency extraction
 # ---------------------------------------------------------------------------
 
-def extract_dependencies(enrich_npm: bool = False) -> dict:
-    """Parse package-lock.json v3 and return a rich dependency map.
+def extract_dependencies(enrich_npm: bool = False, lockfile=None,
+                         offline: bool = NPM_OFFLINE, on_progress=None) -> dict:
+    """Parse a lockfile and return a rich dependency map.
+
+    package-lock.json v2/v3, yarn.lock (classic and berry) and pnpm-lock.yaml
+    are recognized from their contents.
 
     Parameters
     ----------
     enrich_npm : bool
         When True, query the NPM registry for each unique package name to
         enrich the risk model with age & maintainer data.
+    lockfile : path, file-like object or dict, optional
+        Where to read the lockfile from. Paths and file objects are streamed
+        entry by entry; a dict is taken as already-parsed lock data (from
+        lockfile_formats.load_any_lockfile).
+        Defaults to LOCK_FILE.
+    offline : bool
+        Enrich from the on-disk metadata cache only, without network calls.
+    on_progress : callable, optional
+        Called as on_progress(completed, total) while registry data is fetched.
     """
-    with open(LOCK_FILE, "r", encoding="utf-8") as f:
-        lock_data = json.load(f)
-
-    packages = lock_data.get("packages", {})
-    root_pkg = packages.get("", {})
-    root_dev_deps = set(root_pkg.get("devDependencies", {}).keys())
-    root_prod_deps = set(root_pkg.get("dependencies", {}).keys())
-
-    visited: set = set()
-    dependency_map: dict = {}
+    if isinstance(lockfile, dict):
+        lock_data = lockfile
+    else:
+        with stage("parse"):
+            lock_data = load_any_lockfile(LOCK_FILE if lockfile is None else lockfile)
 
-    def walk(package_key: str, depth: int, parent_id=None, inherited_is_dev: bool = False):
-        if package_key not in packages:
-            return
-
-        pkg = packages[package_key]
-
-        if package_key != "":
-            name = package_key.replace("node_modules/", "")
-            # Handle nested node_modules paths like node_modules/a/node_modules/b
-            if "/" in name and not name.startswith("@"):
-                name = name.split("/")[-1]
-            elif name.startswith("@"):
-                parts = name.split("/")
-                if len(parts) > 2:
-                    name = "/".join(parts[-2:])
-
-            version = pkg.get("version", "unknown")
-            pkg_id = f"{name}@{version}"
-
-            # Determine if this is a dev dependency
-            is_dev = pkg.get("dev", False) or inherited_is_dev
-            # Override: if root marks it as dev explicitly
-            top_name = package_key.split("node_modules/")[-1].split("/")[0]
-            if top_name in root_dev_deps:
-                is_dev = True
-            elif top_name in root_prod_deps:
-                is_dev = False
-
-            if pkg_id not in dependency_map:
-                dependency_map[pkg_id] = {
-                    "name": name,
-                    "version": version,
-                    "depth": depth,
-                    "direct": depth == 1,
-                    "is_dev": is_dev,
-                    "dependencies": [],
-                    "fanout": 0,          # will be computed later (reverse-dep count)
-                    "blast_radius": 0,    # will be computed later
-                    "is_chokepoint": False,
-                    # NPM enrichment placeholders
-                    "days_since_publish": None,
-                    "package_age_days": None,
-                    "maintainer_count": None,
-                    "latest_version": None,
-                    "version_count": None,
-                    "risk_score": 0.0,
-                    "risk_level": "unknown",
-                }
-
-            if parent_id:
-                if pkg_id not in dependency_map[parent_id]["dependencies"]:
-                    dependency_map[parent_id]["dependencies"].append(pkg_id)
-
-            if pkg_id in visited:
-                return
-            visited.add(pkg_id)
-
-        child_dev_flag = pkg.get("dev", False) or inherited_is_dev
-        for dep_name, _dep_version in pkg.get("dependencies", {}).items():
-            dep_key = f"node_modules/{dep_name}"
-            current_id = None if package_key == "" else pkg_id
-            walk(dep_key, depth + 1, current_id, child_dev_flag)
-
-    walk("", 0)
+    with stage("walk"):
+        dependency_map = build_dependency_map(walk_any_lockfile(lock_data))
+    count("packages", len(dependency_map))
 
     # NPM Enrichment (optional — network calls)
     if enrich_npm:
-        _enrich_with_npm_data(dependency_map)
+        with stage("enrich"):
+            _enrich_with_npm_data(dependency_map, offline=offline, on_progress=on_progress)
 
     return dependency_map
 
 
-def _enrich_with_npm_data(dependency_map: dict) -> None:
-    """Mutates dependency_map in-place, concurrently fetching NPM registry data."""
+def new_package_entry(name: str, version: str, depth: int, is_dev: bool) -> dict:
+    """Blank dependency-map record; metrics and NPM fields are filled in later."""
+    return {
+        "name": name,
+        "version": version,
+        "depth": depth,
+        "direct": depth == 1,
+        "is_dev": is_dev,
+        "dependencies": [],
+        "fanout": 0,          # will be computed later (reverse-dep count)
+        "blast_radius": 0,    # will be computed later
+        "is_chokepoint": False,
+        "dominator": None,    # immediate dominator; None = only the project itself
+        "dominated_count": 0, # packages reachable only through this one
+        # NPM enrichment placeholders
+        "days_since_publish": None,
+        "package_age_days": None,
+        "maintainer_count": None,
+        "latest_version": None,
+        "version_count": None,
+        "risk_score": 0.0,
+        "risk_level": "unknown",
+    }
+
+
+def build_dependency_map(graph_stream) -> dict:
+    """Assemble a dependency map from a normalized ("node", ...) / ("edge", ...) stream."""
+    dependency_map: dict = {}
+    for kind, first, second in graph_stream:
+        if kind == "node":
+            if first not in dependency_map:
+                dependency_map[first] = new_package_entry(
+                    second["name"], second["version"], second["depth"], second["is_dev"]
+                )
+        else:
+            dependency_map[first]["dependencies"].append(second)
+    return dependency_map
+
+
+def _enrich_with_npm_data(dependency_map: dict, cache=None, offline: bool = False,
+                          on_progress=None) -> None:
+    """Mutates dependency_map in-place, concurrently fetching NPM registry data.
+    Lookups go through the persistent metadata cache (the default one at
+    data/npm_metadata.sqlite3 unless another is given)."""
+    # Imported here: the registry client pulls in asyncio/ssl, which only enrichment needs
+    from metadata_cache import get_default_cache
+    from registry_client import fetch_summaries
+
+    if cache is None:
+        cache = get_default_cache()
     unique_names = list({meta["name"] for meta in dependency_map.values()})
     total = len(unique_names)
-    print(f"[DepBlast] Fetching NPM metadata for {total} packages ({NPM_WORKERS} threads)…", flush=True)
-
-    npm_cache: dict = {}
-    completed = 0
-
-    with ThreadPoolExecutor(max_workers=NPM_WORKERS) as pool:
-        future_to_name = {pool.submit(_fetch_npm_metadata, name): name for name in unique_names}
-        for future in as_completed(future_to_name):
-            name = future_to_name[future]
-            try:
-                npm_cache[name] = future.result()
-            except Exception:
-                npm_cache[name] = {}
-            completed += 1
-            if completed % 50 == 0:
-                print(f"  … {completed}/{total} fetched", flush=True)
+    print(f"[DepBlast] Fetching NPM metadata for {total} packages ({NPM_WORKERS} concurrent)…", flush=True)
+
+    def report(completed, total):
+        if completed % 50 == 0:
+            print(f"  … {completed}/{total} fetched", flush=True)
+        if on_progress is not None:
+            on_progress(completed, total)
+
+    summaries = fetch_summaries(
+        unique_names,
+        registry=NPM_REGISTRY,
+        cache=cache,
+        offline=offline,
+        concurrency=NPM_WORKERS,
+        timeout=REQUEST_TIMEOUT,
+        on_progress=report,
+    )
+    npm_cache = {name: _metadata_from_summary(summary) for name, summary in summaries.items()}
 
     print(f"  … {total}/{total} fetched ✓", flush=True)
 
@@ -221,26 +194,16 @@ def build_reverse_dependencies(dependency_map: dict) -> dict:
 
 
 def compute_blast_radii(dependency_map: dict) -> None:
-    """Pre-compute blast radius for the most critical packages only.
+    """Compute the exact blast radius of every package.
 
-    Full O(n²) computation is too slow for large lockfiles (500+ packages).
-    We compute exact blast radius for the top BLAST_RADIUS_LIMIT packages
-    by fan-in score. All others get an estimated value based on depth + fan-in.
+    Cycles are condensed into strongly connected components and reverse
+    reachability is merged as bitsets in a single topological pass, so the
+    result equals running simulate_compromise on each package without the
+    O(n²) cost.
     """
-    reverse_map = build_reverse_dependencies(dependency_map)
-
-    # Sort by fan-in descending — high fan-in = most likely chokepoints
-    by_fanin = sorted(dependency_map.keys(), key=lambda k: dependency_map[k]["fanout"], reverse=True)
-    exact_set = set(by_fanin[:BLAST_RADIUS_LIMIT])
-
-    for pkg_id in dependency_map:
-        if pkg_id in exact_set:
-            affected = simulate_compromise(pkg_id, dependency_map, _reverse_map=reverse_map)
-            dependency_map[pkg_id]["blast_radius"] = len(affected)
-        else:
-            # Fast estimate: fanout + depth proxy (no BFS needed)
-            meta = dependency_map[pkg_id]
-            dependency_map[pkg_id]["blast_radius"] = meta["fanout"]
+    counts = transitive_dependent_counts(dependency_map)
+    for pkg_id, meta in dependency_map.items():
+        meta["blast_radius"] = counts[pkg_id]
 
 
 def detect_chokepoints(dependency_map: dict,
@@ -254,51 +217,75 @@ def detect_chokepoints(dependency_map: dict,
         )
 
 
+def compute_dominators(dependency_map: dict) -> None:
+    """Immediate dominator and dominated-subtree size of every package.
+
+    A package dominates everything that can only be reached from the project
+    through it, so dominated_count is how much of the tree disappears (or is
+    held hostage) if that one package does.
+    """
+    for pkg_id, (dominator, dominated) in dominator_tree(dependency_map).items():
+        meta = dependency_map[pkg_id]
+        meta["dominator"] = dominator
+        meta["dominated_count"] = dominated
+
+
 # ---------------------------------------------------------------------------
 # Risk scoring
 # ---------------------------------------------------------------------------
 
-def compute_risk_scores(dependency_map: dict) -> None:
+def compute_risk_scores(dependency_map: dict, profile: dict = None) -> None:
     """
-    Risk formula:
+    Risk formula (default profile weights; see risk_scoring.DEFAULT_PROFILE):
         Base   = (depth × 1.5) + (fan_in × 3.0) + (blast_radius × 0.5)
+                 + log2(1 + dominated_count) × 3.0
         Age    += (days_since_publish / 730) × 5.0   [stale = risky]
         Bus    += (1 / maintainer_count) × 10.0      [solo maintainer = risky]
         Scope  += 2.0 if package name is unscoped     [unscoped historically hijacked more]
         Multiplier = 2.0 if production dep, 1.0 if dev
+    Levels: critical ≥ 120, high ≥ 60, medium ≥ 25, otherwise low.
     """
-    for meta in dependency_map.values():
-        base = (meta["depth"] * 1.5) + (meta["fanout"] * 3.0) + (meta["blast_radius"] * 0.5)
+    metas = list(dependency_map.values())
+    raw_scores, levels = score_risk(
+        [meta["depth"] for meta in metas],
+        [meta["fanout"] for meta in metas],
+        [meta["blast_radius"] for meta in metas],
+        [meta.get("dominated_count", 0) for meta in metas],
+        [_nan_if_none(meta.get("days_since_publish")) for meta in metas],
+        [_nan_if_none(meta.get("maintainer_count")) for meta in metas],
+        [meta["name"].startswith("@") for meta in metas],
+        [meta["is_dev"] for meta in metas],
+        profile=profile,
+    )
+    for meta, raw_score, level in zip(metas, raw_scores.tolist(), levels.tolist()):
+        meta["risk_score"] = round(raw_score, 2)
+        meta["risk_level"] = RISK_LEVELS[level]
 
-        # Staleness risk
-        age_risk = 0.0
-        if meta.get("days_since_publish") is not None:
-            age_risk = (meta["days_since_publish"] / 730) * 5.0
 
-        # Bus-factor risk
-        bus_risk = 0.0
-        mc = meta.get("maintainer_count")
-        if mc and mc > 0:
-            bus_risk = (1 / mc) * 10.0
+def _nan_if_none(value):
+    return float("nan") if value is None else value
 
-        # Scope risk (unscoped packages more often typosquatted / hijacked)
-        scope_risk = 0.0 if meta["name"].startswith("@") else 2.0
 
-        # Prod vs dev multiplier
-        prod_mult = 1.0 if meta["is_dev"] else 2.0
+def analyze_dependency_map(dependency_map: dict, fanin_threshold: int = 5,
+                           depth_threshold: int = 2, profile: dict = None) -> DependencyGraph:
+    """Compute every graph metric on the columnar core and write them into the map.
 
-        raw_score = (base + age_risk + bus_risk + scope_risk) * prod_mult
-        meta["risk_score"] = round(raw_score, 2)
-
-        # Classify
-        if raw_score >= 120:
-            meta["risk_level"] = "critical"
-        elif raw_score >= 60:
-            meta["risk_level"] = "high"
-        elif raw_score >= 25:
-            meta["risk_level"] = "medium"
-        else:
-            meta["risk_level"] = "low"
+    Equivalent to compute_fanout, compute_blast_radii, detect_chokepoints,
+    compute_dominators and compute_risk_scores in sequence, with one graph
+    build instead of five passes over the dicts. Returns the DependencyGraph
+    for further queries.
+    """
+    with stage("blast"):
+        graph = DependencyGraph.from_dependency_map(dependency_map)
+        graph.compute_fanin()
+        graph.compute_blast_radii()
+        graph.detect_chokepoints(fanin_threshold, depth_threshold)
+    with stage("dominators"):
+        graph.compute_dominators()
+    with stage("score"):
+        graph.compute_risk_scores(profile)
+        graph.write_metrics(dependency_map)
+    return graph
 
 
 # ---------------------------------------------------------------------------
@@ -377,33 +364,7 @@ def export_to_json(dependency_map: dict, path) -> None:
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    import urllib.parse
-
-    enrich = "--enrich" in sys.argv
-    deps = extract_dependencies(enrich_npm=enrich)
-    compute_fanout(deps)
-    compute_blast_radii(deps)
-    detect_chokepoints(deps)
-    compute_risk_scores(deps)
+    # Same flags as `depblast scan`; cli.py owns the argument parser
+    from cli import main
 
-    health = compute_structural_health(deps)
-
-    if len(sys.argv) > 1 and not sys.argv[1].startswith("--"):
-        compromised = sys.argv[1]
-    else:
-        compromised = next(iter(deps))  # default: first package
-
-    impacted = simulate_compromise(compromised, deps)
-
-    print("\n╔══════════════════════════════════════════╗")
-    print("║       DepBlast — Compromise Simulation   ║")
-    print("╚══════════════════════════════════════════╝")
-    print(f"\n  Target  : {compromised}")
-    print(f"  Impacted: {len(impacted)} packages")
-    print(f"\nStructural Health:")
-    for k, v in health.items():
-        if not isinstance(v, (dict, list)):
-            print(f"  {k}: {v}")
-
-    export_to_json(deps, "reports/dependency_analysis.json")
-    print("\nExported → reports/dependency_analysis.json")
+    sys.exit(main(["scan", *sys.argv[1:]]))
@@ -0,0 +1,394 @@
+"""Columnar, array-backed dependency graph.
+
+Package IDs are interned once into integer node IDs; edges are stored as CSR
+arrays in both directions (``fwd_offsets``/``fwd_targets`` parent → child and
+``rev_offsets``/``rev_targets`` child → parent) and every per-package metric
+is a NumPy column indexed by node ID. Fan-in, chokepoints, risk scores and
+the structural-health summary are computed as whole-array operations instead
+of per-dict loops.
+
+The dict-of-dicts dependency map stays the interchange format (JSON export,
+analysis storage); ``DependencyGraph.view()`` exposes the same shape as a
+thin read-through adapter, and ``write_metrics`` copies the computed columns
+back into a map.
+"""
+
+from collections.abc import Mapping, MutableMapping
+
+import numpy as np
+
+from dominators import PROJECT, dominated_counts_csr, immediate_dominators_csr
+from reachability import dependent_counts_csr
+from risk_scoring import RISK_LEVELS, score_profiles, score_risk
+
+# Registry fields stored as float columns with NaN for "unknown"
+ENRICHMENT_FIELDS = ("days_since_publish", "package_age_days", "maintainer_count", "version_count")
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def build_csr(n: int, sources, targets):
+    """CSR (offsets, targets) for n nodes from parallel edge arrays, grouped by source."""
+    sources = np.asarray(sources, dtype=np.int32)
+    targets = np.asarray(targets, dtype=np.int32)
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+    return offsets, targets[order]
+
+
+def _optional(value):
+    return np.nan if value is None else value
+
+
+def _from_float(value):
+    # NaN → None; whole numbers back to int so JSON output matches the dict pipeline
+    if value != value:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+# ---------------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------------
+
+class DependencyGraph:
+    """Interned package IDs, CSR adjacency and NumPy metric columns."""
+
+    def __init__(self, ids: list, names: list, versions: list, depth, is_dev,
+                 edge_sources, edge_targets):
+        self.ids = ids
+        self.index = {pkg_id: i for i, pkg_id in enumerate(ids)}
+        self.names = names
+        self.versions = versions
+        n = len(ids)
+
+        self.depth = np.asarray(depth, dtype=np.int32)
+        self.is_dev = np.asarray(is_dev, dtype=bool)
+        self.scoped = np.fromiter((name.startswith("@") for name in names), dtype=bool, count=n)
+
+        self.fwd_offsets, self.fwd_targets = build_csr(n, edge_sources, edge_targets)
+        self.rev_offsets, self.rev_targets = build_csr(n, edge_targets, edge_sources)
+
+        self.fanin = np.zeros(n, dtype=np.int32)
+        self.blast_radius = np.zeros(n, dtype=np.int32)
+        self.is_chokepoint = np.zeros(n, dtype=bool)
+        self.dominator = np.full(n, PROJECT, dtype=np.int32)  # immediate dominator node
+        self.dominated_count = np.zeros(n, dtype=np.int32)
+        self.risk_score = np.zeros(n, dtype=np.float64)
+        self.risk_level = np.zeros(n, dtype=np.int8)  # 0 = "unknown"
+
+        self.enrichment = {field: np.full(n, np.nan) for field in ENRICHMENT_FIELDS}
+        self.latest_version = [None] * n
+
+    @classmethod
+    def from_dependency_map(cls, dependency_map: dict) -> "DependencyGraph":
+        """Build from a dependency map, keeping any registry fields and metrics already present."""
+        ids = list(dependency_map)
+        index = {pkg_id: i for i, pkg_id in enumerate(ids)}
+        sources, targets = [], []
+        for i, pkg_id in enumerate(ids):
+            for child in dependency_map[pkg_id]["dependencies"]:
+                j = index.get(child)
+                if j is not None:
+                    sources.append(i)
+                    targets.append(j)
+
+        metas = list(dependency_map.values())
+        graph = cls(
+            ids,
+            [meta["name"] for meta in metas],
+            [meta["version"] for meta in metas],
+            [meta["depth"] for meta in metas],
+            [meta.get("is_dev", False) for meta in metas],
+            sources,
+            targets,
+        )
+        for field in ENRICHMENT_FIELDS:
+            graph.enrichment[field][:] = [_optional(meta.get(field)) for meta in metas]
+        graph.latest_version = [meta.get("latest_version") for meta in metas]
+
+        # Metrics of an already analyzed map, so it can be queried without recomputing
+        graph.fanin[:] = [meta.get("fanout", 0) for meta in metas]
+        graph.blast_radius[:] = [meta.get("blast_radius", 0) for meta in metas]
+        graph.is_chokepoint[:] = [meta.get("is_chokepoint", False) for meta in metas]
+        graph.dominator[:] = [index.get(meta.get("dominator"), PROJECT) for meta in metas]
+        graph.dominated_count[:] = [meta.get("dominated_count", 0) for meta in metas]
+        graph.risk_score[:] = [meta.get("risk_score", 0.0) for meta in metas]
+        graph.risk_level[:] = [RISK_LEVELS.index(meta.get("risk_level", "unknown")) for meta in metas]
+        return graph
+
+    @classmethod
+    def from_stream(cls, graph_stream) -> "DependencyGraph":
+        """Build straight from a walker's ("node", ...) / ("edge", ...) stream,
+        without materializing a dependency map first."""
+        index: dict = {}
+        ids, names, versions, depth, is_dev = [], [], [], [], []
+        edges = []
+        for kind, first, second in graph_stream:
+            if kind == "node":
+                if first not in index:
+                    index[first] = len(ids)
+                    ids.append(first)
+                    names.append(second["name"])
+                    versions.append(second["version"])
+                    depth.append(second["depth"])
+                    is_dev.append(second["is_dev"])
+            else:
+                edges.append((first, second))
+
+        sources = [index[parent] for parent, child in edges if child in index]
+        targets = [index[child] for _, child in edges if child in index]
+        return cls(ids, names, versions, depth, is_dev, sources, targets)
+
+    @classmethod
+    def from_csr(cls, ids: list, names: list, versions: list, depth, is_dev,
+                 fwd_offsets, fwd_targets) -> "DependencyGraph":
+        """Build around an existing forward CSR (e.g. arrays mapped from a
+        snapshot), which is used as is; only the reverse CSR is derived."""
+        n = len(ids)
+        offsets = np.asarray(fwd_offsets)
+        sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(offsets))
+        graph = cls(ids, names, versions, depth, is_dev, (), ())
+        graph.fwd_offsets = offsets
+        graph.fwd_targets = fwd_targets
+        graph.rev_offsets, graph.rev_targets = build_csr(n, fwd_targets, sources)
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, pkg_id) -> bool:
+        return pkg_id in self.index
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.fwd_targets)
+
+    def children(self, node: int):
+        return self.fwd_targets[self.fwd_offsets[node]:self.fwd_offsets[node + 1]]
+
+    def parents(self, node: int):
+        return self.rev_targets[self.rev_offsets[node]:self.rev_offsets[node + 1]]
+
+    # -----------------------------------------------------------------------
+    # Metrics
+    # -----------------------------------------------------------------------
+
+    def compute_fanin(self) -> None:
+        self.fanin = np.diff(self.rev_offsets).astype(np.int32)
+
+    def compute_blast_radii(self) -> None:
+        self.blast_radius = np.asarray(
+            dependent_counts_csr(self.fwd_offsets, self.fwd_targets), dtype=np.int32
+        )
+
+    def detect_chokepoints(self, fanin_threshold: int = 5, depth_threshold: int = 2) -> None:
+        self.is_chokepoint = (self.fanin >= fanin_threshold) & (self.depth >= depth_threshold)
+
+    def compute_dominators(self) -> None:
+        """Immediate dominators and dominator-subtree sizes, rooted at the direct dependencies."""
+        idom, order = immediate_dominators_csr(self.fwd_offsets, self.fwd_targets,
+                                               np.flatnonzero(self.depth == 1))
+        self.dominator = np.asarray(idom, dtype=np.int32)
+        self.dominated_count = np.asarray(dominated_counts_csr(idom, order), dtype=np.int32)
+
+    def compute_risk_scores(self, profile: dict = None) -> None:
+        raw, self.risk_level = score_risk(*self._risk_inputs(), profile=profile)
+        self.risk_score = np.round(raw, 2)
+
+    def score_profiles(self, profiles: list):
+        """(raw, levels) matrices shaped (len(profiles), n); the graph is not modified."""
+        return score_profiles(*self._risk_inputs(), profiles=profiles)
+
+    def _risk_inputs(self) -> tuple:
+        return (
+            self.depth, self.fanin, self.blast_radius, self.dominated_count,
+            self.enrichment["days_since_publish"], self.enrichment["maintainer_count"],
+            self.scoped, self.is_dev,
+        )
+
+    def compute_metrics(self, fanin_threshold: int = 5, depth_threshold: int = 2,
+                        profile: dict = None) -> None:
+        """Fan-in, blast radius, chokepoints, dominators and risk scores, in dependency order."""
+        self.compute_fanin()
+        self.compute_blast_radii()
+        self.detect_chokepoints(fanin_threshold, depth_threshold)
+        self.compute_dominators()
+        self.compute_risk_scores(profile)
+
+    def structural_health(self) -> dict:
+        """Same summary as compute_structural_health, from the columns."""
+        n = len(self.ids)
+        if not n:
+            return {}
+
+        direct = int(np.count_nonzero(self.depth == 1))
+        dev = int(np.count_nonzero(self.is_dev))
+        chokepoints = np.flatnonzero(self.is_chokepoint)
+        solo = np.flatnonzero((self.enrichment["maintainer_count"] == 1) & ~self.is_dev)
+        levels = np.bincount(self.risk_level, minlength=len(RISK_LEVELS))
+
+        return {
+            "total": n,
+            "direct": direct,
+            "transitive": n - direct,
+            "dev_deps": dev,
+            "prod_deps": n - dev,
+            "max_depth": int(self.depth.max()),
+            "avg_depth": round(float(self.depth.mean()), 1),
+            "max_blast_radius": int(self.blast_radius.max()),
+            "chokepoint_count": len(chokepoints),
+            "chokepoints": [self.ids[i] for i in chokepoints[:20]],
+            "solo_maintainer_count": len(solo),
+            "solo_maintainer_pkgs": [self.names[i] for i in solo[:10]],
+            "risk_distribution": {
+                level: int(levels[RISK_LEVELS.index(level)])
+                for level in ("critical", "high", "medium", "low")
+            },
+        }
+
+    # -----------------------------------------------------------------------
+    # Dict views
+    # -----------------------------------------------------------------------
+
+    def write_metrics(self, dependency_map: dict) -> None:
+        """Copy the computed metric columns into a map built from the same packages."""
+        columns = zip(
+            self.ids,
+            self.fanin.tolist(),
+            self.blast_radius.tolist(),
+            self.is_chokepoint.tolist(),
+            self.dominator.tolist(),
+            self.dominated_count.tolist(),
+            self.risk_score.tolist(),
+            self.risk_level.tolist(),
+        )
+        ids = self.ids
+        for pkg_id, fanin, blast, chokepoint, dominator, dominated, score, level in columns:
+            meta = dependency_map[pkg_id]
+            meta["fanout"] = fanin
+            meta["blast_radius"] = blast
+            meta["is_chokepoint"] = chokepoint
+            meta["dominator"] = None if dominator == PROJECT else ids[dominator]
+            meta["dominated_count"] = dominated
+            meta["risk_score"] = score
+            meta["risk_level"] = RISK_LEVELS[level]
+
+    def to_dependency_map(self) -> dict:
+        """Materialize a plain dependency map (e.g. for JSON export)."""
+        view = self.view()
+        return {pkg_id: dict(view[pkg_id]) for pkg_id in self.ids}
+
+    def view(self) -> "DependencyMapView":
+        return DependencyMapView(self)
+
+
+class PackageView(MutableMapping):
+    """One package of a DependencyGraph with the keys of a dependency-map entry.
+
+    Reads go to the columns; metric fields can be assigned and write through.
+    """
+
+    KEYS = (
+        "name", "version", "depth", "direct", "is_dev", "dependencies", "fanout",
+        "blast_radius", "is_chokepoint", "dominator", "dominated_count",
+        "days_since_publish", "package_age_days",
+        "maintainer_count", "latest_version", "version_count", "risk_score", "risk_level",
+    )
+
+    __slots__ = ("_graph", "_node")
+
+    def __init__(self, graph: DependencyGraph, node: int):
+        self._graph = graph
+        self._node = node
+
+    def __getitem__(self, key):
+        graph, node = self._graph, self._node
+        if key == "name":
+            return graph.names[node]
+        if key == "version":
+            return graph.versions[node]
+        if key == "depth":
+            return int(graph.depth[node])
+        if key == "direct":
+            return bool(graph.depth[node] == 1)
+        if key == "is_dev":
+            return bool(graph.is_dev[node])
+        if key == "dependencies":
+            return [graph.ids[j] for j in graph.children(node).tolist()]
+        if key == "fanout":
+            return int(graph.fanin[node])
+        if key == "blast_radius":
+            return int(graph.blast_radius[node])
+        if key == "is_chokepoint":
+            return bool(graph.is_chokepoint[node])
+        if key == "dominator":
+            dominator = int(graph.dominator[node])
+            return None if dominator == PROJECT else graph.ids[dominator]
+        if key == "dominated_count":
+            return int(graph.dominated_count[node])
+        if key == "risk_score":
+            return float(graph.risk_score[node])
+        if key == "risk_level":
+            return RISK_LEVELS[graph.risk_level[node]]
+        if key == "latest_version":
+            return graph.latest_version[node]
+        if key in graph.enrichment:
+            return _from_float(float(graph.enrichment[key][node]))
+        raise KeyError(key)
+
+    def __setitem__(self, key, value) -> None:
+        graph, node = self._graph, self._node
+        if key == "fanout":
+            graph.fanin[node] = value
+        elif key == "blast_radius":
+            graph.blast_radius[node] = value
+        elif key == "is_chokepoint":
+            graph.is_chokepoint[node] = value
+        elif key == "dominator":
+            graph.dominator[node] = PROJECT if value is None else graph.index[value]
+        elif key == "dominated_count":
+            graph.dominated_count[node] = value
+        elif key == "risk_score":
+            graph.risk_score[node] = value
+        elif key == "risk_level":
+            graph.risk_level[node] = RISK_LEVELS.index(value)
+        elif key == "latest_version":
+            graph.latest_version[node] = value
+        elif key in graph.enrichment:
+            graph.enrichment[key][node] = _optional(value)
+        else:
+            raise KeyError(f"{key} is not writable")
+
+    def __delitem__(self, key) -> None:
+        raise TypeError("package fields cannot be deleted")
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+
+class DependencyMapView(Mapping):
+    """Read-through ``{pkg_id: entry}`` adapter over a DependencyGraph."""
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph: DependencyGraph):
+        self._graph = graph
+
+    def __getitem__(self, pkg_id) -> PackageView:
+        return PackageView(self._graph, self._graph.index[pkg_id])
+
+    def __contains__(self, pkg_id) -> bool:
+        return pkg_id in self._graph.index
+
+    def __iter__(self):
+        return iter(self._graph.ids)
+
+    def __len__(self) -> int:
+        return len(self._graph.ids)
@@ -0,0 +1,288 @@
+"""Persistent per-analysis index for compromise simulation.
+
+Holds the reverse-dependency map for one dependency map and memoizes upward
+closures with LRU eviction, so repeated and overlapping simulations reuse work
+instead of rebuilding the reverse adjacency on every call.
+
+Batches with large impacted sets (simulate_batch) skip the per-target walks
+and take every closure from one bitset sweep over the condensed graph
+(reachability.py), which costs about as much as computing blast radii once.
+
+GraphIndex.from_graph indexes a DependencyGraph (e.g. one mapped from a
+snapshot) straight from its CSR arrays and columns, through graph.view()
+instead of a materialized dependency map.
+
+Attack-path queries (attack_paths.py) keep each target's BFS parent pointers
+in a second LRU cache, so repeated path lookups are dictionary walks.
+"""
+
+import threading
+from collections import OrderedDict
+from itertools import combinations
+
+from attack_paths import chain_nodes, k_shortest_paths, tree_path, upward_tree
+from extract_dependencies import build_reverse_dependencies
+from reachability import bitset_positions, csr_from_dependency_map, dependent_sets_csr
+
+CLOSURE_CACHE_SIZE = 1024  # memoized upward closures kept per analysis
+SWEEP_MIN_WORK = 2.0       # sweep once the targets' summed blast radii exceed this × package count
+OVERLAP_PAIR_LIMIT = 500   # pairwise overlaps are only computed for batches up to this size
+TOP_OVERLAPS = 20
+MAX_PATHS = 10             # k limit for attack-path queries
+
+
+class GraphIndex:
+    """Reverse map plus an LRU cache of impacted sets for one analysis."""
+
+    def __init__(self, dependency_map: dict, cache_size: int = CLOSURE_CACHE_SIZE, graph=None):
+        self.dependency_map = dependency_map
+        self.graph = graph  # the DependencyGraph behind dependency_map, if any
+        if graph is None:
+            self.reverse_map = build_reverse_dependencies(dependency_map)
+            # Package → position in the map's order (the graph payload's `ids`)
+            self.positions = {pkg_id: i for i, pkg_id in enumerate(dependency_map)}
+        else:
+            ids = graph.ids
+            offsets = graph.rev_offsets.tolist()
+            parents = graph.rev_targets.tolist()
+            self.reverse_map = {pkg_id: [ids[j] for j in parents[offsets[i]:offsets[i + 1]]]
+                                for i, pkg_id in enumerate(ids)}
+            self.positions = graph.index
+        self.cache_size = cache_size
+        self._closures: OrderedDict = OrderedDict()
+        self._path_trees: OrderedDict = OrderedDict()  # target → upward BFS parent pointers
+        self._path_results: OrderedDict = OrderedDict()  # (target, k, entry) → attack_paths result
+        self._lock = threading.Lock()
+        self._dominated_children = None  # dominator → packages it immediately dominates
+
+    @classmethod
+    def from_graph(cls, graph, cache_size: int = CLOSURE_CACHE_SIZE) -> "GraphIndex":
+        """Index a DependencyGraph without materializing its dependency map."""
+        return cls(graph.view(), cache_size, graph=graph)
+
+    def __contains__(self, pkg_id: str) -> bool:
+        return pkg_id in self.dependency_map
+
+    # -- cache ---------------------------------------------------------------
+
+    def _cached(self, pkg_id: str, cache: OrderedDict = None):
+        cache = self._closures if cache is None else cache
+        with self._lock:
+            value = cache.get(pkg_id)
+            if value is not None:
+                cache.move_to_end(pkg_id)
+            return value
+
+    def _remember(self, pkg_id: str, value, cache: OrderedDict = None) -> None:
+        cache = self._closures if cache is None else cache
+        with self._lock:
+            cache[pkg_id] = value
+            cache.move_to_end(pkg_id)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._closures.clear()
+            self._path_trees.clear()
+            self._path_results.clear()
+
+    # -- queries -------------------------------------------------------------
+
+    def simulate(self, target: str) -> frozenset:
+        """Return every package transitively impacted if target is compromised.
+
+        Same result as simulate_compromise. Whenever the walk reaches a parent
+        whose closure is already cached, that closure is merged wholesale
+        instead of being walked again.
+        """
+        cached = self._cached(target)
+        if cached is not None:
+            return cached
+
+        impacted: set = set()
+        stack = [target]
+        while stack:
+            current = stack.pop()
+            for parent in self.reverse_map.get(current, ()):
+                if parent in impacted:
+                    continue
+                impacted.add(parent)
+                parent_closure = self._cached(parent)
+                if parent_closure is not None:
+                    impacted |= parent_closure
+                else:
+                    stack.append(parent)
+
+        closure = frozenset(impacted)
+        self._remember(target, closure)
+        return closure
+
+    def path_tree(self, target: str) -> dict:
+        """Upward BFS parent pointers from target (see attack_paths.upward_tree), cached."""
+        tree = self._cached(target, self._path_trees)
+        if tree is None:
+            tree = upward_tree(self.reverse_map, target)
+            self._remember(target, tree, self._path_trees)
+        return tree
+
+    def attack_paths(self, target: str, k: int = 1, entry: str = None) -> dict:
+        """The k shortest dependency chains from target up to the project.
+
+        "to_root" holds the k shortest chains to any direct dependency, which
+        is where the project pulls the compromise in. "entries" maps every
+        impacted direct dependency (or just entry, if given) to its own k
+        shortest chains, nearest entry first. A direct dependency target is
+        its own entry ([target]).
+        """
+        k = max(1, min(k, MAX_PATHS))
+        key = (target, k, entry)
+        cached = self._cached(key, self._path_results)
+        if cached is not None:
+            return cached
+
+        tree = self.path_tree(target)
+        deps = self.dependency_map
+        entries = [pkg_id for pkg_id in tree if deps[pkg_id]["direct"]]
+        if entry is not None:
+            entries = [entry] if entry in tree and deps[entry]["direct"] else []
+
+        def chains(goals, first, allowed=None):
+            if k == 1 or not first:
+                return [first] if first else []
+            return k_shortest_paths(self.reverse_map, target, goals, k, first=first, allowed=allowed)
+
+        nearest = tree_path(tree, entries[0]) if entries else []
+        result = {
+            "target": target,
+            "to_root": chains(set(entries), nearest),
+            "entries": {
+                pkg_id: chains({pkg_id}, tree_path(tree, pkg_id),
+                               chain_nodes(deps, tree, pkg_id) if k > 1 else None)
+                for pkg_id in entries
+            },
+        }
+        self._remember(key, result, self._path_results)
+        return result
+
+    def dominated(self, pkg_id: str) -> list:
+        """Packages only reachable from the project through pkg_id (its
+        dominator subtree, from the graph's dominator column or else the
+        map's "dominator" fields)."""
+        with self._lock:
+            if self._dominated_children is None:
+                if self.graph is None:
+                    dominators = ((child, meta.get("dominator")) for child, meta in self.dependency_map.items())
+                else:
+                    ids = self.graph.ids
+                    dominators = ((child, ids[d] if d >= 0 else None)
+                                  for child, d in zip(ids, self.graph.dominator.tolist()))
+                children: dict = {}
+                for child, dominator in dominators:
+                    if dominator is not None:
+                        children.setdefault(dominator, []).append(child)
+                self._dominated_children = children
+        children = self._dominated_children
+
+        result: list = []
+        stack = list(children.get(pkg_id, ()))
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(children.get(current, ()))
+        return result
+
+    def indices(self, pkg_ids) -> list:
+        """Sorted positions of pkg_ids; the compact form of an impacted set."""
+        positions = self.positions
+        return sorted(positions[pkg_id] for pkg_id in pkg_ids)
+
+    def simulate_many(self, targets) -> dict:
+        """Simulate several compromised packages at once.
+
+        Returns the union of impacted packages, each target's own impacted
+        set, and for every impacted package the targets that reach it.
+        """
+        per_target = self.simulate_batch(targets)
+
+        attribution: dict = {}
+        for target, impacted in per_target.items():
+            for pkg_id in impacted:
+                attribution.setdefault(pkg_id, []).append(target)
+
+        return {
+            "union": set(attribution),
+            "per_target": per_target,
+            "attribution": attribution,
+        }
+
+    def simulate_batch(self, targets) -> dict:
+        """Impacted set of every target; {target: frozenset}.
+
+        Cached closures are reused. When the uncached targets' blast radii
+        add up to more than SWEEP_MIN_WORK times the graph size, the rest come
+        from one sweep over the whole graph instead of one walk each (those
+        are not added to the LRU cache).
+        """
+        targets = list(dict.fromkeys(targets))
+        results = {}
+        missing = []
+        for target in targets:
+            cached = self._cached(target)
+            if cached is not None:
+                results[target] = cached
+            else:
+                missing.append(target)
+
+        work = sum(self.dependency_map[target].get("blast_radius", 0) for target in missing)
+        if work > SWEEP_MIN_WORK * len(self.dependency_map):
+            if self.graph is None:
+                ids, offsets, edge_targets = csr_from_dependency_map(self.dependency_map)
+            else:
+                ids, offsets, edge_targets = self.graph.ids, self.graph.fwd_offsets, self.graph.fwd_targets
+            sets = dependent_sets_csr(offsets, edge_targets, (self.positions[t] for t in missing))
+            for target in missing:
+                results[target] = frozenset(ids[i] for i in bitset_positions(sets[self.positions[target]]))
+        else:
+            for target in missing:
+                results[target] = self.simulate(target)
+
+        return {target: results[target] for target in targets}
+
+
+def overlap_stats(per_target: dict, top: int = TOP_OVERLAPS) -> dict:
+    """Union and overlap summary of a batch's {target: impacted set}.
+
+    unique_counts are the packages only that target reaches; shared_count is
+    how many packages two or more targets reach. Pairwise overlaps (largest
+    intersections first, with Jaccard similarity) are skipped above
+    OVERLAP_PAIR_LIMIT targets.
+    """
+    reached_by: dict = {}
+    for impacted in per_target.values():
+        for pkg_id in impacted:
+            reached_by[pkg_id] = reached_by.get(pkg_id, 0) + 1
+
+    stats = {
+        "union_count": len(reached_by),
+        "shared_count": sum(1 for hits in reached_by.values() if hits > 1),
+        "max_targets_per_package": max(reached_by.values(), default=0),
+        "unique_counts": {
+            target: sum(1 for pkg_id in impacted if reached_by[pkg_id] == 1)
+            for target, impacted in per_target.items()
+        },
+        "top_overlaps": None,
+    }
+
+    if len(per_target) <= OVERLAP_PAIR_LIMIT:
+        pairs = []
+        for (a, set_a), (b, set_b) in combinations(per_target.items(), 2):
+            shared = len(set_a & set_b)
+            if shared:
+                pairs.append((shared, len(set_a | set_b), a, b))
+        pairs.sort(key=lambda pair: (-pair[0], pair[2], pair[3]))
+        stats["top_overlaps"] = [
+            {"targets": [a, b], "shared": shared, "jaccard": round(shared / union, 4)}
+            for shared, union, a, b in pairs[:top]
+        ]
+    return stats
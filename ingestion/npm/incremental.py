@@ -0,0 +1,201 @@
+"""Incremental re-analysis of a lockfile against a previous analysis.
+
+The new lockfile is walked as usual, but fan-in, blast radius, chokepoint
+flags and risk scores are only recomputed for packages the change can reach:
+packages whose set of parents changed, and everything downstream of an edge
+that was added or removed. Dominators are global (one new edge can move a
+dominator far above it), so the linear dominator pass always reruns and
+packages whose dominated count moved are rescored too. Registry metadata is
+carried over by ``name@version`` and only fetched for newly added packages.
+"""
+
+from extract_dependencies import (
+    extract_dependencies,
+    _enrich_with_npm_data,
+    build_reverse_dependencies,
+    compute_blast_radii,
+    compute_dominators,
+    detect_chokepoints,
+    compute_risk_scores,
+)
+from instrumentation import stage
+
+# Above this share of affected packages a full blast-radius pass is cheaper
+FULL_RECOMPUTE_RATIO = 0.25
+
+RISK_RANK = {"unknown": 0, "low": 1, "medium": 2, "high": 3, "critical": 4}
+
+_CARRIED_FIELDS = (
+    "fanout", "blast_radius", "is_chokepoint", "risk_score", "risk_level",
+    "days_since_publish", "package_age_days", "maintainer_count",
+    "latest_version", "version_count",
+)
+
+
+def _downstream(seeds, dependency_map: dict) -> set:
+    """Seeds plus every package reachable from them via dependency edges."""
+    reached = {pkg_id for pkg_id in seeds if pkg_id in dependency_map}
+    stack = list(reached)
+    while stack:
+        current = stack.pop()
+        for child in dependency_map[current]["dependencies"]:
+            if child in dependency_map and child not in reached:
+                reached.add(child)
+                stack.append(child)
+    return reached
+
+
+def _upward_counts(targets, dependency_map: dict) -> dict:
+    """Blast radius for just the given packages, sharing closures between them."""
+    reverse_map = build_reverse_dependencies(dependency_map)
+    closures: dict = {}
+    counts: dict = {}
+    for target in targets:
+        impacted: set = set()
+        stack = [target]
+        while stack:
+            current = stack.pop()
+            for parent in reverse_map.get(current, ()):
+                if parent in impacted:
+                    continue
+                impacted.add(parent)
+                if parent in closures:
+                    impacted |= closures[parent]
+                else:
+                    stack.append(parent)
+        closures[target] = impacted
+        counts[target] = len(impacted)
+    return counts
+
+
+def reanalyze(previous: dict, lockfile, enrich_npm: bool = False, offline: bool = False,
+              fanin_threshold: int = 5, depth_threshold: int = 2, profile: dict = None):
+    """Analyze lockfile reusing every result from previous that is still valid.
+
+    previous is a fully analyzed dependency map (e.g. a JSON export or a
+    cached result) scored under the same risk profile; it is not modified.
+    Returns (dependency_map, delta) where the map is identical to a full
+    analysis of lockfile and delta is the report built by risk_delta.
+    """
+    current = extract_dependencies(lockfile=lockfile)
+
+    added = [pkg_id for pkg_id in current if pkg_id not in previous]
+    removed = [pkg_id for pkg_id in previous if pkg_id not in current]
+
+    for pkg_id, meta in current.items():
+        old = previous.get(pkg_id)
+        if old is not None:
+            for field in _CARRIED_FIELDS:
+                meta[field] = old.get(field, meta[field])
+
+    if enrich_npm and added:
+        with stage("enrich"):
+            _enrich_with_npm_data({pkg_id: current[pkg_id] for pkg_id in added}, offline=offline)
+
+    # Edges that appeared or disappeared, seen from both ends
+    fanin_touched: set = set(added)
+    edge_heads: set = set(added)
+    for pkg_id, meta in current.items():
+        old = previous.get(pkg_id)
+        new_children = set(meta["dependencies"])
+        old_children = set(old["dependencies"]) if old is not None else set()
+        if new_children != old_children:
+            changed = new_children ^ old_children
+            fanin_touched |= changed
+            edge_heads |= changed
+    for pkg_id in removed:
+        fanin_touched.update(previous[pkg_id]["dependencies"])
+        edge_heads.update(previous[pkg_id]["dependencies"])
+
+    with stage("blast"):
+        # Fan-in only moves where an in-edge changed
+        fanin_touched &= current.keys()
+        if fanin_touched:
+            reverse_map = build_reverse_dependencies(current)
+            for pkg_id in fanin_touched:
+                current[pkg_id]["fanout"] = len(reverse_map[pkg_id])
+
+        # Blast radius changes exactly for packages downstream of a changed edge
+        blast_affected = _downstream(edge_heads, current)
+        if len(blast_affected) > FULL_RECOMPUTE_RATIO * max(len(current), 1):
+            compute_blast_radii(current)
+        elif blast_affected:
+            for pkg_id, count in _upward_counts(blast_affected, current).items():
+                current[pkg_id]["blast_radius"] = count
+
+    with stage("dominators"):
+        compute_dominators(current)
+
+    rescore = set(blast_affected) | fanin_touched | set(added)
+    for pkg_id, meta in current.items():
+        old = previous.get(pkg_id)
+        if old is not None and (old["depth"] != meta["depth"] or old["is_dev"] != meta["is_dev"]
+                                or old.get("dominated_count") != meta["dominated_count"]):
+            rescore.add(pkg_id)
+
+    subset = {pkg_id: current[pkg_id] for pkg_id in rescore}
+    with stage("score"):
+        detect_chokepoints(subset, fanin_threshold, depth_threshold)
+        compute_risk_scores(subset, profile)
+
+    delta = risk_delta(previous, current, candidates=rescore)
+    delta["recomputed"] = len(rescore)
+    return current, delta
+
+
+def risk_delta(previous: dict, current: dict, candidates=None) -> dict:
+    """Packages added, removed, escalated or de-escalated between two analyses.
+
+    candidates limits the comparison to packages that may have changed;
+    by default every package present in both maps is compared.
+    """
+    if candidates is None:
+        candidates = current.keys()
+
+    def brief(pkg_id, meta):
+        return {
+            "name": pkg_id,
+            "risk_score": meta["risk_score"],
+            "risk_level": meta["risk_level"],
+            "blast_radius": meta["blast_radius"],
+        }
+
+    added = [brief(pkg_id, meta) for pkg_id, meta in current.items() if pkg_id not in previous]
+    removed = [brief(pkg_id, meta) for pkg_id, meta in previous.items() if pkg_id not in current]
+
+    escalated, deescalated = [], []
+    for pkg_id in candidates:
+        old = previous.get(pkg_id)
+        new = current.get(pkg_id)
+        if old is None or new is None:
+            continue
+        old_rank = RISK_RANK.get(old["risk_level"], 0)
+        new_rank = RISK_RANK.get(new["risk_level"], 0)
+        if new_rank == old_rank:
+            continue
+        change = {
+            "name": pkg_id,
+            "from_level": old["risk_level"],
+            "to_level": new["risk_level"],
+            "from_score": old["risk_score"],
+            "to_score": new["risk_score"],
+        }
+        (escalated if new_rank > old_rank else deescalated).append(change)
+
+    added.sort(key=lambda item: item["risk_score"], reverse=True)
+    # Candidates may be a set; order by score, then name, so reports are stable
+    escalated.sort(key=lambda item: (-item["to_score"], item["name"]))
+    deescalated.sort(key=lambda item: (-item["from_score"], item["name"]))
+
+    return {
+        "added": added,
+        "removed": removed,
+        "escalated": escalated,
+        "deescalated": deescalated,
+        "summary": {
+            "added": len(added),
+            "removed": len(removed),
+            "escalated": len(escalated),
+            "deescalated": len(deescalated),
+        },
+    }
@@ -0,0 +1,263 @@
+"""Per-stage pipeline instrumentation.
+
+A Recorder collects, for one analysis run, the wall time, CPU time and
+allocation peak of each named stage plus free-form counters and latency
+histograms. Pipeline code reports through the module-level ``stage``,
+``count`` and ``observe`` helpers, which go to the recorder activated for the
+current thread / asyncio context and cost nothing when none is active.
+
+Finished recorders are merged into the process-wide METRICS registry, which
+renders the Prometheus text exposition format for the web app's /metrics.
+
+Allocation peaks come from tracemalloc, which slows Python noticeably, so
+they are only reported once enable_allocation_tracking() has been called
+(the CLI does this for --profile; the web app when DEPBLAST_TRACK_ALLOCATIONS
+is set). The peak is process-wide, so concurrent analyses inflate each
+other's numbers.
+"""
+
+import contextvars
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("depblast_recorder", default=None)
+
+
+def enable_allocation_tracking() -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+# ---------------------------------------------------------------------------
+# Recorder
+# ---------------------------------------------------------------------------
+
+class Histogram:
+    """Cumulative bucket counts over LATENCY_BUCKETS, plus sum and count."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def merge(self, other: "Histogram") -> None:
+        for i, value in enumerate(other.counts):
+            self.counts[i] += value
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self) -> list:
+        total, buckets = 0, []
+        for bound, value in zip(self.bounds, self.counts):
+            total += value
+            buckets.append((bound, total))
+        return buckets
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": {str(bound): value for bound, value in self.cumulative()},
+        }
+
+
+class Recorder:
+    """Stage timings, counters and histograms of one pipeline run."""
+
+    def __init__(self):
+        self.stages: dict = {}      # name → {"wall", "cpu", "peak", "calls"}
+        self.counters: dict = {}
+        self.histograms: dict = {}
+        self._depth = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        tracing = tracemalloc.is_tracing() and self._depth == 0
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        self._depth += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            self._depth -= 1
+            peak = tracemalloc.get_traced_memory()[1] - baseline if tracing else None
+            with self._lock:
+                entry = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "peak": None, "calls": 0})
+                entry["wall"] += wall
+                entry["cpu"] += cpu
+                entry["calls"] += 1
+                if peak is not None:
+                    entry["peak"] = max(entry["peak"] or 0, peak)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def activate(self, registry=None):
+        """Make this the current recorder; merged into registry (METRICS) on exit."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            (registry or METRICS).merge(self)
+
+    def report(self) -> dict:
+        """JSON-friendly summary, e.g. for an API response."""
+        with self._lock:
+            return {
+                "stages": {
+                    name: {
+                        "wall_seconds": round(entry["wall"], 6),
+                        "cpu_seconds": round(entry["cpu"], 6),
+                        "peak_bytes": entry["peak"],
+                        "calls": entry["calls"],
+                    }
+                    for name, entry in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+            }
+
+
+def current_recorder():
+    return _current.get()
+
+
+def stage(name: str):
+    """Time a block as stage `name` of the active recorder (no-op without one)."""
+    recorder = _current.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return recorder.stage(name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.count(name, amount)
+
+
+def observe(name: str, value: float) -> None:
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.observe(name, value)
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+# ---------------------------------------------------------------------------
+# Process-wide registry
+# ---------------------------------------------------------------------------
+
+class MetricsRegistry:
+    """Totals across every finished Recorder, rendered for Prometheus."""
+
+    def __init__(self, prefix: str = "depblast"):
+        self.prefix = prefix
+        self.stages: dict = {}
+        self.counters: dict = {}
+        self.histograms: dict = {}
+        self.runs = 0
+        self._lock = threading.Lock()
+
+    def merge(self, recorder: Recorder) -> None:
+        with recorder._lock, self._lock:
+            self.runs += 1
+            for name, entry in recorder.stages.items():
+                total = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "peak": None, "calls": 0})
+                total["wall"] += entry["wall"]
+                total["cpu"] += entry["cpu"]
+                total["calls"] += entry["calls"]
+                if entry["peak"] is not None:
+                    total["peak"] = max(total["peak"] or 0, entry["peak"])
+            for name, value in recorder.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, histogram in recorder.histograms.items():
+                total = self.histograms.get(name)
+                if total is None:
+                    total = self.histograms[name] = Histogram(histogram.bounds)
+                total.merge(histogram)
+
+    def render_prometheus(self) -> str:
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_pipeline_runs_total Instrumented pipeline runs.",
+            f"# TYPE {p}_pipeline_runs_total counter",
+        ]
+        with self._lock:
+            lines.append(f"{p}_pipeline_runs_total {self.runs}")
+
+            stage_metrics = (
+                ("stage_wall_seconds_total", "counter", "Wall-clock seconds spent per stage.", "wall"),
+                ("stage_cpu_seconds_total", "counter", "CPU seconds spent per stage.", "cpu"),
+                ("stage_calls_total", "counter", "Times each stage ran.", "calls"),
+                ("stage_peak_bytes", "gauge", "Largest traced allocation peak per stage.", "peak"),
+            )
+            for metric, kind, help_text, field in stage_metrics:
+                rows = [(name, entry[field]) for name, entry in sorted(self.stages.items())
+                        if entry[field] is not None]
+                if not rows:
+                    continue
+                lines.append(f"# HELP {p}_{metric} {help_text}")
+                lines.append(f"# TYPE {p}_{metric} {kind}")
+                for name, value in rows:
+                    lines.append(f'{p}_{metric}{{stage="{name}"}} {_format(value)}')
+
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                lines.append(f"{p}_{name}_total {value}")
+
+            for name, histogram in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {p}_{name} histogram")
+                for bound, value in histogram.cumulative():
+                    lines.append(f'{p}_{name}_bucket{{le="{bound}"}} {value}')
+                lines.append(f'{p}_{name}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{p}_{name}_sum {_format(histogram.sum)}")
+                lines.append(f"{p}_{name}_count {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format(value) -> str:
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+METRICS = MetricsRegistry()
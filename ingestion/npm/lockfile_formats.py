@@ -0,0 +1,106 @@
+"""Lockfile format detection and dispatch: npm, yarn and pnpm.
+
+``load_any_lockfile`` sniffs the first chunk of the input and hands the
+whole stream to the matching reader. ``walk_any_lockfile`` turns the result
+into the normalized ``("node", ...)`` / ``("edge", ...)`` stream, so
+everything downstream of the walk is format-agnostic.
+
+* ``package-lock.json``: lockfile_stream.load_lockfile + walk_lockfile
+* ``yarn.lock`` (classic and berry): lockfile_yarn.read_yarn_lock + walk_resolved
+* ``pnpm-lock.yaml``: lockfile_pnpm.read_pnpm_lock + walk_resolved
+"""
+
+import json
+import re
+from pathlib import Path
+
+from lockfile_pnpm import read_pnpm_lock
+from lockfile_resolver import package_name_from_key, walk_lockfile, walk_resolved
+from lockfile_stream import CHUNK_SIZE, load_lockfile
+from lockfile_yarn import read_yarn_lock
+
+LOCKFILE_NAMES = ("package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml")
+MANIFEST_NAME = "package.json"  # read next to a yarn.lock for direct / dev dependencies
+
+_PNPM_HEADER = re.compile(r"^lockfileVersion:", re.MULTILINE)
+_YARN_HEADER = re.compile(r"^(# yarn lockfile v1|__metadata:)", re.MULTILINE)
+_YARN_ENTRY = re.compile(r'^"?[^\s#{"][^\n]*:\n {2}(version|resolution)[ :]', re.MULTILINE)
+
+
+class _Replay:
+    """File-like object that returns an already-read head before the rest of fp."""
+
+    def __init__(self, head, fp):
+        self.head = head
+        self.fp = fp
+
+    def read(self, size: int = -1):
+        if self.head:
+            head, self.head = self.head, self.head[:0]
+            return head
+        return self.fp.read(size)
+
+
+def detect_format(head) -> str:
+    """'npm', 'yarn' or 'pnpm' from the first bytes or characters of a lockfile.
+    Anything unrecognized is left to the npm reader, which reports the error."""
+    if isinstance(head, bytes):
+        head = head.decode("utf-8", errors="replace")
+    head = head.lstrip("\ufeff").replace("\r\n", "\n")
+    if head.lstrip().startswith("{"):
+        return "npm"
+    if _PNPM_HEADER.search(head):
+        return "pnpm"
+    if _YARN_HEADER.search(head) or _YARN_ENTRY.search(head):
+        return "yarn"
+    return "npm"
+
+
+def _read_manifest(lockfile_path: Path):
+    manifest_path = lockfile_path.parent / MANIFEST_NAME
+    if not manifest_path.is_file():
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def load_any_lockfile(source, manifest: dict = None, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Lock data from a path, file object or parsed mapping, in any supported format.
+
+    For a yarn.lock path, the package.json next to it is used as the manifest
+    unless one is given.
+    """
+    if isinstance(source, dict):
+        return source
+
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fp:
+            if manifest is None:
+                manifest = _read_manifest(Path(source))
+            return load_any_lockfile(fp, manifest, chunk_size)
+
+    head = source.read(chunk_size)
+    fmt = detect_format(head)
+    fp = _Replay(head, source)
+    if fmt == "pnpm":
+        return read_pnpm_lock(fp, chunk_size)
+    if fmt == "yarn":
+        return read_yarn_lock(fp, manifest, chunk_size)
+    return load_lockfile(fp, chunk_size)
+
+
+def walk_any_lockfile(lock_data: dict):
+    """Normalized node / edge stream for lock data from load_any_lockfile."""
+    if "roots" in lock_data:
+        return walk_resolved(lock_data)
+    return walk_lockfile(lock_data)
+
+
+def lockfile_package_names(lock_data: dict) -> set:
+    """Unique package names in the lock data (what registry enrichment would fetch)."""
+    if "roots" in lock_data:
+        return {pkg["name"] for pkg in lock_data["packages"].values()}
+    return {package_name_from_key(key, entry) for key, entry in lock_data["packages"].items() if key}
@@ -0,0 +1,170 @@
+"""Line-by-line reader for pnpm-lock.yaml (lockfile versions 5, 6 and 9).
+
+pnpm writes its lockfile as block-style YAML with two-space indentation, so
+it is read one line at a time, tracking only the key at each indentation
+level above the current line. No YAML library and no document tree are
+involved. What is kept:
+
+* ``importers`` (or, for single-project v5/v6 files, the top-level
+  ``dependencies`` / ``devDependencies`` / ``optionalDependencies``): the
+  project's direct dependencies and whether they are dev-only.
+* ``packages`` and, in v9, ``snapshots``: every installed package and the
+  resolved references of its dependencies.
+
+Package keys differ by version: ``/name/1.0.0_peer@2.0.0`` (v5),
+``/name@1.0.0(peer@2.0.0)`` (v6) and ``name@1.0.0(peer@2.0.0)`` (v9). Peer
+variants of one ``name@version`` become one package. Dependencies on other
+workspace projects (``link:``) are not packages; those projects are importers
+themselves.
+"""
+
+from lockfile_stream import CHUNK_SIZE, LockfileFormatError, iter_text_lines
+
+DEPENDENCY_TYPES = ("dependencies", "devDependencies", "optionalDependencies")
+DEPENDENCY_BLOCKS = ("dependencies", "optionalDependencies")  # inside a package entry
+PACKAGE_SECTIONS = ("packages", "snapshots")
+PACKAGE_FIELDS = ("name:", "version:") + tuple(f"{block}:" for block in DEPENDENCY_BLOCKS)
+MAX_LEVEL = 4  # importers.<project>.<type>.<name>.version is the deepest line read
+
+
+def _unquote(text: str) -> str:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
+
+
+def _split_key(text: str):
+    """``key: value`` / ``key:`` → (key, value or "")."""
+    if text[0] in "\"'":
+        end = text.find(text[0], 1)
+        if end == -1 or not text[end + 1:].startswith(":"):
+            raise ValueError("bad quoted key")
+        return text[1:end], _unquote(text[end + 2:])
+    if text.endswith(":"):
+        return text[:-1], ""
+    colon = text.find(": ")
+    if colon == -1:
+        raise ValueError("expected 'key: value'")
+    return text[:colon], _unquote(text[colon + 2:])
+
+
+def _parse_key(key: str, major: int):
+    """Package key → (name, version), dropping the peer-dependency suffix."""
+    if major < 6:
+        parts = key.split("/")
+        cut = 2 if key.startswith("@") else 1
+        name, rest = "/".join(parts[:cut]), "/".join(parts[cut:])
+        return name, rest.split("_", 1)[0] or "unknown"
+    at = key.find("@", 1)
+    if at == -1:
+        return key, "unknown"
+    return key[:at], key[at + 1:].split("(", 1)[0]
+
+
+def _candidate_keys(name: str, ref: str):
+    """Package keys a dependency reference may point at, across lockfile versions."""
+    ref = ref.lstrip("/")
+    return (f"{name}@{ref}", f"{name}/{ref}", ref)
+
+
+def read_pnpm_lock(fp, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Resolved lock data (see lockfile_resolver.walk_resolved) from a pnpm-lock.yaml file object."""
+    major = None
+    keys: list = [None] * (MAX_LEVEL + 1)  # enclosing key at each level above the current line
+    entries: dict = {}       # package key without leading "/" → [name, version, [(dep name, ref)]]
+    direct: list = []        # (dep name, ref, is_dev)
+    pending = None           # v6+ importer dependency waiting for its "version:" line
+
+    for number, line in enumerate(iter_text_lines(fp, chunk_size), 1):
+        indent = len(line) - len(line.lstrip(" "))
+        # Blank lines, comments, list items and pnpm 10's "---" document separator
+        if indent == len(line) or line[indent] in "#-":
+            continue
+        level = indent // 2
+        if level > MAX_LEVEL:
+            continue
+        section = keys[0]
+        if level and section in PACKAGE_SECTIONS:
+            # Only the fields the walker needs are split; resolution, engines
+            # and the like are skipped on their indentation alone
+            if level == 2 and not line.startswith(PACKAGE_FIELDS, indent):
+                keys[2] = None
+                continue
+            if level == 3 and keys[2] not in DEPENDENCY_BLOCKS or level > 3:
+                continue
+        elif level and section != "importers" and section not in DEPENDENCY_TYPES:
+            continue
+        if indent % 2:
+            raise LockfileFormatError(f"Malformed pnpm-lock.yaml: odd indentation at line {number}")
+        try:
+            key, value = _split_key(line[indent:].rstrip())
+        except ValueError as err:
+            raise LockfileFormatError(f"Malformed pnpm-lock.yaml: {err} at line {number}") from None
+        keys[level] = key
+
+        if level == 0:
+            if key == "lockfileVersion":
+                try:
+                    major = int(float(value))
+                except ValueError:
+                    raise LockfileFormatError(f"Unsupported pnpm lockfileVersion {value!r}") from None
+            continue
+        if major is None:
+            raise LockfileFormatError("Invalid pnpm-lock.yaml — 'lockfileVersion' must come first")
+
+        if section in PACKAGE_SECTIONS:
+            if level == 1:
+                entries.setdefault(key.lstrip("/"), [None, None, []])
+            elif level == 2 and key in ("name", "version"):
+                entries[keys[1].lstrip("/")][0 if key == "name" else 1] = value
+            elif level == 3:
+                entries[keys[1].lstrip("/")][2].append((key, value))
+            continue
+
+        # Direct dependencies: importers.<project>.<type>.<name> or, single-project, <type>.<name>
+        offset = 2 if section == "importers" else 0
+        if level == offset + 1 and keys[offset] in DEPENDENCY_TYPES:
+            is_dev = keys[offset] == "devDependencies"
+            if value:
+                direct.append((key, value, is_dev))
+            else:
+                pending = (key, is_dev)
+        elif level == offset + 2 and key == "version" and pending is not None and keys[offset + 1] == pending[0]:
+            direct.append((pending[0], value, pending[1]))
+            pending = None
+
+    if major is None:
+        raise LockfileFormatError("Invalid pnpm-lock.yaml — 'lockfileVersion' missing")
+
+    packages: dict = {}
+    ids: dict = {}           # package key → pkg_id
+    for key, (name, version, _) in entries.items():
+        parsed_name, parsed_version = _parse_key(key, major)
+        name, version = name or parsed_name, version or parsed_version
+        pkg_id = f"{name}@{version}"
+        ids[key] = pkg_id
+        packages.setdefault(pkg_id, {"name": name, "version": version, "dependencies": []})
+
+    def resolve(name, ref):
+        if ref.startswith("link:"):
+            return None
+        for candidate in _candidate_keys(name, ref):
+            if candidate in ids:
+                return ids[candidate]
+        return None
+
+    for key, (_, _, dependencies) in entries.items():
+        children = packages[ids[key]]["dependencies"]
+        for name, ref in dependencies:
+            child = resolve(name, ref)
+            if child is not None:
+                children.append(child)
+
+    roots: dict = {}
+    for name, ref, is_dev in direct:
+        pkg_id = resolve(name, ref)
+        if pkg_id is not None:
+            roots[pkg_id] = roots.get(pkg_id, True) and is_dev
+
+    return {"format": "pnpm", "packages": packages, "roots": roots}
@@ -0,0 +1,168 @@
+"""Iterative, nested-path-aware walker for package-lock.json v2/v3.
+
+Dependencies are resolved the way npm does it: starting from the requiring
+package's own location, look for ``<dir>/node_modules/<dep>`` and move up one
+``node_modules`` level at a time until the root is reached. Every lockfile
+entry is visited at most once, so the walk is linear in the size of the
+``packages`` block.
+
+The walker emits a normalized stream of ``("node", pkg_id, attrs)`` and
+``("edge", parent_id, child_id)`` tuples; edges are unique. ``walk_resolved``
+emits the same stream for lockfiles whose dependencies are already resolved
+to ``name@version`` (yarn and pnpm, see lockfile_formats.py).
+"""
+
+from collections import deque
+
+NODE_MODULES = "node_modules/"
+
+
+def package_name_from_key(package_key: str, entry: dict = None) -> str:
+    """``node_modules/a/node_modules/@s/b`` → ``@s/b``."""
+    if NODE_MODULES in package_key:
+        return package_key.rsplit(NODE_MODULES, 1)[-1]
+    # Workspace / link targets such as "packages/foo" carry their own name
+    if entry and entry.get("name"):
+        return entry["name"]
+    return package_key.rsplit("/", 1)[-1]
+
+
+def resolve_dependency(packages: dict, from_key: str, dep_name: str):
+    """Return the ``packages`` key npm would load dep_name from, or None."""
+    base = from_key
+    while True:
+        candidate = f"{base}/{NODE_MODULES}{dep_name}" if base else f"{NODE_MODULES}{dep_name}"
+        if candidate in packages:
+            return candidate
+        if not base:
+            return None
+        cut = base.rfind("/" + NODE_MODULES)
+        base = base[:cut] if cut != -1 else ""
+
+
+def _follow_link(packages: dict, package_key: str):
+    """Workspace symlinks point at their real location via ``resolved``."""
+    entry = packages[package_key]
+    if entry.get("link") and entry.get("resolved") in packages:
+        target = entry["resolved"]
+        return target, packages[target]
+    return package_key, entry
+
+
+def _declared_dependencies(entry: dict, is_root: bool):
+    names = dict(entry.get("dependencies", {}))
+    names.update(entry.get("optionalDependencies", {}))
+    if is_root:
+        names.update(entry.get("devDependencies", {}))
+    return names
+
+
+def _resolve_all(packages: dict, from_key: str, dep_names) -> list:
+    """Keys of the dep_names that are installed, as seen from from_key."""
+    resolved = (resolve_dependency(packages, from_key, dep_name) for dep_name in dep_names)
+    return [dep_key for dep_key in resolved if dep_key is not None]
+
+
+def walk_lockfile(lock_data: dict):
+    """Breadth-first walk of the lockfile from the root project.
+
+    Yields ``("node", pkg_id, attrs)`` the first time a ``name@version`` is
+    reached (so ``depth`` is the shortest distance from the root) and
+    ``("edge", parent_id, child_id)`` once per distinct edge. A package is
+    dev-only when no installed copy of it is reachable from the root's
+    production (including optional) dependencies. Like npm, that reachability
+    also follows installed peer dependencies, which are not edges here.
+    """
+    packages = lock_data.get("packages", {})
+    root_pkg = packages.get("", {})
+    children: dict = {}   # real key → resolved dependency keys, shared by both passes
+
+    def resolved_children(real_key, pkg):
+        if real_key not in children:
+            children[real_key] = _resolve_all(packages, real_key, _declared_dependencies(pkg, is_root=False))
+        return children[real_key]
+
+    prod_names = dict(root_pkg.get("dependencies", {}))
+    prod_names.update(root_pkg.get("optionalDependencies", {}))
+    prod_ids: set = set()
+    prod_keys: set = set()
+    stack = _resolve_all(packages, "", prod_names)
+    while stack:
+        package_key = stack.pop()
+        if package_key in prod_keys:
+            continue
+        prod_keys.add(package_key)
+        real_key, pkg = _follow_link(packages, package_key)
+        prod_ids.add(f"{package_name_from_key(package_key, pkg)}@{pkg.get('version', 'unknown')}")
+        stack.extend(resolved_children(real_key, pkg))
+        stack.extend(_resolve_all(packages, real_key, pkg.get("peerDependencies", {})))
+
+    seen_ids: set = set()
+    seen_keys: set = {""}
+    seen_edges: set = set()
+
+    # (package_key, depth, parent_id)
+    queue = deque((dep_key, 1, None) for dep_key in
+                  _resolve_all(packages, "", _declared_dependencies(root_pkg, is_root=True)))
+
+    while queue:
+        package_key, depth, parent_id = queue.popleft()
+        real_key, pkg = _follow_link(packages, package_key)
+
+        name = package_name_from_key(package_key, pkg)
+        version = pkg.get("version", "unknown")
+        pkg_id = f"{name}@{version}"
+
+        if pkg_id not in seen_ids:
+            seen_ids.add(pkg_id)
+            yield ("node", pkg_id, {"name": name, "version": version, "depth": depth,
+                                    "is_dev": pkg_id not in prod_ids})
+
+        if parent_id is not None and (parent_id, pkg_id) not in seen_edges:
+            seen_edges.add((parent_id, pkg_id))
+            yield ("edge", parent_id, pkg_id)
+
+        if real_key in seen_keys:
+            continue
+        seen_keys.add(real_key)
+
+        for dep_key in resolved_children(real_key, pkg):
+            queue.append((dep_key, depth + 1, pkg_id))
+
+
+def walk_resolved(lock_data: dict):
+    """Breadth-first walk of an already-resolved lockfile graph.
+
+    lock_data is ``{"packages": {pkg_id: {"name", "version", "dependencies"}},
+    "roots": {pkg_id: is_dev}}`` as built by the yarn and pnpm readers. A
+    package is dev-only when no production root reaches it.
+    """
+    packages = lock_data["packages"]
+    roots = lock_data["roots"]
+
+    prod = {pkg_id for pkg_id, is_dev in roots.items() if not is_dev}
+    stack = list(prod)
+    while stack:
+        for child in packages[stack.pop()]["dependencies"]:
+            if child not in prod:
+                prod.add(child)
+                stack.append(child)
+
+    seen_ids = set(roots)
+    queue = deque()
+    for pkg_id in roots:
+        pkg = packages[pkg_id]
+        yield ("node", pkg_id, {"name": pkg["name"], "version": pkg["version"], "depth": 1,
+                                "is_dev": pkg_id not in prod})
+        queue.append((pkg_id, 1))
+
+    while queue:
+        pkg_id, depth = queue.popleft()
+        for child in dict.fromkeys(packages[pkg_id]["dependencies"]):
+            if child not in seen_ids:
+                seen_ids.add(child)
+                pkg = packages[child]
+                yield ("node", child, {"name": pkg["name"], "version": pkg["version"], "depth": depth + 1,
+                                       "is_dev": child not in prod})
+                queue.append((child, depth + 1))
+            yield ("edge", pkg_id, child)
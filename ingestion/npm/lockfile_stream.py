@@ -0,0 +1,264 @@
+"""Incremental package-lock.json reader.
+
+Reads the document in fixed-size chunks and emits ``packages`` entries one at
+a time, so a lockfile is never held in memory as raw bytes, as one big string
+and as a full Python tree at once. Top-level blocks other than ``packages``
+(e.g. the legacy v2 ``dependencies`` tree) are skipped without being decoded.
+"""
+
+import codecs
+import json
+import re
+from pathlib import Path
+
+CHUNK_SIZE = 64 * 1024  # characters read from the source per refill
+
+# Only the fields the walker and enrichment need are kept per entry
+KEPT_FIELDS = ("name", "version", "dependencies", "optionalDependencies",
+               "devDependencies", "peerDependencies", "dev", "link")
+
+_WHITESPACE = " \t\n\r"
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR_END = re.compile(r'[,}\]\s]')
+_DECODER = json.JSONDecoder()
+
+
+class LockfileFormatError(ValueError):
+    """The upload is not a readable lockfile."""
+
+
+class ChunkReader:
+    """Sliding text window over a binary or text file object.
+
+    Pull-style cursor over one JSON document: ``members`` walks an object
+    key by key and the caller either decodes (``value``) or skips
+    (``skip_value``) each member.
+    """
+
+    def __init__(self, fp, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.base = 0        # absolute offset of buf[0]
+        self.anchor = None   # absolute offset that must stay in the window
+        self.eof = False
+        self._decoder = None
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if isinstance(chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            text = self._decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk:
+            self.eof = True
+            if not text:
+                return False
+
+        keep_from = self.pos if self.anchor is None else min(self.pos, self.anchor - self.base)
+        if keep_from:
+            self.buf = self.buf[keep_from:]
+            self.pos -= keep_from
+            self.base += keep_from
+        self.buf += text
+        return True
+
+    def error(self, message: str) -> LockfileFormatError:
+        return LockfileFormatError(f"Malformed lockfile: {message} at offset {self.base + self.pos}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"expected '{char}'")
+        self.pos += 1
+
+    def _skip_string_body(self) -> None:
+        while True:
+            match = _STRING_TAIL.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return
+            if not self.fill():
+                raise self.error("unterminated string")
+
+    def skip_value(self) -> None:
+        """Advance past one JSON value without building Python objects."""
+        first = self.peek()
+        if first == "":
+            raise self.error("unexpected end of input")
+
+        if first == '"':
+            self.pos += 1
+            self._skip_string_body()
+            return
+
+        if first not in "{[":
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buf)
+                if not self.fill():
+                    return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise self.error("unexpected end of input")
+                continue
+            self.pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string_body()
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def members(self):
+        """Iterate the keys of the object at the cursor.
+
+        After each key is yielded the cursor sits on its value, which the
+        caller must consume before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("}")
+
+    def at_end(self) -> bool:
+        return self.peek() == ""
+
+    def value(self):
+        """Decode one JSON value.
+
+        The common case — the value already sits wholly in the window — is a
+        single C-level raw_decode. A value cut by the window edge is scanned
+        to its end once and then parsed from the slice, so large values stay
+        linear instead of being re-decoded after every refill.
+        """
+        self.peek()
+        try:
+            result, end = _DECODER.raw_decode(self.buf, self.pos)
+            if end < len(self.buf) or self.eof:
+                self.pos = end
+                return result
+        except json.JSONDecodeError:
+            if self.eof:
+                raise self.error("invalid JSON value") from None
+
+        start = self.base + self.pos
+        self.anchor = start
+        try:
+            self.skip_value()
+            text = self.buf[start - self.base:self.pos]
+        finally:
+            self.anchor = None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as err:
+            raise LockfileFormatError(f"Malformed lockfile: {err.msg} at offset {start + err.pos}") from None
+
+
+def iter_text_lines(fp, chunk_size: int = CHUNK_SIZE):
+    """Yield the lines of a binary or text file object without line endings,
+    reading it chunk by chunk (used for the line-based yarn and pnpm formats)."""
+    decoder = None
+    pending = ""
+    while True:
+        chunk = fp.read(chunk_size)
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            text = decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk and not text:
+            break
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+        if not chunk:
+            break
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def iter_lockfile_packages(fp, chunk_size: int = CHUNK_SIZE):
+    """Yield ``(package_key, entry)`` for each item of the top-level ``packages`` object.
+
+    Raises LockfileFormatError if the document is not valid JSON or has no
+    ``packages`` field.
+    """
+    reader = ChunkReader(fp, chunk_size)
+    found_packages = False
+
+    for key in reader.members():
+        if key == "packages" and reader.peek() == "{":
+            found_packages = True
+            for package_key in reader.members():
+                yield package_key, reader.value()
+        else:
+            reader.skip_value()
+
+    if not reader.at_end():
+        raise reader.error("trailing data")
+    if not found_packages:
+        raise LockfileFormatError("Invalid package-lock.json — 'packages' field missing")
+
+
+def _slim_entry(entry: dict) -> dict:
+    slim = {field: entry[field] for field in KEPT_FIELDS if field in entry}
+    if entry.get("link") and "resolved" in entry:
+        slim["resolved"] = entry["resolved"]
+    return slim
+
+
+def load_lockfile(source, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Return ``{"packages": {...}}`` from a path, file object or parsed mapping.
+
+    Paths and file objects (binary or text) are streamed; entries are trimmed
+    to the fields DepBlast uses as they arrive. An already-parsed mapping is
+    returned unchanged.
+    """
+    if isinstance(source, dict):
+        return source
+
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fp:
+            return load_lockfile(fp, chunk_size)
+
+    packages = {key: _slim_entry(entry) for key, entry in iter_lockfile_packages(source, chunk_size)}
+    return {"packages": packages}
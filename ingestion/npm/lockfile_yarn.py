@@ -0,0 +1,188 @@
+"""Line-by-line reader for yarn.lock, classic (v1) and berry (v2+).
+
+Both formats are a flat list of entries keyed by the descriptors that
+resolved to them (``"lodash@^4.17.0", "lodash@^4.17.21":``), each with a
+version and the descriptors of its own dependencies. The file is read in one
+pass, keeping only the fields the walker needs; descriptors are resolved to
+``name@version`` IDs once every entry has been seen.
+
+yarn.lock does not say which packages are direct or dev dependencies. Berry
+records the project's own workspaces as entries, and their dependencies are
+the roots. Classic does not, so the roots come from package.json when one is
+given (``manifest``); otherwise every package nothing else depends on is
+taken as a direct dependency. Dev dependencies are only known from the
+manifest.
+"""
+
+import re
+
+from lockfile_stream import CHUNK_SIZE, LockfileFormatError, iter_text_lines
+
+DEPENDENCY_BLOCKS = ("dependencies", "optionalDependencies")
+MANIFEST_PROD = ("dependencies", "optionalDependencies")
+MANIFEST_DEV = ("devDependencies",)
+
+_PROTOCOL = re.compile(r"^[a-z][a-z-]*:")
+# ``key value`` (classic) or ``key: value`` (berry), either side optionally quoted
+_PAIR = re.compile(r'\s*(?:"([^"]*)"|([^\s:"]+)):?[ \t]*(?:"([^"]*)"|(.*?))[ \t]*$')
+_ENTRY_FIELDS = ("version", "resolution") + DEPENDENCY_BLOCKS
+
+
+def _split_pair(line: str):
+    """(key, value) of an indented entry line, or None if it is not one."""
+    match = _PAIR.match(line)
+    if match is None:
+        return None
+    key, quoted_key, value, raw_value = match.groups()
+    return key if key is not None else quoted_key, value if value is not None else raw_value
+
+
+def descriptor_name(descriptor: str) -> str:
+    """``@scope/pkg@npm:^1.0.0`` → ``@scope/pkg``."""
+    at = descriptor.find("@", 1)
+    return descriptor if at == -1 else descriptor[:at]
+
+
+def _dependency_descriptor(name: str, spec: str, berry: bool) -> str:
+    # Berry lockfiles omit the default npm: protocol inside dependency lists
+    if berry and not _PROTOCOL.match(spec):
+        spec = "npm:" + spec
+    return f"{name}@{spec}"
+
+
+def _real_name(descriptor: str, resolution: str = None) -> str:
+    """Installed package name, seeing through ``alias@npm:real@range`` aliases."""
+    if resolution:
+        return descriptor_name(resolution)
+    name = descriptor_name(descriptor)
+    spec = descriptor[len(name) + 1:]
+    if spec.startswith("npm:") and "@" in spec[5:]:
+        return descriptor_name(spec[4:])
+    return name
+
+
+def read_yarn_lock(fp, manifest: dict = None, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Resolved lock data (see lockfile_resolver.walk_resolved) from a yarn.lock file object."""
+    berry = False
+    entries: list = []    # (descriptors, name, version, dependency descriptors, is_workspace)
+    current = None
+    block = None          # dependency block being read, or None
+
+    for number, line in enumerate(iter_text_lines(fp, chunk_size), 1):
+        if not line or line[0] == "#":
+            continue
+        if line[0] != " ":
+            stripped = line.rstrip()
+            if not stripped.endswith(":"):
+                raise LockfileFormatError(f"Malformed yarn.lock: unexpected text at line {number}")
+            header = stripped[:-1]
+            if header == "__metadata":
+                berry = True
+                current = None
+                continue
+            descriptors = [d.strip() for d in header.replace('"', "").split(",") if d.strip()]
+            current = [descriptors, None, None, [], False]
+            entries.append(current)
+            block = None
+            continue
+        if current is None:
+            continue  # __metadata fields
+
+        # Only the fields the walker needs are split; resolved, integrity,
+        # checksum and the like are skipped on their indentation alone
+        nested = line[2:3] == " "
+        if not nested:
+            block = None
+            if not line.startswith(_ENTRY_FIELDS, 2):
+                continue
+        elif block is None or not line[4:5].strip():
+            continue
+        pair = _split_pair(line)
+        if pair is None:
+            raise LockfileFormatError(f"Malformed yarn.lock: expected 'key value' at line {number}")
+        key, value = pair
+        if not nested:
+            if key in DEPENDENCY_BLOCKS and not value:
+                block = key
+            elif key == "version":
+                current[2] = value
+            elif key == "resolution":
+                current[1] = value
+                current[4] = "@workspace:" in value
+        else:
+            current[3].append(_dependency_descriptor(key, value, berry))
+
+    if entries and not berry and not any(entry[2] for entry in entries):
+        raise LockfileFormatError("Invalid yarn.lock — no versioned entries")
+
+    packages: dict = {}
+    resolved: dict = {}     # descriptor → pkg_id
+    workspaces: list = []
+    for descriptors, resolution, version, dependencies, is_workspace in entries:
+        if is_workspace:
+            workspaces.append((descriptors, dependencies))
+            continue
+        name = _real_name(descriptors[0], resolution)
+        version = version or "unknown"
+        pkg_id = f"{name}@{version}"
+        pkg = packages.setdefault(pkg_id, {"name": name, "version": version, "dependencies": []})
+        pkg["dependencies"].extend(dependencies)  # descriptors until resolved below
+        for descriptor in descriptors:
+            resolved[descriptor] = pkg_id
+
+    for pkg in packages.values():
+        pkg["dependencies"] = [resolved[d] for d in pkg["dependencies"] if d in resolved]
+
+    roots: dict = {}
+
+    def add_root(pkg_id, is_dev):
+        roots[pkg_id] = roots.get(pkg_id, True) and is_dev
+
+    dev_names = set()
+    if manifest:
+        for field in MANIFEST_DEV:
+            dev_names.update(manifest.get(field) or {})
+        prod_names = set()
+        for field in MANIFEST_PROD:
+            prod_names.update(manifest.get(field) or {})
+        dev_names -= prod_names
+
+    if workspaces:
+        for _, dependencies in workspaces:
+            for descriptor in dependencies:
+                if descriptor in resolved:
+                    add_root(resolved[descriptor], descriptor_name(descriptor) in dev_names)
+    elif manifest:
+        required = {child for pkg in packages.values() for child in pkg["dependencies"]}
+        by_name: dict = {}
+        for pkg_id, pkg in packages.items():
+            by_name.setdefault(pkg["name"], []).append(pkg_id)
+        for field in MANIFEST_PROD + MANIFEST_DEV:
+            for name, spec in (manifest.get(field) or {}).items():
+                pkg_id = resolved.get(_dependency_descriptor(name, spec, berry))
+                if pkg_id is None:
+                    # package.json edited since the last install: match by name instead
+                    matches = by_name.get(name, [])
+                    if len(matches) > 1:
+                        matches = [m for m in matches if m not in required]
+                    pkg_id = matches[0] if len(matches) == 1 else None
+                if pkg_id is not None:
+                    add_root(pkg_id, field in MANIFEST_DEV)
+    if not roots:
+        required = {child for pkg in packages.values() for child in pkg["dependencies"]}
+        candidates = [pkg_id for pkg_id in packages if pkg_id not in required]
+        # Packages only reachable through a cycle: the first one of each becomes a root too
+        reached: set = set()
+        for pkg_id in candidates + list(packages):
+            if pkg_id in reached:
+                continue
+            add_root(pkg_id, False)
+            reached.add(pkg_id)
+            stack = [pkg_id]
+            while stack:
+                for child in packages[stack.pop()]["dependencies"]:
+                    if child not in reached:
+                        reached.add(child)
+                        stack.append(child)
+
+    return {"format": "yarn-berry" if berry else "yarn", "packages": packages, "roots": roots}
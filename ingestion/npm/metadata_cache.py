@@ -0,0 +1,105 @@
+"""Persistent SQLite store for NPM registry metadata.
+
+Stores one row per package name with the summarized packument fields DepBlast
+uses, the ETag / Last-Modified validators returned by the registry, and the
+time the row was last confirmed. Rows younger than the TTL are served without
+touching the network; older rows are revalidated with a conditional request.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).resolve().parents[2] / "data" / "npm_metadata.sqlite3"
+CACHE_TTL = 24 * 3600  # seconds a cached packument summary is trusted without revalidation
+
+CachedPackument = namedtuple("CachedPackument", "summary etag last_modified fetched_at fresh")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packuments (
+    name          TEXT PRIMARY KEY,
+    summary       TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL
+)
+"""
+
+
+class MetadataCache:
+    """Thread-safe name → packument-summary store backed by one SQLite file."""
+
+    def __init__(self, path=CACHE_PATH, ttl: float = CACHE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, name: str):
+        """Return a CachedPackument, or None if the name was never stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, etag, last_modified, fetched_at FROM packuments WHERE name = ?",
+                (name,),
+            ).fetchone()
+        if row is None:
+            return None
+        summary, etag, last_modified, fetched_at = row
+        return CachedPackument(
+            summary=json.loads(summary),
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=fetched_at,
+            fresh=(time.time() - fetched_at) < self.ttl,
+        )
+
+    def store(self, name: str, summary: dict, etag=None, last_modified=None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO packuments (name, summary, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, json.dumps(summary), etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, name: str) -> None:
+        """Mark a row as freshly revalidated (registry answered 304)."""
+        with self._lock:
+            self._conn.execute("UPDATE packuments SET fetched_at = ? WHERE name = ?", (time.time(), name))
+            self._conn.commit()
+
+    def count_stale(self, names) -> int:
+        """How many of names are missing or past the TTL, i.e. would hit the network."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            fresh = {
+                name for (name,) in self._conn.execute(
+                    "SELECT name FROM packuments WHERE fetched_at >= ?", (cutoff,)
+                )
+            }
+        return sum(1 for name in set(names) if name not in fresh)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> MetadataCache:
+    """Process-wide cache at CACHE_PATH, opened on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = MetadataCache()
+        return _default_cache
@@ -0,0 +1,82 @@
+"""Package selection expressions for batch simulation.
+
+An expression is one or more comparisons joined by ``and``:
+
+    maintainer_count == 1
+    is_chokepoint == true and depth >= 3
+    name == "@babel/*" and risk_level != "low"
+
+The left side is a dependency-map field. The right side is a number,
+``true``/``false``, ``null`` or a quoted string. A string compared with
+``==``/``!=`` is a glob pattern when it contains ``*`` or ``?``. A package
+whose field is missing or null only matches ``== null``.
+"""
+
+import fnmatch
+import operator
+import re
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+_CLAUSE = re.compile(r"""\s*([A-Za-z_]\w*)\s*(==|!=|<=|>=|<|>)\s*("(?:[^"\\]|\\.)*"|'[^']*'|[^\s]+)\s*""")
+_CONSTANTS = {"true": True, "false": False, "null": None}
+
+
+def _parse_value(text: str):
+    if text[0] in "\"'":
+        return text[1:-1]
+    if text in _CONSTANTS:
+        return _CONSTANTS[text]
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Invalid value {text!r}; quote strings") from None
+
+
+def _comparison(field: str, op: str, value):
+    compare = _OPERATORS[op]
+    if isinstance(value, str) and op in ("==", "!=") and any(c in value for c in "*?"):
+        matches = op == "=="
+        return lambda meta: isinstance(meta.get(field), str) and fnmatch.fnmatchcase(meta[field], value) == matches
+    if value is None:
+        if op not in ("==", "!="):
+            raise ValueError(f"null only supports == and != (got {field} {op} null)")
+        return lambda meta: compare(meta.get(field), None)
+
+    def check(meta):
+        actual = meta.get(field)
+        if actual is None:
+            return op == "!="
+        try:
+            return compare(actual, value)
+        except TypeError:
+            return False
+    return check
+
+
+def parse_filter(expression: str):
+    """Compile expression into a predicate over dependency-map entries."""
+    checks = []
+    for clause in re.split(r"\s+and\s+", expression.strip()):
+        match = _CLAUSE.fullmatch(clause)
+        if match is None:
+            raise ValueError(f"Invalid filter clause {clause!r}; expected <field> <op> <value>")
+        field, op, value = match.groups()
+        checks.append(_comparison(field, op, _parse_value(value)))
+    return lambda meta: all(check(meta) for check in checks)
+
+
+def select_packages(dependency_map: dict, expression: str) -> list:
+    """Package IDs matching expression, in dependency-map order."""
+    predicate = parse_filter(expression)
+    return [pkg_id for pkg_id, meta in dependency_map.items() if predicate(meta)]
@@ -0,0 +1,217 @@
+"""Portfolio analysis: many lockfiles, one shared package index.
+
+Every lockfile (package-lock.json, yarn.lock or pnpm-lock.yaml) under a
+directory is analyzed as its own project, in parallel across worker
+processes. The per-project dependency maps are then merged into a global
+``name@version`` → projects index, so cross-project questions ("compromising
+X hits which services, and how many packages in each?") become lookups.
+Registry enrichment runs once for the unique package names of the whole
+portfolio and is copied into every project, instead of once per lockfile.
+
+    depblast portfolio services/                 # summary
+    depblast portfolio services/ --impact lodash --enrich
+    depblast portfolio services/ -o reports/portfolio.json
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from extract_dependencies import (
+    extract_dependencies,
+    _enrich_with_npm_data,
+    analyze_dependency_map,
+    compute_risk_scores,
+    compute_structural_health,
+)
+from graph_core import ENRICHMENT_FIELDS
+from graph_index import GraphIndex
+from lockfile_formats import LOCKFILE_NAMES
+from lockfile_stream import LockfileFormatError
+
+TOP_PACKAGES = 20  # entries in the summary's most-shared / riskiest lists
+
+_SHARED_FIELDS = ENRICHMENT_FIELDS + ("latest_version",)
+
+
+def find_lockfiles(root: Path) -> list:
+    """One lockfile per project directory under root, skipping node_modules,
+    sorted by path. A directory with several takes the first in LOCKFILE_NAMES."""
+    root = Path(root)
+    found: dict = {}
+    for name in LOCKFILE_NAMES:
+        for path in root.rglob(name):
+            if "node_modules" not in path.parts:
+                found.setdefault(path.parent, path)
+    return sorted(found.values())
+
+
+def _analyze_lockfile(path: Path):
+    """Worker: (path, dependency map, None) or (path, None, error message)."""
+    try:
+        deps = extract_dependencies(lockfile=path)
+    except (OSError, LockfileFormatError) as err:
+        return path, None, str(err)
+    analyze_dependency_map(deps)
+    return path, deps, None
+
+
+class Portfolio:
+    """Analyzed projects plus the global package → projects index."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.projects: dict = {}   # project name → dependency map
+        self.packages: dict = {}   # pkg_id → project names containing it, in project order
+        self.errors: dict = {}     # project name → why its lockfile was skipped
+        self._indexes: dict = {}   # project name → GraphIndex, built on first query
+        self._canonical: dict = {} # pkg_id → the one string object used for it everywhere
+
+    def project_name(self, lockfile: Path) -> str:
+        relative = Path(lockfile).parent.relative_to(self.root)
+        return str(relative) if str(relative) != "." else self.root.resolve().name
+
+    @classmethod
+    def load(cls, root: Path, workers: int = None, enrich_npm: bool = False,
+             offline: bool = False) -> "Portfolio":
+        """Analyze every lockfile under root; workers=1 stays in this process."""
+        portfolio = cls(root)
+        lockfiles = find_lockfiles(root)
+        workers = workers or os.cpu_count() or 1
+
+        if workers > 1 and len(lockfiles) > 1:
+            with ProcessPoolExecutor(min(workers, len(lockfiles))) as pool:
+                results = list(pool.map(_analyze_lockfile, lockfiles))
+        else:
+            results = [_analyze_lockfile(path) for path in lockfiles]
+
+        for path, deps, error in results:
+            name = portfolio.project_name(path)
+            if error is not None:
+                portfolio.errors[name] = error
+                continue
+            portfolio.add_project(name, deps)
+
+        if enrich_npm:
+            portfolio.enrich(offline=offline)
+        return portfolio
+
+    def add_project(self, name: str, deps: dict) -> None:
+        """Register an analyzed project; its package IDs are interned so every
+        project shares one string per name@version."""
+        canonical = self._canonical
+        deps = {canonical.setdefault(pkg_id, pkg_id): meta for pkg_id, meta in deps.items()}
+        for meta in deps.values():
+            meta["dependencies"] = [canonical.setdefault(child, child) for child in meta["dependencies"]]
+
+        self.projects[name] = deps
+        self._indexes.pop(name, None)
+        for pkg_id in deps:
+            self.packages.setdefault(pkg_id, []).append(name)
+
+    def enrich(self, offline: bool = False) -> None:
+        """Fetch registry data once per unique package name across all projects,
+        copy it into every project and rescore."""
+        shared = {}
+        for deps in self.projects.values():
+            for pkg_id, meta in deps.items():
+                shared.setdefault(pkg_id, {"name": meta["name"]})
+        _enrich_with_npm_data(shared, offline=offline)
+
+        for deps in self.projects.values():
+            for pkg_id, meta in deps.items():
+                for field in _SHARED_FIELDS:
+                    meta[field] = shared[pkg_id].get(field)
+            compute_risk_scores(deps)
+
+    # -----------------------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------------------
+
+    def _index(self, project: str) -> GraphIndex:
+        index = self._indexes.get(project)
+        if index is None:
+            index = self._indexes[project] = GraphIndex(self.projects[project])
+        return index
+
+    def resolve(self, target: str) -> list:
+        """Package IDs for target: an exact name@version, or every version of a name."""
+        if target in self.packages:
+            return [target]
+        return sorted(pkg_id for pkg_id in self.packages if pkg_id.rsplit("@", 1)[0] == target)
+
+    def impact(self, target: str) -> dict:
+        """Which projects a compromised package (or every version of a name)
+        hits, and how many of each project's packages it impacts."""
+        pkg_ids = self.resolve(target)
+        projects = {}
+        for pkg_id in pkg_ids:
+            for project in self.packages[pkg_id]:
+                entry = projects.setdefault(project, {"pkg_ids": [], "impacted": set()})
+                entry["pkg_ids"].append(pkg_id)
+                entry["impacted"] |= self._index(project).simulate(pkg_id)
+
+        hits = {}
+        for project, entry in sorted(projects.items(), key=lambda item: -len(item[1]["impacted"])):
+            deps = self.projects[project]
+            metas = [deps[pkg_id] for pkg_id in entry["pkg_ids"]]
+            hits[project] = {
+                "versions": [meta["version"] for meta in metas],
+                "impacted_count": len(entry["impacted"]),
+                "project_size": len(deps),
+                "direct": any(meta["direct"] for meta in metas),
+                "dev_only": all(meta["is_dev"] for meta in metas),
+            }
+        return {
+            "target": target,
+            "packages": pkg_ids,
+            "projects_hit": len(hits),
+            "projects_total": len(self.projects),
+            "impacted_total": sum(hit["impacted_count"] for hit in hits.values()),
+            "projects": hits,
+        }
+
+    def summary(self, top: int = TOP_PACKAGES) -> dict:
+        instances = sum(len(deps) for deps in self.projects.values())
+        most_shared = sorted(self.packages.items(), key=lambda item: (-len(item[1]), item[0]))[:top]
+
+        # Riskiest packages by their highest score in any project
+        risk: dict = {}
+        for deps in self.projects.values():
+            for pkg_id, meta in deps.items():
+                if meta["risk_score"] > risk.get(pkg_id, (-1.0, ""))[0]:
+                    risk[pkg_id] = (meta["risk_score"], meta["risk_level"])
+        riskiest = sorted(risk.items(), key=lambda item: (-item[1][0], item[0]))[:top]
+
+        return {
+            "projects": len(self.projects),
+            "failed_projects": len(self.errors),
+            "package_instances": instances,
+            "unique_packages": len(self.packages),
+            "unique_names": len({pkg_id.rsplit("@", 1)[0] for pkg_id in self.packages}),
+            "dedup_ratio": round(instances / len(self.packages), 2) if self.packages else 0,
+            "most_shared": [
+                {"package": pkg_id, "projects": len(projects)} for pkg_id, projects in most_shared
+            ],
+            "riskiest": [
+                {"package": pkg_id, "risk_score": score, "risk_level": level,
+                 "projects": len(self.packages[pkg_id])}
+                for pkg_id, (score, level) in riskiest
+            ],
+        }
+
+    def to_json(self) -> dict:
+        return {
+            "summary": self.summary(),
+            "errors": self.errors,
+            "projects": {name: compute_structural_health(deps) for name, deps in self.projects.items()},
+            "packages": self.packages,
+        }
+
+
+if __name__ == "__main__":
+    # Same flags as `depblast portfolio`; cli.py owns the argument parser
+    from cli import main
+
+    sys.exit(main(["portfolio", *sys.argv[1:]]))
@@ -0,0 +1,209 @@
+"""Exact transitive-dependent counts for every package in one pass.
+
+Cycles are collapsed into strongly connected components, the resulting DAG is
+walked dependents-first, and each component pushes its reverse-reachability
+set down to its children as a Python integer bitset (one bit per package).
+
+The core works on a CSR adjacency over integer node IDs (``offsets`` of
+length n + 1 and ``targets``, forward edges parent → child); the
+dependency-map helpers convert to that form first.
+"""
+
+
+# ---------------------------------------------------------------------------
+# CSR conversion
+# ---------------------------------------------------------------------------
+
+def csr_from_dependency_map(dependency_map: dict):
+    """Return (ids, offsets, targets) for the forward edges of a dependency map."""
+    ids = list(dependency_map)
+    index = {pkg_id: i for i, pkg_id in enumerate(ids)}
+    offsets = [0]
+    targets: list = []
+    for pkg_id in ids:
+        for child in dependency_map[pkg_id]["dependencies"]:
+            j = index.get(child)
+            if j is not None:
+                targets.append(j)
+        offsets.append(len(targets))
+    return ids, offsets, targets
+
+
+def _as_list(values) -> list:
+    # NumPy arrays index slowly element by element; plain lists are faster here
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+# ---------------------------------------------------------------------------
+# Strongly connected components
+# ---------------------------------------------------------------------------
+
+def strongly_connected_components_csr(offsets, targets) -> list:
+    """Tarjan's algorithm, iterative so deep chains cannot overflow the stack.
+
+    Components are lists of node IDs returned dependencies-first: a component
+    always appears before any component that depends on it (reverse
+    topological order).
+    """
+    offsets = _as_list(offsets)
+    targets = _as_list(targets)
+    n = len(offsets) - 1
+
+    index_of = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack: list = []
+    components: list = []
+    counter = 0
+
+    for root in range(n):
+        if index_of[root] != -1:
+            continue
+
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, offsets[root])]
+
+        while work:
+            node, edge = work[-1]
+            end = offsets[node + 1]
+            descended = False
+            while edge < end:
+                child = targets[edge]
+                edge += 1
+                if index_of[child] == -1:
+                    work[-1] = (node, edge)
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, offsets[child]))
+                    descended = True
+                    break
+                if on_stack[child] and index_of[child] < lowlink[node]:
+                    lowlink[node] = index_of[child]
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def strongly_connected_components(dependency_map: dict) -> list:
+    """Components of package IDs, dependencies-first."""
+    ids, offsets, targets = csr_from_dependency_map(dependency_map)
+    return [[ids[i] for i in component]
+            for component in strongly_connected_components_csr(offsets, targets)]
+
+
+# ---------------------------------------------------------------------------
+# Reverse reachability
+# ---------------------------------------------------------------------------
+
+def _closure_sweep(offsets, targets):
+    """Yield (component, impacted bitset) for every strongly connected
+    component: the nodes that reach it through forward edges, plus the
+    component itself when it is cyclic (matching simulate_compromise)."""
+    offsets = _as_list(offsets)
+    targets = _as_list(targets)
+    components = strongly_connected_components_csr(offsets, targets)
+    n = len(offsets) - 1
+
+    component_of = [0] * n
+    member_mask = [0] * len(components)
+    for ci, component in enumerate(components):
+        mask = 0
+        for member in component:
+            component_of[member] = ci
+            mask |= 1 << member
+        member_mask[ci] = mask
+
+    # ancestors[ci] = bitset of nodes that reach component ci. Dependents are
+    # processed first so every parent has already pushed its closure down by
+    # the time a component is visited.
+    ancestors = [0] * len(components)
+
+    for ci in range(len(components) - 1, -1, -1):
+        component = components[ci]
+        closure = ancestors[ci] | member_mask[ci]
+
+        cyclic = len(component) > 1
+        if not cyclic:
+            only = component[0]
+            cyclic = only in targets[offsets[only]:offsets[only + 1]]
+        yield component, (closure if cyclic else ancestors[ci])
+
+        for member in component:
+            for edge in range(offsets[member], offsets[member + 1]):
+                cj = component_of[targets[edge]]
+                if cj != ci:
+                    ancestors[cj] |= closure
+
+        ancestors[ci] = 0  # no longer needed — keeps memory to the frontier
+
+
+def dependent_counts_csr(offsets, targets) -> list:
+    """Per node, how many nodes reach it through forward edges.
+
+    A node on a cycle counts itself, matching simulate_compromise.
+    """
+    counts = [0] * (len(offsets) - 1)
+    for component, impacted in _closure_sweep(offsets, targets):
+        impacted = impacted.bit_count()
+        for member in component:
+            counts[member] = impacted
+    return counts
+
+
+def dependent_sets_csr(offsets, targets, nodes) -> dict:
+    """{node: bitset of the nodes that reach it} for the requested nodes, all
+    from a single sweep; same sets as simulate_compromise."""
+    wanted = set(nodes)
+    sets = {}
+    for component, impacted in _closure_sweep(offsets, targets):
+        for member in component:
+            if member in wanted:
+                sets[member] = impacted
+    return sets
+
+
+# Bit positions set in each byte value, for bitset_positions
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def bitset_positions(bits: int) -> list:
+    """Ascending positions of the set bits of a (non-negative) bitset."""
+    positions = []
+    base = 0
+    for byte in bits.to_bytes((bits.bit_length() + 7) // 8, "little"):
+        if byte:
+            positions.extend(base + bit for bit in _BYTE_BITS[byte])
+        base += 8
+    return positions
+
+
+def transitive_dependent_counts(dependency_map: dict) -> dict:
+    """Return {pkg_id: number of packages transitively impacted if it is compromised}.
+
+    Matches ``len(simulate_compromise(pkg_id, dependency_map))`` for every
+    package, including the package itself when it sits on a cycle.
+    """
+    ids, offsets, targets = csr_from_dependency_map(dependency_map)
+    return dict(zip(ids, dependent_counts_csr(offsets, targets)))
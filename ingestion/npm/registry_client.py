@@ -0,0 +1,350 @@
+"""Asyncio NPM registry client.
+
+A small HTTP/1.1 client on top of ``asyncio.open_connection``: keep-alive
+connections are pooled per client, in-flight requests are capped by a
+semaphore, transient failures (connection errors, timeouts, 429, 5xx) are
+retried with exponential backoff, and responses are requested gzip-compressed.
+
+Each response body is buffered (and inflated) in memory, but packuments are
+never parsed in full. The body is scanned with the streaming JSON reader and
+only ``time.modified``, ``time.created``, ``maintainers``, ``dist-tags`` and
+the number of ``versions`` are extracted; per-version manifests are skipped
+without building Python objects.
+"""
+
+import asyncio
+import io
+import logging
+import random
+import ssl
+import time
+import urllib.parse
+import zlib
+
+from instrumentation import count, observe
+from lockfile_stream import ChunkReader
+
+DEFAULT_REGISTRY = "https://registry.npmjs.org"
+DEFAULT_CONCURRENCY = 20
+DEFAULT_TIMEOUT = 4      # seconds per request attempt
+MAX_RETRIES = 3          # extra attempts after the first for transient failures
+BACKOFF_BASE = 0.25      # seconds; doubled on every retry, plus jitter
+BACKOFF_MAX = 5.0
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_USER_AGENT = "depblast-registry-client"
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryResponseError(Exception):
+    """Retryable HTTP status from the registry."""
+
+    def __init__(self, status: int, retry_after=None):
+        super().__init__(f"registry returned HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+# Failures worth a retry in get(); fetch_summary falls back to the cache on them
+_TRANSIENT_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                     ValueError, zlib.error, RegistryResponseError)
+
+
+# ---------------------------------------------------------------------------
+# Packument extraction
+# ---------------------------------------------------------------------------
+
+def summarize_packument(fp) -> dict:
+    """Extract the cached summary fields from a packument file object."""
+    reader = ChunkReader(fp, 64 * 1024)
+    modified = created = ""
+    maintainers = None
+    dist_tags = {}
+    version_count = 0
+
+    for key in reader.members():
+        if key == "time" and reader.peek() == "{":
+            for stamp in reader.members():
+                if stamp == "modified":
+                    modified = reader.value()
+                elif stamp == "created":
+                    created = reader.value()
+                else:
+                    reader.skip_value()
+        elif key == "versions" and reader.peek() == "{":
+            for _version in reader.members():
+                reader.skip_value()
+                version_count += 1
+        elif key == "maintainers":
+            maintainers = reader.value()
+        elif key == "dist-tags":
+            dist_tags = reader.value()
+        else:
+            reader.skip_value()
+
+    return {
+        "modified": modified or "",
+        "created": created or "",
+        "maintainer_count": len(maintainers) if maintainers else 1,
+        "latest_version": (dist_tags or {}).get("latest", ""),
+        "version_count": version_count,  # proxy for popularity
+    }
+
+
+# ---------------------------------------------------------------------------
+# HTTP client
+# ---------------------------------------------------------------------------
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RegistryClient:
+    """Pooled keep-alive client for one registry base URL.
+
+    Use as ``async with RegistryClient(...) as client``; the pool is closed on
+    exit. At most ``concurrency`` requests (and idle connections) at a time.
+    """
+
+    def __init__(self, registry: str = DEFAULT_REGISTRY, concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT, retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF_BASE):
+        parts = urllib.parse.urlsplit(registry)
+        self.secure = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.secure else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.host_header = parts.netloc
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._ssl = ssl.create_default_context() if self.secure else None
+        self._idle: list = []
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # -- connections ---------------------------------------------------------
+
+    async def _acquire(self):
+        if self._idle:
+            return self._idle.pop(), True
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self._ssl,
+            server_hostname=self.host if self.secure else None,
+        )
+        return _Connection(reader, writer), False
+
+    def _release(self, conn: _Connection, reusable: bool) -> None:
+        if reusable and len(self._idle) < self.concurrency:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    # -- single exchange -----------------------------------------------------
+
+    async def _exchange(self, conn: _Connection, path: str, headers: dict):
+        lines = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            f"User-Agent: {_USER_AGENT}",
+            "Accept-Encoding: gzip",
+            "Connection: keep-alive",
+        ]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by registry")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await conn.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        gzip = response_headers.get("content-encoding", "").lower() == "gzip"
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+        body = []
+
+        def take(data: bytes) -> None:
+            body.append(inflater.decompress(data) if inflater else data)
+
+        connection = response_headers.get("connection", "").lower()
+        if status_line.startswith(b"HTTP/1.0"):
+            reusable = connection == "keep-alive"
+        else:
+            reusable = connection != "close"
+        if status in (204, 304) or 100 <= status < 200:
+            pass
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await conn.reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    while (await conn.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                take(await conn.reader.readexactly(size))
+                await conn.reader.readline()
+        elif "content-length" in response_headers:
+            remaining = int(response_headers["content-length"])
+            while remaining:
+                data = await conn.reader.read(min(remaining, 64 * 1024))
+                if not data:
+                    raise ConnectionError("truncated response body")
+                remaining -= len(data)
+                take(data)
+        else:
+            while True:
+                data = await conn.reader.read(64 * 1024)
+                if not data:
+                    break
+                take(data)
+            reusable = False
+
+        if inflater:
+            body.append(inflater.flush())
+        return status, response_headers, b"".join(body), reusable
+
+    # -- public --------------------------------------------------------------
+
+    async def get(self, path: str, headers: dict = None):
+        """GET base_path + path. Returns (status, headers, body bytes).
+
+        Retries connection errors, timeouts and 429/5xx responses with
+        exponential backoff; other statuses are returned to the caller.
+        """
+        headers = headers or {}
+        attempt = 0
+        while True:
+            reused = False
+            try:
+                async with self._semaphore:
+                    conn, reused = await self._acquire()
+                    started = time.perf_counter()
+                    try:
+                        status, resp_headers, body, reusable = await asyncio.wait_for(
+                            self._exchange(conn, self.base_path + path, headers), self.timeout
+                        )
+                    except BaseException:
+                        conn.close()
+                        raise
+                    finally:
+                        observe("registry_request_seconds", time.perf_counter() - started)
+                    self._release(conn, reusable)
+
+                if status in _RETRY_STATUSES:
+                    raise RegistryResponseError(status, resp_headers.get("retry-after"))
+                return status, resp_headers, body
+
+            except _TRANSIENT_ERRORS as err:
+                if reused and not isinstance(err, RegistryResponseError):
+                    continue  # pooled socket already dropped by the server; free retry on a fresh one
+                if attempt >= self.retries:
+                    raise
+                delay = min(self.backoff * (2 ** attempt), BACKOFF_MAX) * (1 + random.random())
+                retry_after = getattr(err, "retry_after", None)
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, min(float(retry_after), BACKOFF_MAX))
+                attempt += 1
+                count("registry_retries")
+                await asyncio.sleep(delay)
+
+    async def fetch_summary(self, package_name: str, cache=None, offline: bool = False) -> dict:
+        """Summary for one package, going through the metadata cache if given.
+
+        Fresh cache rows are returned without I/O, stale rows are revalidated
+        with If-None-Match / If-Modified-Since, a 404 is stored as a negative
+        entry, and a network, HTTP or decoding failure is logged and falls back
+        to the stale row (or ``{}``).
+        """
+        cached = cache.get(package_name) if cache is not None else None
+        if cached is not None and (cached.fresh or offline):
+            count("registry_cache_hits")
+            return cached.summary
+        if offline:
+            count("registry_offline_misses")
+            return {}
+
+        headers = {"Accept": "application/json"}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        try:
+            safe_name = urllib.parse.quote(package_name, safe="@%")
+            status, resp_headers, body = await self.get(f"/{safe_name}", headers)
+            if status == 200:
+                count("registry_fetched")
+                summary = summarize_packument(io.BytesIO(body))
+                if cache is not None:
+                    cache.store(package_name, summary, resp_headers.get("etag"), resp_headers.get("last-modified"))
+                return summary
+            if status == 304 and cached is not None:
+                count("registry_revalidated")
+                cache.touch(package_name)
+                return cached.summary
+            if status == 404:
+                count("registry_not_found")
+                if cache is not None:
+                    cache.store(package_name, {})  # negative entry: unpublished / private name
+                return {}
+            count("registry_errors")
+            logger.warning("registry returned HTTP %s for %s", status, package_name)
+        except _TRANSIENT_ERRORS as err:
+            count("registry_errors")
+            logger.warning("registry fetch failed for %s: %r", package_name, err)
+
+        return cached.summary if cached is not None else {}
+
+    async def fetch_summaries(self, names, cache=None, offline: bool = False, on_progress=None) -> dict:
+        """Fetch many packages concurrently; on_progress(done, total) after each."""
+        names = list(names)
+        total = len(names)
+        results: dict = {}
+        done = 0
+
+        async def one(name):
+            nonlocal done
+            results[name] = await self.fetch_summary(name, cache, offline)
+            done += 1
+            if on_progress is not None:
+                on_progress(done, total)
+
+        await asyncio.gather(*(one(name) for name in names))
+        return results
+
+
+def fetch_summaries(names, registry: str = DEFAULT_REGISTRY, cache=None, offline: bool = False,
+                    concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                    on_progress=None) -> dict:
+    """Blocking wrapper: run a RegistryClient over names in a fresh event loop."""
+    async def run():
+        async with RegistryClient(registry, concurrency=concurrency, timeout=timeout) as client:
+            return await client.fetch_summaries(names, cache, offline, on_progress)
+
+    return asyncio.run(run())
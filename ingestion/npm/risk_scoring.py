@@ -0,0 +1,188 @@
+"""Vectorized risk scoring under named weight/threshold profiles.
+
+A profile is a flat dict of the formula's weights and level thresholds.
+Profiles are read from config/risk_profiles.json; any key a profile leaves
+out falls back to DEFAULT_PROFILE, so a policy variant only lists what it
+changes. score_profiles evaluates one set of package columns under many
+profiles in a single broadcast pass, which is what sensitivity analysis
+across policy variants needs.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+PROFILES_PATH = Path(__file__).resolve().parent.parent.parent / "config" / "risk_profiles.json"
+
+RISK_LEVELS = ("unknown", "low", "medium", "high", "critical")  # index = level code
+
+DEFAULT_PROFILE = {
+    "depth_weight": 1.5,
+    "fanin_weight": 3.0,
+    "blast_weight": 0.5,
+    "dominance_weight": 3.0,      # times log2(1 + packages only reachable through this one)
+    "staleness_weight": 5.0,      # added per staleness_horizon days since last publish
+    "staleness_horizon": 730,
+    "bus_factor_weight": 10.0,    # times 1 / maintainer count
+    "unscoped_penalty": 2.0,
+    "prod_multiplier": 2.0,       # dev dependencies are multiplied by 1.0
+    "critical": 120,              # raw score thresholds for each level
+    "high": 60,
+    "medium": 25,
+}
+
+PROFILE_KEYS = tuple(DEFAULT_PROFILE)
+
+
+# ---------------------------------------------------------------------------
+# Profiles
+# ---------------------------------------------------------------------------
+
+def make_profile(overrides: dict = None) -> dict:
+    """DEFAULT_PROFILE with overrides applied; unknown keys raise ValueError."""
+    overrides = overrides or {}
+    unknown = set(overrides) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"Unknown risk profile keys: {', '.join(sorted(unknown))}")
+
+    profile = dict(DEFAULT_PROFILE)
+    for key, value in overrides.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Risk profile key {key!r} must be a number")
+        profile[key] = value
+
+    if profile["staleness_horizon"] <= 0:
+        raise ValueError("staleness_horizon must be positive")
+    if not profile["critical"] >= profile["high"] >= profile["medium"]:
+        raise ValueError("Thresholds must satisfy critical >= high >= medium")
+    return profile
+
+
+def load_profiles(path=PROFILES_PATH) -> dict:
+    """Return {name: profile} from a JSON object of named overrides.
+
+    "default" is always present; a file entry of that name overrides it.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError("Risk profile file must contain a JSON object of named profiles")
+
+    profiles = {"default": make_profile(raw.get("default"))}
+    for name, overrides in raw.items():
+        if name == "default":
+            continue
+        if not isinstance(overrides, dict):
+            raise ValueError(f"Risk profile {name!r} must be an object")
+        profiles[name] = make_profile(overrides)
+    return profiles
+
+
+def _profile_matrix(profiles: list) -> dict:
+    """{key: column vector of that key across profiles}, shaped (p, 1) for broadcasting."""
+    return {
+        key: np.array([profile[key] for profile in profiles], dtype=np.float64)[:, None]
+        for key in PROFILE_KEYS
+    }
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def score_profiles(depth, fanin, blast_radius, dominated, days_since_publish, maintainer_count,
+                   scoped, is_dev, profiles: list):
+    """Score n packages under p profiles at once.
+
+    Inputs are length-n columns (dominated is the dominator-subtree size, see
+    dominators.py); days_since_publish and maintainer_count use
+    NaN for unknown values. Returns (raw, levels), both shaped (p, n), with
+    levels as codes into RISK_LEVELS.
+    """
+    w = _profile_matrix(profiles)
+
+    depth = np.asarray(depth, dtype=np.float64)
+    fanin = np.asarray(fanin, dtype=np.float64)
+    blast = np.asarray(blast_radius, dtype=np.float64)
+    dominance = np.log2(1.0 + np.asarray(dominated, dtype=np.float64))
+    days = np.asarray(days_since_publish, dtype=np.float64)
+    mc = np.asarray(maintainer_count, dtype=np.float64)
+    unscoped = ~np.asarray(scoped, dtype=bool)
+    is_dev = np.asarray(is_dev, dtype=bool)
+
+    # Profile-independent parts are computed once per package
+    known_age = ~np.isnan(days)
+    days = np.where(known_age, days, 0.0)
+    inverse_mc = np.divide(1.0, mc, out=np.zeros_like(mc), where=mc > 0)  # NaN compares False
+
+    base = (depth * w["depth_weight"] + fanin * w["fanin_weight"] + blast * w["blast_weight"]
+            + dominance * w["dominance_weight"])
+    age_risk = np.where(known_age, days / w["staleness_horizon"] * w["staleness_weight"], 0.0)
+    bus_risk = inverse_mc * w["bus_factor_weight"]
+    scope_risk = np.where(unscoped, w["unscoped_penalty"], 0.0)
+    multiplier = np.where(is_dev, 1.0, w["prod_multiplier"])
+
+    raw = (base + age_risk + bus_risk + scope_risk) * multiplier
+
+    levels = np.ones(raw.shape, dtype=np.int8)
+    levels[raw >= w["medium"]] = 2
+    levels[raw >= w["high"]] = 3
+    levels[raw >= w["critical"]] = 4
+    return raw, levels
+
+
+def score_risk(depth, fanin, blast_radius, dominated, days_since_publish, maintainer_count,
+               scoped, is_dev, profile: dict = None):
+    """Single-profile score_profiles; returns length-n (raw, levels)."""
+    raw, levels = score_profiles(depth, fanin, blast_radius, dominated, days_since_publish,
+                                 maintainer_count, scoped, is_dev,
+                                 [profile or DEFAULT_PROFILE])
+    return raw[0], levels[0]
+
+
+# ---------------------------------------------------------------------------
+# Sensitivity analysis
+# ---------------------------------------------------------------------------
+
+def sensitivity_report(ids: list, levels, profile_names: list, top: int = 20) -> dict:
+    """Summarize how level assignments move across profiles.
+
+    levels is the (p, n) matrix from score_profiles. Reports each profile's
+    risk distribution and the packages whose level differs most between
+    profiles.
+    """
+    levels = np.asarray(levels)
+    counts = np.stack([np.bincount(row, minlength=len(RISK_LEVELS)) for row in levels]) \
+        if len(levels) else np.zeros((0, len(RISK_LEVELS)), dtype=np.int64)
+
+    distribution = {
+        name: {RISK_LEVELS[code]: int(counts[i, code]) for code in range(len(RISK_LEVELS) - 1, 0, -1)}
+        for i, name in enumerate(profile_names)
+    }
+
+    if levels.size:
+        lowest, highest = levels.min(axis=0), levels.max(axis=0)
+        spread = highest - lowest
+        high_or_worse = np.count_nonzero(levels >= 3, axis=0)
+    else:
+        lowest = highest = spread = high_or_worse = np.zeros(len(ids), dtype=np.int8)
+
+    unstable = np.flatnonzero(spread)
+    order = unstable[np.lexsort((-high_or_worse[unstable], -spread[unstable]))][:top]
+
+    return {
+        "profiles": list(profile_names),
+        "distribution": distribution,
+        "unstable_count": len(unstable),
+        "unstable": [
+            {
+                "name": ids[i],
+                "lowest": RISK_LEVELS[lowest[i]],
+                "highest": RISK_LEVELS[highest[i]],
+                "high_or_worse_in": int(high_or_worse[i]),
+                "levels": {name: RISK_LEVELS[levels[p, i]] for p, name in enumerate(profile_names)},
+            }
+            for i in order
+        ],
+    }
@@ -0,0 +1,352 @@
+"""Binary snapshots of an analyzed dependency graph.
+
+A snapshot is one file. It starts with a fixed header (magic, format version,
+package and edge counts, number of sections) and a table of named sections.
+Each section is a little-endian array aligned to 8 bytes:
+
+    meta            JSON object (health summary, creation time, …)
+    strings         UTF-8 bytes of every distinct string, concatenated
+    string_offsets  int64[count + 1], start of each string in ``strings``
+    id, name, version, latest_version
+                    int32[n] string numbers (-1 = null)
+    fwd_offsets     int64[n + 1]  CSR over package numbers, parent → child
+    fwd_targets     int32[m]
+    depth, fanin, blast_radius, dominated_count
+                    int32[n]
+    dominator       int32[n]  immediate dominator's package number (-1 = project)
+    flags           uint8[n]  bit 0 is_dev, bit 1 is_chokepoint
+    risk_score      float64[n]
+    risk_level      int8[n]   index into RISK_LEVELS
+    days_since_publish, package_age_days, maintainer_count, version_count
+                    float64[n], NaN = unknown
+
+Snapshot() maps the file read-only and exposes every section as a NumPy view
+over the mapping, so opening one costs a header parse regardless of size;
+packages are only decoded when a graph or dependency map is asked for.
+
+    python ingestion/npm/snapshot.py from-json reports/dependency_analysis.json analysis.dbs
+    python ingestion/npm/snapshot.py to-json analysis.dbs analysis.json
+    python ingestion/npm/snapshot.py info analysis.dbs
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from graph_core import ENRICHMENT_FIELDS, DependencyGraph, _from_float
+from risk_scoring import RISK_LEVELS
+
+MAGIC = b"DEPBLAST"
+FORMAT_VERSION = 2
+SNAPSHOT_SUFFIX = ".dbs"
+
+_HEADER = struct.Struct("<8sIIqqI4x")   # magic, version, reserved, packages, edges, sections
+_SECTION = struct.Struct("<24sqq")      # name, offset, length in bytes
+_ALIGN = 8
+
+FLAG_DEV = 1
+FLAG_CHOKEPOINT = 2
+
+_COLUMNS = {
+    "string_offsets": np.int64,
+    "id": np.int32,
+    "name": np.int32,
+    "version": np.int32,
+    "latest_version": np.int32,
+    "fwd_offsets": np.int64,
+    "fwd_targets": np.int32,
+    "depth": np.int32,
+    "fanin": np.int32,
+    "blast_radius": np.int32,
+    "dominator": np.int32,
+    "dominated_count": np.int32,
+    "flags": np.uint8,
+    "risk_score": np.float64,
+    "risk_level": np.int8,
+    **{field: np.float64 for field in ENRICHMENT_FIELDS},
+}
+
+
+class SnapshotError(ValueError):
+    """The file is not a readable snapshot of this format version."""
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+class _StringTable:
+    def __init__(self):
+        self.numbers: dict = {}
+        self.blobs: list = []
+
+    def add(self, text) -> int:
+        if text is None:
+            return -1
+        number = self.numbers.get(text)
+        if number is None:
+            number = self.numbers[text] = len(self.blobs)
+            self.blobs.append(text.encode("utf-8"))
+        return number
+
+    def sections(self) -> tuple:
+        offsets = np.zeros(len(self.blobs) + 1, dtype=np.int64)
+        np.cumsum([len(blob) for blob in self.blobs], out=offsets[1:])
+        return b"".join(self.blobs), offsets
+
+
+def write_snapshot(dependency_map: dict, path, meta: dict = None) -> None:
+    """Write an analyzed dependency map as a snapshot, atomically."""
+    graph = DependencyGraph.from_dependency_map(dependency_map)
+    strings = _StringTable()
+    columns = {
+        "id": [strings.add(pkg_id) for pkg_id in graph.ids],
+        "name": [strings.add(name) for name in graph.names],
+        "version": [strings.add(version) for version in graph.versions],
+        "latest_version": [strings.add(version) for version in graph.latest_version],
+    }
+    blob, string_offsets = strings.sections()
+
+    sections = [
+        ("meta", json.dumps(meta or {}, separators=(",", ":")).encode("utf-8")),
+        ("strings", blob),
+        ("string_offsets", string_offsets),
+        *((name, np.asarray(values, dtype=_COLUMNS[name])) for name, values in columns.items()),
+        ("fwd_offsets", graph.fwd_offsets),
+        ("fwd_targets", graph.fwd_targets),
+        ("depth", graph.depth),
+        ("fanin", graph.fanin),
+        ("blast_radius", graph.blast_radius),
+        ("dominator", graph.dominator),
+        ("dominated_count", graph.dominated_count),
+        ("flags", graph.is_dev * FLAG_DEV | graph.is_chokepoint * FLAG_CHOKEPOINT),
+        ("risk_score", graph.risk_score),
+        ("risk_level", graph.risk_level),
+        *((field, graph.enrichment[field]) for field in ENRICHMENT_FIELDS),
+    ]
+    payloads = [
+        (name, data if isinstance(data, bytes) else np.ascontiguousarray(data, dtype=_COLUMNS[name]).tobytes())
+        for name, data in sections
+    ]
+
+    offset = _HEADER.size + _SECTION.size * len(payloads)
+    table = []
+    for name, data in payloads:
+        offset += -offset % _ALIGN
+        table.append((name, offset, len(data)))
+        offset += len(data)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(graph.ids), graph.edge_count, len(payloads)))
+        for name, offset, length in table:
+            f.write(_SECTION.pack(name.encode("ascii"), offset, length))
+        for (name, offset, _), (_, data) in zip(table, payloads):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+class Snapshot:
+    """A snapshot file mapped read-only; sections are zero-copy NumPy views."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError(f"{self.path} is empty") from None
+
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError(f"{self.path} is too short to be a snapshot")
+        magic, version, _, self.package_count, self.edge_count, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a DepBlast snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"{self.path} has snapshot format {version}; this version reads {FORMAT_VERSION}")
+
+        self.sections = {}
+        for i in range(count):
+            name, offset, length = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._mmap):
+                raise SnapshotError(f"{self.path} is truncated")
+            self.sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+        missing = set(_COLUMNS) - set(self.sections)
+        if missing:
+            raise SnapshotError(f"{self.path} lacks sections: {', '.join(sorted(missing))}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # arrays handed out (e.g. a graph's CSR) still use the mapping; freed with them
+
+    def _bytes(self, name: str) -> memoryview:
+        offset, length = self.sections[name]
+        return memoryview(self._mmap)[offset:offset + length]
+
+    def column(self, name: str) -> np.ndarray:
+        """A section as a read-only array backed by the mapping."""
+        offset, length = self.sections[name]
+        dtype = np.dtype(_COLUMNS[name])
+        return np.frombuffer(self._mmap, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+
+    @property
+    def meta(self) -> dict:
+        return json.loads(bytes(self._bytes("meta")))
+
+    def strings(self, name: str) -> list:
+        """Decode a string-number column (id, name, version, latest_version)."""
+        blob = self._bytes("strings")
+        offsets = self.column("string_offsets").tolist()
+        decoded = {}
+        values = []
+        for number in self.column(name).tolist():
+            if number < 0:
+                values.append(None)
+                continue
+            text = decoded.get(number)
+            if text is None:
+                text = decoded[number] = str(blob[offsets[number]:offsets[number + 1]], "utf-8")
+            values.append(text)
+        return values
+
+    def to_graph(self) -> DependencyGraph:
+        """DependencyGraph with every metric loaded. The forward CSR and the
+        metric columns stay mapped and read-only; only the strings, the flag
+        bits and the reverse CSR are decoded. Recomputing a metric assigns a
+        new array, so a mapped graph can still be re-analyzed."""
+        flags = self.column("flags")
+        graph = DependencyGraph.from_csr(
+            self.strings("id"), self.strings("name"), self.strings("version"),
+            self.column("depth"), flags & FLAG_DEV, self.column("fwd_offsets"), self.column("fwd_targets"),
+        )
+        graph.fanin = self.column("fanin")
+        graph.blast_radius = self.column("blast_radius")
+        graph.is_chokepoint = (flags & FLAG_CHOKEPOINT).astype(bool)
+        graph.dominator = self.column("dominator")
+        graph.dominated_count = self.column("dominated_count")
+        graph.risk_score = self.column("risk_score")
+        graph.risk_level = self.column("risk_level")
+        for field in ENRICHMENT_FIELDS:
+            graph.enrichment[field] = self.column(field)
+        graph.latest_version = self.strings("latest_version")
+        return graph
+
+    def to_dependency_map(self) -> dict:
+        """The dependency map the snapshot was written from."""
+        ids = self.strings("id")
+        offsets = self.column("fwd_offsets").tolist()
+        targets = self.column("fwd_targets").tolist()
+        flags = self.column("flags").tolist()
+        enrichment = [[_from_float(value) for value in self.column(field).tolist()]
+                      for field in ENRICHMENT_FIELDS]
+        rows = zip(
+            ids, self.strings("name"), self.strings("version"), self.column("depth").tolist(), flags,
+            self.column("fanin").tolist(), self.column("blast_radius").tolist(),
+            self.column("dominator").tolist(), self.column("dominated_count").tolist(),
+            self.column("risk_score").tolist(), self.column("risk_level").tolist(),
+            self.strings("latest_version"), *enrichment,
+        )
+
+        dependency_map = {}
+        for i, (pkg_id, name, version, depth, flag, fanin, blast, dominator, dominated, score, level,
+                latest, days, age, maintainers, version_count) in enumerate(rows):
+            dependency_map[pkg_id] = {
+                "name": name,
+                "version": version,
+                "depth": depth,
+                "direct": depth == 1,
+                "is_dev": bool(flag & FLAG_DEV),
+                "dependencies": [ids[j] for j in targets[offsets[i]:offsets[i + 1]]],
+                "fanout": fanin,
+                "blast_radius": blast,
+                "is_chokepoint": bool(flag & FLAG_CHOKEPOINT),
+                "dominator": ids[dominator] if dominator >= 0 else None,
+                "dominated_count": dominated,
+                "days_since_publish": days,
+                "package_age_days": age,
+                "maintainer_count": maintainers,
+                "latest_version": latest,
+                "version_count": version_count,
+                "risk_score": score,
+                "risk_level": RISK_LEVELS[level],
+            }
+        return dependency_map
+
+
+def load_snapshot(path) -> tuple:
+    """(dependency map, meta) of a snapshot file."""
+    with Snapshot(path) as snapshot:
+        return snapshot.to_dependency_map(), snapshot.meta
+
+
+def open_snapshot(path) -> tuple:
+    """(DependencyGraph, meta) of a snapshot file, with the columns left mapped;
+    graph.view() reads packages from them without building a dependency map."""
+    with Snapshot(path) as snapshot:
+        return snapshot.to_graph(), snapshot.meta
+
+
+# ---------------------------------------------------------------------------
+# CLI: converters to and from the JSON export
+# ---------------------------------------------------------------------------
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert between JSON exports and binary snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    to_json = commands.add_parser("to-json", help="snapshot → dependency_analysis.json format")
+    to_json.add_argument("snapshot")
+    to_json.add_argument("output")
+    from_json = commands.add_parser("from-json", help="dependency_analysis.json → snapshot")
+    from_json.add_argument("export")
+    from_json.add_argument("output")
+    info = commands.add_parser("info", help="print a snapshot's header and sections")
+    info.add_argument("snapshot")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "to-json":
+            from extract_dependencies import export_to_json
+
+            deps, _ = load_snapshot(args.snapshot)
+            export_to_json(deps, args.output)
+        elif args.command == "from-json":
+            with open(args.export, "r", encoding="utf-8") as f:
+                write_snapshot(json.load(f), args.output)
+        else:
+            with Snapshot(args.snapshot) as snapshot:
+                print(f"{snapshot.path}: format {FORMAT_VERSION}, {snapshot.package_count} packages, "
+                      f"{snapshot.edge_count} edges")
+                for name, (offset, length) in snapshot.sections.items():
+                    print(f"  {name:<20} {length:>12} bytes @ {offset}")
+    except SnapshotError as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
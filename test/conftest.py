@@ -0,0 +1,8 @@
+"""Make the flat ingestion and webapp modules importable, as the scripts do."""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "ingestion" / "npm"))
+sys.path.insert(0, str(ROOT_DIR / "webapp"))
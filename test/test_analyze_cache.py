@@ -0,0 +1,71 @@
+"""Result cache: /analyze when the entry disappears after the request found
+it, and hits that callers may mutate."""
+
+import io
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask")
+
+import app as webapp  # noqa: E402
+from analysis_store import AnalysisStore  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+LOCKFILE = Path(__file__).resolve().parent / "package-lock.json"
+
+
+class EvictingCache(ResultCache):
+    """Drops every entry right after a hit once evict_on_hit is set."""
+
+    evict_on_hit = False
+
+    def get(self, key):
+        value = super().get(key)
+        if value is not None and self.evict_on_hit:
+            self._entries.clear()
+            for path in self.root.glob("*"):
+                path.unlink()
+        return value
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(webapp, "result_cache", EvictingCache(tmp_path / "results"))
+    monkeypatch.setattr(webapp, "analysis_store", AnalysisStore(tmp_path / "analyses"))
+    return webapp.app.test_client()
+
+
+def _analyze(client) -> dict:
+    response = client.post("/analyze", data={"file": (io.BytesIO(LOCKFILE.read_bytes()), "package-lock.json")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 202, response.get_json()
+    job = webapp.job_queue.get(response.get_json()["job_id"])
+    deadline = time.time() + 60
+    while job.state not in ("done", "failed") and time.time() < deadline:
+        time.sleep(0.05)
+    assert job.state == "done", job.error
+    return job.result
+
+
+def test_cache_hit_survives_eviction_before_the_job_runs(client):
+    first = _analyze(client)
+    assert first["cache_hit"] is False
+
+    webapp.result_cache.evict_on_hit = True
+    second = _analyze(client)
+    assert second["cache_hit"] is True
+    assert second["health"] == first["health"]
+    assert second["top_risks"] == first["top_risks"]
+
+
+def test_hits_are_not_shared(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put("key", {"a@1.0.0": {"dependencies": []}}, {"total": 1})
+    for _ in range(2):  # memory tier, then disk tier
+        deps, health = cache.get("key")
+        assert deps == {"a@1.0.0": {"dependencies": []}} and health == {"total": 1}
+        deps["a@1.0.0"]["dependencies"].append("b@1.0.0")
+        health["total"] = 2
+        cache._entries.clear()
@@ -0,0 +1,102 @@
+"""Dominator tree checks against networkx on random cyclic graphs."""
+
+import random
+
+import pytest
+
+from dominators import PROJECT, dominated_counts_csr, dominator_tree, immediate_dominators_csr
+from extract_dependencies import new_package_entry
+from graph_core import DependencyGraph
+
+nx = pytest.importorskip("networkx")
+
+
+def _csr(n, edges):
+    children = [[] for _ in range(n)]
+    for parent, child in edges:
+        children[parent].append(child)
+    offsets, targets = [0], []
+    for kids in children:
+        targets.extend(kids)
+        offsets.append(len(targets))
+    return offsets, targets, children
+
+
+def _expected(n, edges, roots):
+    """networkx idoms with the project as start node, attached to every root
+    and, like immediate_dominators_csr, to the first unreached node of each
+    remaining component in index order."""
+    _, _, children = _csr(n, edges)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(n))
+    graph.add_edges_from(edges)
+    starts = list(roots)
+    seen = set()
+    for node in list(roots) + list(range(n)):
+        if node in seen:
+            continue
+        if node not in roots:
+            starts.append(node)
+        seen.add(node)
+        stack = [node]
+        while stack:
+            for child in children[stack.pop()]:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+    graph.add_edges_from(("project", start) for start in starts)
+    idom = nx.immediate_dominators(graph, "project")
+    return [PROJECT if idom[node] == "project" else idom[node] for node in range(n)]
+
+
+def _subtree_sizes(idom):
+    counts = [0] * len(idom)
+    for node in range(len(idom)):
+        parent = idom[node]
+        while parent != PROJECT:
+            counts[parent] += 1
+            parent = idom[parent]
+    return counts
+
+
+def test_direct_dependency_required_by_another_direct_dependency():
+    # a → b with both a and b direct: only the project dominates b
+    idom, order = immediate_dominators_csr([0, 1, 1], [1], [0, 1])
+    assert idom == [PROJECT, PROJECT]
+    assert dominated_counts_csr(idom, order) == [0, 0]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_networkx_on_cyclic_graphs_with_several_roots(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 60)
+    edges = {(rng.randrange(n), rng.randrange(n)) for _ in range(rng.randint(n, 3 * n))}
+    edges = sorted((a, b) for a, b in edges if a != b)
+    roots = rng.sample(range(n), rng.randint(1, min(5, n)))
+
+    offsets, targets, _ = _csr(n, edges)
+    idom, order = immediate_dominators_csr(offsets, targets, roots)
+    expected = _expected(n, edges, roots)
+    assert idom == expected
+    assert dominated_counts_csr(idom, order) == _subtree_sizes(expected)
+
+
+def test_dependency_map_and_graph_paths_agree():
+    rng = random.Random(7)
+    n = 80
+    ids = [f"p{i}@1.0.0" for i in range(n)]
+    deps = {pkg_id: new_package_entry(f"p{i}", "1.0.0", 1 if i < 6 else 2, False)
+            for i, pkg_id in enumerate(ids)}
+    for _ in range(200):
+        parent, child = rng.sample(ids, 2)
+        if child not in deps[parent]["dependencies"]:
+            deps[parent]["dependencies"].append(child)
+
+    tree = dominator_tree(deps)
+    graph = DependencyGraph.from_dependency_map(deps)
+    graph.compute_dominators()
+    for index, pkg_id in enumerate(graph.ids):
+        dominator, dominated = tree[pkg_id]
+        expected = None if graph.dominator[index] == PROJECT else graph.ids[graph.dominator[index]]
+        assert dominator == expected
+        assert dominated == graph.dominated_count[index]
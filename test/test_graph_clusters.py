@@ -0,0 +1,51 @@
+"""The cluster view shares the analysis' node layout with the graph payload
+and builds its top-level links once."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import graph_payload
+from analysis_store import GRAPH_ARTIFACT, AnalysisStore
+from extract_dependencies import analyze_dependency_map, compute_structural_health, extract_dependencies
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LOCKFILE = ROOT_DIR / "test" / "package-lock.json"
+
+
+def test_layout_computed_once_per_analysis(tmp_path, monkeypatch):
+    layouts = []
+    compute_layout = graph_payload.compute_layout
+    monkeypatch.setattr(graph_payload, "compute_layout",
+                        lambda *args: layouts.append(args) or compute_layout(*args))
+
+    deps = extract_dependencies(lockfile=LOCKFILE)
+    analyze_dependency_map(deps)
+    analysis = AnalysisStore(tmp_path).create(deps, compute_structural_health(deps))
+    path = analysis.artifact(GRAPH_ARTIFACT)
+    graph_payload.write_graph_payload(analysis.graph, path, analysis.positions)
+    clusters = analysis.clusters
+    assert len(layouts) == 1
+
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    assert (clusters.x, clusters.y) == (payload["x"], payload["y"])
+
+    # Another process reloading the analysis reads the stored positions back
+    reloaded = AnalysisStore(tmp_path).get(analysis.id)
+    assert reloaded.clusters.top_view() == clusters.top_view()
+    assert len(layouts) == 1
+
+
+def test_top_view_links_computed_once(tmp_path, monkeypatch):
+    deps = extract_dependencies(lockfile=LOCKFILE)
+    analyze_dependency_map(deps)
+    analysis = AnalysisStore(tmp_path).create(deps, compute_structural_health(deps))
+    clusters = analysis.clusters
+    first = clusters.top_view()
+
+    monkeypatch.setattr(clusters, "_links", lambda *args: pytest.fail("links recomputed"))
+    assert clusters.top_view() == first
+    first["edges"].clear()
+    assert clusters.top_view()["edges"] == clusters.top_edges
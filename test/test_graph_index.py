@@ -0,0 +1,88 @@
+"""GraphIndex: cached closures merged into later walks stay exact."""
+
+import random
+
+import pytest
+
+from extract_dependencies import analyze_dependency_map, new_package_entry, simulate_compromise
+from graph_index import GraphIndex, overlap_stats
+
+
+def _random_map(seed: int, n: int = 60, edges: int = 140) -> dict:
+    rng = random.Random(seed)
+    ids = [f"p{i}@1.0.0" for i in range(n)]
+    deps = {pkg_id: new_package_entry(f"p{i}", "1.0.0", 1, False) for i, pkg_id in enumerate(ids)}
+    for _ in range(edges):
+        parent, child = rng.choice(ids), rng.choice(ids)
+        if child not in deps[parent]["dependencies"]:
+            deps[parent]["dependencies"].append(child)
+    analyze_dependency_map(deps)
+    return deps
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_merged_closures_match_simulate_compromise(seed):
+    deps = _random_map(seed)
+    order = list(deps)
+    random.Random(seed).shuffle(order)
+    index = GraphIndex(deps)
+    # Every query after the first few merges closures cached by earlier ones
+    for pkg_id in order:
+        assert index.simulate(pkg_id) == simulate_compromise(pkg_id, deps)
+    for pkg_id in order:
+        assert index.simulate(pkg_id) == simulate_compromise(pkg_id, deps)
+
+
+def test_lru_eviction_keeps_results_exact():
+    deps = _random_map(5)
+    index = GraphIndex(deps, cache_size=4)
+    for pkg_id in list(deps) * 2:
+        assert index.simulate(pkg_id) == simulate_compromise(pkg_id, deps)
+        assert len(index._closures) <= 4
+
+
+def test_cache_hit_returns_the_same_closure():
+    deps = _random_map(1)
+    index = GraphIndex(deps)
+    target = max(deps, key=lambda pkg_id: deps[pkg_id]["blast_radius"])
+    assert index.simulate(target) is index.simulate(target)
+    index.clear()
+    assert not index._closures
+
+
+def test_batch_sweep_matches_per_target_walks():
+    deps = _random_map(2, n=80, edges=240)
+    targets = list(deps)
+    # All targets at once exceeds SWEEP_MIN_WORK, so this takes the bitset sweep
+    index = GraphIndex(deps)
+    swept = index.simulate_batch(targets)
+    assert not index._closures  # swept sets bypass the LRU cache
+    walked = GraphIndex(deps)
+    assert swept == {target: walked.simulate(target) for target in targets}
+
+
+def test_from_graph_matches_dependency_map():
+    deps = _random_map(3)
+    graph = analyze_dependency_map(deps)
+    plain, mapped = GraphIndex(deps), GraphIndex.from_graph(graph)
+    for pkg_id in deps:
+        assert mapped.simulate(pkg_id) == plain.simulate(pkg_id)
+    assert mapped.indices(plain.simulate(graph.ids[0])) == plain.indices(plain.simulate(graph.ids[0]))
+
+
+def test_simulate_many_attribution():
+    deps = _random_map(4)
+    targets = list(deps)[:3]
+    result = GraphIndex(deps).simulate_many(targets)
+    assert result["union"] == set().union(*result["per_target"].values())
+    for pkg_id, reached_from in result["attribution"].items():
+        assert reached_from == [target for target in targets if pkg_id in result["per_target"][target]]
+
+
+def test_overlap_stats():
+    stats = overlap_stats({"a": {"x", "y"}, "b": {"y", "z"}, "c": set()})
+    assert stats["union_count"] == 3
+    assert stats["shared_count"] == 1
+    assert stats["max_targets_per_package"] == 2
+    assert stats["unique_counts"] == {"a": 1, "b": 1, "c": 0}
+    assert stats["top_overlaps"] == [{"targets": ["a", "b"], "shared": 1, "jaccard": 0.3333}]
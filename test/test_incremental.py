@@ -0,0 +1,101 @@
+"""Incremental re-analysis matches a full analysis of the new lockfile."""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+import incremental
+from extract_dependencies import analyze_dependency_map, extract_dependencies
+from incremental import reanalyze, risk_delta
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LOCKFILE = ROOT_DIR / "test" / "package-lock.json"
+
+
+def _analyze(lock: dict) -> dict:
+    deps = extract_dependencies(lockfile=copy.deepcopy(lock))
+    analyze_dependency_map(deps)
+    return deps
+
+
+@pytest.fixture(scope="module")
+def lock():
+    return json.loads(LOCKFILE.read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="module")
+def previous(lock):
+    return _analyze(lock)
+
+
+def _add_package(packages):
+    packages["node_modules/js-yaml"].setdefault("dependencies", {})["evil"] = "^1"
+    packages["node_modules/evil"] = {"version": "1.0.0", "dependencies": {"tslib": "^2"}}
+
+
+def _drop_edge(packages):
+    entry = next(entry for key, entry in packages.items() if key and entry.get("dependencies"))
+    entry["dependencies"].pop(next(iter(entry["dependencies"])))
+
+
+def _bump_version(packages):
+    packages["node_modules/tslib"]["version"] = "2.99.0"
+
+
+def _drop_direct_dependency(packages):
+    packages[""]["dependencies"].pop("axios")
+
+
+def _add_cycle(packages):
+    packages["node_modules/tslib"]["dependencies"] = {"js-yaml": "^4"}
+
+
+CHANGES = [_add_package, _drop_edge, _bump_version, _drop_direct_dependency, _add_cycle]
+
+
+@pytest.mark.parametrize("change", CHANGES, ids=lambda change: change.__name__.strip("_"))
+@pytest.mark.parametrize("full_ratio", [incremental.FULL_RECOMPUTE_RATIO, 0.0], ids=["partial", "full"])
+def test_matches_full_analysis(lock, previous, change, full_ratio, monkeypatch):
+    monkeypatch.setattr(incremental, "FULL_RECOMPUTE_RATIO", full_ratio)
+    changed = copy.deepcopy(lock)
+    change(changed["packages"])
+    snapshot = copy.deepcopy(previous)
+
+    current, delta = reanalyze(previous, copy.deepcopy(changed))
+    full = _analyze(changed)
+    assert current == full
+    assert previous == snapshot  # the previous analysis is not modified
+    assert delta == {**risk_delta(previous, full), "recomputed": delta["recomputed"]}
+    assert delta["recomputed"] < len(full)
+
+
+def test_unchanged_lockfile_recomputes_nothing(lock, previous):
+    current, delta = reanalyze(previous, copy.deepcopy(lock))
+    assert current == previous
+    assert delta["recomputed"] == 0
+    assert delta["summary"] == {"added": 0, "removed": 0, "escalated": 0, "deescalated": 0}
+
+
+def _meta(level, score, blast=0):
+    return {"risk_level": level, "risk_score": score, "blast_radius": blast}
+
+
+def test_risk_delta():
+    previous = {"a": _meta("low", 1.0), "b": _meta("high", 9.0), "gone": _meta("medium", 4.0),
+                "same": _meta("medium", 4.0)}
+    current = {"a": _meta("critical", 20.0), "b": _meta("medium", 5.0), "same": _meta("medium", 4.5),
+               "new1": _meta("low", 1.0), "new2": _meta("high", 8.0)}
+    delta = risk_delta(previous, current)
+    assert [item["name"] for item in delta["added"]] == ["new2", "new1"]
+    assert [item["name"] for item in delta["removed"]] == ["gone"]
+    assert delta["escalated"] == [{"name": "a", "from_level": "low", "to_level": "critical",
+                                   "from_score": 1.0, "to_score": 20.0}]
+    assert [item["name"] for item in delta["deescalated"]] == ["b"]
+    assert delta["summary"] == {"added": 2, "removed": 1, "escalated": 1, "deescalated": 1}
+
+    # candidates restricts the level comparison, not added / removed
+    limited = risk_delta(previous, current, candidates=["b"])
+    assert limited["escalated"] == []
+    assert limited["summary"]["added"] == 2
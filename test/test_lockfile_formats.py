@@ -0,0 +1,430 @@
+"""yarn and pnpm readers: one project, every format, the same dependency map."""
+
+import io
+import json
+
+import pytest
+
+from extract_dependencies import extract_dependencies
+from lockfile_formats import detect_format, load_any_lockfile
+from lockfile_pnpm import read_pnpm_lock
+from lockfile_stream import LockfileFormatError
+from lockfile_yarn import read_yarn_lock
+from portfolio import find_lockfiles
+
+# a and b are production dependencies, t is a dev dependency. c is shared,
+# b has c as a peer, and e is reached only through t's optional dependencies.
+MANIFEST = {
+    "name": "proj",
+    "dependencies": {"a": "^1.0.0", "b": "^1.0.0"},
+    "devDependencies": {"t": "^5.0.0"},
+}
+
+NPM = json.dumps({"name": "proj", "lockfileVersion": 3, "packages": {
+    "": MANIFEST,
+    "node_modules/@scope/d": {"version": "3.1.0"},
+    "node_modules/a": {"version": "1.2.0", "dependencies": {"c": "^2.0.0"}},
+    "node_modules/b": {"version": "1.0.0", "dependencies": {"@scope/d": "^3.0.0", "c": "^2.0.0"},
+                       "peerDependencies": {"c": "*"}},
+    "node_modules/c": {"version": "2.0.0"},
+    "node_modules/e": {"version": "1.0.0", "dev": True, "optional": True},
+    "node_modules/t": {"version": "5.0.0", "dev": True, "dependencies": {"c": "^2.0.0"},
+                       "optionalDependencies": {"e": "^1.0.0"}},
+}})
+
+YARN_CLASSIC = """\
+# THIS IS AN AUTOGENERATED FILE. DO NOT EDIT THIS FILE DIRECTLY.
+# yarn lockfile v1
+
+
+"@scope/d@^3.0.0":
+  version "3.1.0"
+  resolved "https://registry.yarnpkg.com/@scope/d/-/d-3.1.0.tgz#0123"
+  integrity sha512-AAAA
+
+a@^1.0.0:
+  version "1.2.0"
+  resolved "https://registry.yarnpkg.com/a/-/a-1.2.0.tgz#0123"
+  dependencies:
+    c "^2.0.0"
+
+b@^1.0.0:
+  version "1.0.0"
+  dependencies:
+    "@scope/d" "^3.0.0"
+    c "^2.0.0"
+
+c@^2.0.0, c@^2.0.0-0:
+  version "2.0.0"
+
+e@^1.0.0:
+  version "1.0.0"
+
+t@^5.0.0:
+  version "5.0.0"
+  dependencies:
+    c "^2.0.0"
+  optionalDependencies:
+    e "^1.0.0"
+"""
+
+YARN_BERRY = """\
+# This file is generated by running "yarn install" inside your project.
+# Manual changes might be lost - proceed with caution!
+
+__metadata:
+  version: 8
+  cacheKey: 10c0
+
+"@scope/d@npm:^3.0.0":
+  version: 3.1.0
+  resolution: "@scope/d@npm:3.1.0"
+  checksum: 10c0/0123
+  languageName: node
+  linkType: hard
+
+"a@npm:^1.0.0":
+  version: 1.2.0
+  resolution: "a@npm:1.2.0"
+  dependencies:
+    c: "npm:^2.0.0"
+  languageName: node
+  linkType: hard
+
+"b@npm:^1.0.0":
+  version: 1.0.0
+  resolution: "b@npm:1.0.0"
+  dependencies:
+    "@scope/d": "npm:^3.0.0"
+    c: "npm:^2.0.0"
+  peerDependencies:
+    c: "*"
+  languageName: node
+  linkType: hard
+
+"c@npm:^2.0.0":
+  version: 2.0.0
+  resolution: "c@npm:2.0.0"
+  languageName: node
+  linkType: hard
+
+"e@npm:^1.0.0":
+  version: 1.0.0
+  resolution: "e@npm:1.0.0"
+  languageName: node
+  linkType: hard
+
+"proj@workspace:.":
+  version: 0.0.0-use.local
+  resolution: "proj@workspace:."
+  dependencies:
+    a: "npm:^1.0.0"
+    b: "npm:^1.0.0"
+    t: "npm:^5.0.0"
+  languageName: unknown
+  linkType: soft
+
+"t@npm:^5.0.0":
+  version: 5.0.0
+  resolution: "t@npm:5.0.0"
+  dependencies:
+    c: "npm:^2.0.0"
+    e: "npm:^1.0.0"
+  dependenciesMeta:
+    e:
+      optional: true
+  languageName: node
+  linkType: hard
+"""
+
+PNPM_V5 = """\
+lockfileVersion: 5.4
+
+specifiers:
+  a: ^1.0.0
+  b: ^1.0.0
+  t: ^5.0.0
+
+dependencies:
+  a: 1.2.0
+  b: 1.0.0_c@2.0.0
+
+devDependencies:
+  t: 5.0.0
+
+packages:
+
+  /@scope/d/3.1.0:
+    resolution: {integrity: sha512-AAAA}
+    dev: false
+
+  /a/1.2.0:
+    resolution: {integrity: sha512-AAAA}
+    dependencies:
+      c: 2.0.0
+    dev: false
+
+  /b/1.0.0_c@2.0.0:
+    resolution: {integrity: sha512-AAAA}
+    peerDependencies:
+      c: '*'
+    dependencies:
+      '@scope/d': 3.1.0
+      c: 2.0.0
+    dev: false
+
+  /c/2.0.0:
+    resolution: {integrity: sha512-AAAA}
+
+  /e/1.0.0:
+    resolution: {integrity: sha512-AAAA}
+    dev: true
+    optional: true
+
+  /t/5.0.0:
+    resolution: {integrity: sha512-AAAA}
+    dependencies:
+      c: 2.0.0
+    optionalDependencies:
+      e: 1.0.0
+    dev: true
+"""
+
+PNPM_V6 = """\
+lockfileVersion: '6.0'
+
+settings:
+  autoInstallPeers: true
+  excludeLinksFromLockfile: false
+
+dependencies:
+  a:
+    specifier: ^1.0.0
+    version: 1.2.0
+  b:
+    specifier: ^1.0.0
+    version: 1.0.0(c@2.0.0)
+
+devDependencies:
+  t:
+    specifier: ^5.0.0
+    version: 5.0.0
+
+packages:
+
+  /@scope/d@3.1.0:
+    resolution: {integrity: sha512-AAAA}
+    dev: false
+
+  /a@1.2.0:
+    resolution: {integrity: sha512-AAAA}
+    dependencies:
+      c: 2.0.0
+    dev: false
+
+  /b@1.0.0(c@2.0.0):
+    resolution: {integrity: sha512-AAAA}
+    peerDependencies:
+      c: '*'
+    dependencies:
+      '@scope/d': 3.1.0
+      c: 2.0.0
+    dev: false
+
+  /c@2.0.0:
+    resolution: {integrity: sha512-AAAA}
+
+  /e@1.0.0:
+    resolution: {integrity: sha512-AAAA}
+    requiresBuild: true
+    dev: true
+    optional: true
+
+  /t@5.0.0:
+    resolution: {integrity: sha512-AAAA}
+    dependencies:
+      c: 2.0.0
+    optionalDependencies:
+      e: 1.0.0
+    dev: true
+"""
+
+PNPM_V9 = """\
+lockfileVersion: '9.0'
+
+settings:
+  autoInstallPeers: true
+  excludeLinksFromLockfile: false
+
+importers:
+
+  .:
+    dependencies:
+      a:
+        specifier: ^1.0.0
+        version: 1.2.0
+      b:
+        specifier: ^1.0.0
+        version: 1.0.0(c@2.0.0)
+    devDependencies:
+      t:
+        specifier: ^5.0.0
+        version: 5.0.0
+
+packages:
+
+  '@scope/d@3.1.0':
+    resolution: {integrity: sha512-AAAA}
+
+  a@1.2.0:
+    resolution: {integrity: sha512-AAAA}
+
+  b@1.0.0:
+    resolution: {integrity: sha512-AAAA}
+    peerDependencies:
+      c: '*'
+
+  c@2.0.0:
+    resolution: {integrity: sha512-AAAA}
+
+  e@1.0.0:
+    resolution: {integrity: sha512-AAAA}
+
+  t@5.0.0:
+    resolution: {integrity: sha512-AAAA}
+
+snapshots:
+
+  '@scope/d@3.1.0': {}
+
+  a@1.2.0:
+    dependencies:
+      c: 2.0.0
+
+  b@1.0.0(c@2.0.0):
+    dependencies:
+      '@scope/d': 3.1.0
+      c: 2.0.0
+
+  c@2.0.0: {}
+
+  e@1.0.0:
+    optional: true
+
+  t@5.0.0:
+    dependencies:
+      c: 2.0.0
+    optionalDependencies:
+      e: 1.0.0
+"""
+
+LOCKFILES = {
+    "yarn-classic": ("yarn.lock", YARN_CLASSIC, "yarn"),
+    "yarn-berry": ("yarn.lock", YARN_BERRY, "yarn"),
+    "pnpm-v5": ("pnpm-lock.yaml", PNPM_V5, "pnpm"),
+    "pnpm-v6": ("pnpm-lock.yaml", PNPM_V6, "pnpm"),
+    "pnpm-v9": ("pnpm-lock.yaml", PNPM_V9, "pnpm"),
+}
+
+
+def _shape(deps: dict) -> dict:
+    return {pkg_id: (meta["depth"], meta["direct"], meta["is_dev"], sorted(meta["dependencies"]))
+            for pkg_id, meta in deps.items()}
+
+
+def _write(tmp_path, filename, text, manifest=True):
+    if manifest:
+        (tmp_path / "package.json").write_text(json.dumps(MANIFEST), encoding="utf-8")
+    path = tmp_path / filename
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.fixture(scope="module")
+def expected():
+    return _shape(extract_dependencies(lockfile=io.BytesIO(NPM.encode("utf-8"))))
+
+
+def test_reference_project(expected):
+    assert expected == {
+        "a@1.2.0": (1, True, False, ["c@2.0.0"]),
+        "b@1.0.0": (1, True, False, ["@scope/d@3.1.0", "c@2.0.0"]),
+        "t@5.0.0": (1, True, True, ["c@2.0.0", "e@1.0.0"]),
+        "c@2.0.0": (2, False, False, []),
+        "@scope/d@3.1.0": (2, False, False, []),
+        "e@1.0.0": (2, False, True, []),
+    }
+
+
+@pytest.mark.parametrize("fmt", LOCKFILES)
+def test_every_format_matches_npm(fmt, expected, tmp_path):
+    filename, text, _ = LOCKFILES[fmt]
+    assert _shape(extract_dependencies(lockfile=_write(tmp_path, filename, text))) == expected
+
+
+@pytest.mark.parametrize("fmt", LOCKFILES)
+@pytest.mark.parametrize("chunk_size", [1, 7])
+def test_readers_stream_at_any_chunk_size(fmt, chunk_size):
+    _, text, kind = LOCKFILES[fmt]
+    whole = load_any_lockfile(io.BytesIO(text.encode("utf-8")), MANIFEST)
+    fp = io.BytesIO(text.encode("utf-8"))
+    read = read_pnpm_lock(fp, chunk_size) if kind == "pnpm" else read_yarn_lock(fp, MANIFEST, chunk_size)
+    assert read == whole
+
+
+@pytest.mark.parametrize("fmt", LOCKFILES)
+def test_detect_format(fmt):
+    _, text, kind = LOCKFILES[fmt]
+    assert detect_format(text.encode("utf-8")) == kind
+    assert detect_format(("\ufeff" + text.replace("\n", "\r\n"))[:200]) == kind
+    assert detect_format(NPM[:50]) == "npm"
+
+
+def test_yarn_classic_upload_without_manifest(expected):
+    # Unreferenced packages become direct; dev status is unknown
+    deps = _shape(extract_dependencies(lockfile=io.BytesIO(YARN_CLASSIC.encode("utf-8"))))
+    assert deps == {pkg_id: (depth, direct, False, children)
+                    for pkg_id, (depth, direct, _, children) in expected.items()}
+
+
+def test_yarn_classic_cycle_without_manifest():
+    text = 'x@^1:\n  version "1.0.0"\n  dependencies:\n    y "^1"\n\ny@^1:\n  version "1.0.0"\n' \
+           '  dependencies:\n    x "^1"\n'
+    lock = load_any_lockfile(io.BytesIO(text.encode("utf-8")))
+    assert lock["roots"] == {"x@1.0.0": False}
+
+
+def test_yarn_alias_resolves_to_real_package():
+    text = '"my-lodash@npm:lodash@^4":\n  version "4.17.21"\n'
+    lock = load_any_lockfile(io.BytesIO(text.encode("utf-8")))
+    assert list(lock["packages"]) == ["lodash@4.17.21"]
+
+
+def test_pnpm_workspace_links_are_not_packages():
+    text = PNPM_V9.replace(
+        "    devDependencies:\n",
+        "      lib:\n        specifier: workspace:*\n        version: link:packages/lib\n    devDependencies:\n",
+    )
+    lock = load_any_lockfile(io.BytesIO(text.encode("utf-8")))
+    assert set(lock["roots"]) == {"a@1.2.0", "b@1.0.0", "t@5.0.0"}
+
+
+@pytest.mark.parametrize("text, message", [
+    ('# yarn lockfile v1\n\na@^1:\n  version "1.0.0"\nstray text\n', "unexpected text at line 5"),
+    ('# yarn lockfile v1\n\na@^1:\n  resolved "x"\n', "no versioned entries"),
+    ("lockfileVersion: 'x'\n", "Unsupported pnpm lockfileVersion"),
+    ("lockfileVersion: '9.0'\n\npackages:\n   a@1.0.0:\n    resolution: {}\n", "odd indentation at line 4"),
+])
+def test_malformed_lockfiles(text, message):
+    with pytest.raises(LockfileFormatError, match=message):
+        load_any_lockfile(io.BytesIO(text.encode("utf-8")))
+
+
+def test_find_lockfiles_takes_one_per_project(tmp_path):
+    for relative in ("svc-a/package-lock.json", "svc-a/yarn.lock", "svc-b/pnpm-lock.yaml",
+                     "svc-c/yarn.lock", "svc-c/node_modules/dep/package-lock.json"):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+    assert [path.relative_to(tmp_path).as_posix() for path in find_lockfiles(tmp_path)] == \
+        ["svc-a/package-lock.json", "svc-b/pnpm-lock.yaml", "svc-c/yarn.lock"]
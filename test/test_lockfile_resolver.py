@@ -0,0 +1,71 @@
+"""walk_lockfile: dev flags and the normalized stream."""
+
+from pathlib import Path
+
+import pytest
+
+from extract_dependencies import build_dependency_map
+from lockfile_resolver import package_name_from_key, walk_lockfile
+from lockfile_stream import load_lockfile
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LOCKFILES = [ROOT_DIR / "test" / "package-lock.json", ROOT_DIR / "target_project" / "package-lock.json"]
+
+
+def _walk(lock_data):
+    return build_dependency_map(walk_lockfile(lock_data))
+
+
+@pytest.mark.parametrize("path", LOCKFILES, ids=lambda p: p.parent.name)
+def test_dev_flags_match_npm(path):
+    """A name@version is dev-only exactly when npm marks every copy of it dev."""
+    lock = load_lockfile(path)
+    npm_dev: dict = {}
+    for key, entry in lock["packages"].items():
+        if key:
+            pkg_id = f"{package_name_from_key(key, entry)}@{entry.get('version')}"
+            npm_dev[pkg_id] = npm_dev.get(pkg_id, True) and bool(entry.get("dev"))
+
+    deps = _walk(lock)
+    assert {pkg_id: meta["is_dev"] for pkg_id, meta in deps.items()} == \
+        {pkg_id: npm_dev[pkg_id] for pkg_id in deps}
+
+
+def test_prod_package_first_reached_through_dev_parent_stays_prod():
+    # shared sits at depth 2 under both; BFS reaches it from the dev side first
+    lock = {"packages": {
+        "": {"dependencies": {"app-lib": "^1"}, "devDependencies": {"a-tool": "^1"}},
+        "node_modules/a-tool": {"version": "1.0.0", "dev": True, "dependencies": {"shared": "^1"}},
+        "node_modules/app-lib": {"version": "1.0.0", "dependencies": {"shared": "^1"}},
+        "node_modules/shared": {"version": "1.0.0"},
+    }}
+    deps = _walk(lock)
+    assert deps["a-tool@1.0.0"]["is_dev"] is True
+    assert deps["app-lib@1.0.0"]["is_dev"] is False
+    assert deps["shared@1.0.0"]["is_dev"] is False
+    assert deps["shared@1.0.0"]["depth"] == 2
+
+
+def test_peer_of_prod_package_is_prod_but_not_an_edge():
+    lock = {"packages": {
+        "": {"dependencies": {"plugin": "^1"}, "devDependencies": {"host": "^1"}},
+        "node_modules/plugin": {"version": "1.0.0", "peerDependencies": {"host": "^1"}},
+        "node_modules/host": {"version": "1.0.0"},
+    }}
+    deps = _walk(lock)
+    assert deps["host@1.0.0"]["is_dev"] is False
+    assert deps["plugin@1.0.0"]["dependencies"] == []
+
+
+def test_nested_copies_resolve_from_the_requiring_package():
+    lock = {"packages": {
+        "": {"dependencies": {"a": "^1", "b": "^1"}},
+        "node_modules/a": {"version": "1.0.0", "dependencies": {"c": "^2"}},
+        "node_modules/a/node_modules/c": {"version": "2.0.0"},
+        "node_modules/b": {"version": "1.0.0", "dependencies": {"c": "^1"}},
+        "node_modules/c": {"version": "1.0.0"},
+    }}
+    deps = _walk(lock)
+    assert deps["a@1.0.0"]["dependencies"] == ["c@2.0.0"]
+    assert deps["b@1.0.0"]["dependencies"] == ["c@1.0.0"]
+    assert {meta["depth"] for pkg_id, meta in deps.items() if pkg_id.startswith("c@")} == {2}
@@ -0,0 +1,95 @@
+"""Streaming lockfile reader: chunk boundaries, skipping and errors."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from lockfile_stream import (
+    KEPT_FIELDS,
+    ChunkReader,
+    LockfileFormatError,
+    iter_text_lines,
+    load_lockfile,
+)
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LOCKFILE = ROOT_DIR / "test" / "package-lock.json"
+
+# Skipped blocks with strings that look like structure, and non-ASCII text
+TRICKY = {
+    "name": "tricky",
+    "dependencies": {"legacy": {"note": "a \"quoted\" } ] { [ value\\", "list": [1, [2, {"x": None}]]}},
+    "packages": {
+        "": {"name": "tricky", "dependencies": {"ünï": "^1"}},
+        "node_modules/ünï": {"version": "1.0.0", "description": "日本語 — ✓", "dev": True,
+                             "dependencies": {"a": "1"}, "engines": {"node": ">=18"}},
+        "node_modules/a": {"version": "2.0.0-beta.1", "optional": False, "link": False},
+    },
+    "lockfileVersion": 3,
+}
+
+
+def _slim(packages: dict) -> dict:
+    return {key: {field: entry[field] for field in KEPT_FIELDS if field in entry}
+            for key, entry in packages.items()}
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 4096])
+def test_matches_json_load_at_any_chunk_size(chunk_size):
+    data = LOCKFILE.read_bytes()
+    assert load_lockfile(io.BytesIO(data), chunk_size) == {"packages": _slim(json.loads(data)["packages"])}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 13])
+@pytest.mark.parametrize("as_text", [False, True], ids=["bytes", "text"])
+def test_multibyte_text_and_skipped_blocks(chunk_size, as_text):
+    text = json.dumps(TRICKY, ensure_ascii=False, indent=2)
+    fp = io.StringIO(text) if as_text else io.BytesIO("\ufeff".encode("utf-8") + text.encode("utf-8"))
+    assert load_lockfile(fp, chunk_size) == {"packages": _slim(TRICKY["packages"])}
+
+
+def test_value_cut_by_window_edge():
+    document = {"big": {f"k{i}": ["x" * i, {"n": i}] for i in range(200)}, "after": [1, 2]}
+    reader = ChunkReader(io.BytesIO(json.dumps(document).encode("utf-8")), 16)
+    result = {key: reader.value() for key in reader.members()}
+    assert result == document
+    assert reader.at_end()
+
+
+def test_skip_value_keeps_window_small():
+    document = {"skip": ["y" * 100] * 1000, "keep": True}
+    reader = ChunkReader(io.BytesIO(json.dumps(document).encode("utf-8")), 256)
+    seen = {}
+    for key in reader.members():
+        if key == "skip":
+            reader.skip_value()
+            assert len(reader.buf) < 1024
+        else:
+            seen[key] = reader.value()
+    assert seen == {"keep": True}
+
+
+@pytest.mark.parametrize("text, message", [
+    ('{"packages": {"": {"name": "x"}', "expected '}'"),
+    ('{"packages": {"": "unterminated', "unterminated string"),
+    ('{"packages": {}} {}', "trailing data"),
+    ('{"name": "x"}', "'packages' field missing"),
+    ('{"packages": {"": {"version": 1.2.3}}}', "Malformed lockfile"),
+    ('[1, 2]', "expected '{'"),
+])
+def test_malformed_input(text, message):
+    with pytest.raises(LockfileFormatError, match=message):
+        load_lockfile(io.BytesIO(text.encode("utf-8")), 4)
+
+
+def test_parsed_mapping_is_returned_unchanged():
+    lock = {"packages": {"": {"name": "x", "resolved": "kept"}}}
+    assert load_lockfile(lock) is lock
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 4096])
+def test_iter_text_lines(chunk_size):
+    data = "\ufeffone\r\ntwo — ✓\n\nlast".encode("utf-8")
+    assert list(iter_text_lines(io.BytesIO(data), chunk_size)) == ["one", "two — ✓", "", "last"]
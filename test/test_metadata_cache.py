@@ -0,0 +1,102 @@
+"""SQLite metadata cache: TTL freshness, validators and persistence."""
+
+import threading
+
+import pytest
+
+import metadata_cache
+from metadata_cache import MetadataCache
+
+SUMMARY = {"modified": "2024-01-02T00:00:00Z", "maintainer_count": 2, "latest_version": "1.2.3"}
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(metadata_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = MetadataCache(tmp_path / "meta.sqlite3", ttl=100)
+    yield cache
+    cache.close()
+
+
+def test_round_trip_with_validators(cache):
+    assert cache.get("left-pad") is None
+    cache.store("left-pad", SUMMARY, etag='W/"abc"', last_modified="Tue, 02 Jan 2024 00:00:00 GMT")
+    row = cache.get("left-pad")
+    assert row.summary == SUMMARY
+    assert row.etag == 'W/"abc"'
+    assert row.last_modified == "Tue, 02 Jan 2024 00:00:00 GMT"
+    assert row.fresh
+
+
+def test_rows_go_stale_after_ttl_and_touch_refreshes(cache, clock):
+    cache.store("a", SUMMARY, etag="e1")
+    clock.now += 99
+    assert cache.get("a").fresh
+    clock.now += 2
+    assert not cache.get("a").fresh
+
+    cache.touch("a")
+    row = cache.get("a")
+    assert row.fresh
+    assert row.fetched_at == clock.now
+    assert row.etag == "e1"  # touch keeps the validators
+
+
+def test_store_replaces_row(cache):
+    cache.store("a", SUMMARY, etag="old")
+    cache.store("a", {}, etag=None)  # negative entry for a 404
+    row = cache.get("a")
+    assert row.summary == {}
+    assert row.etag is None
+
+
+def test_count_stale(cache, clock):
+    cache.store("old", SUMMARY)
+    clock.now += 150
+    cache.store("new", SUMMARY)
+    assert cache.count_stale(["old", "new", "missing", "missing"]) == 2
+    assert cache.count_stale([]) == 0
+
+
+def test_rows_persist_across_instances(tmp_path, clock):
+    path = tmp_path / "nested" / "meta.sqlite3"
+    first = MetadataCache(path, ttl=100)
+    first.store("a", SUMMARY, etag="e")
+    first.close()
+    second = MetadataCache(path, ttl=100)
+    assert second.get("a").summary == SUMMARY
+    second.close()
+
+
+def test_in_memory_cache():
+    cache = MetadataCache(":memory:")
+    cache.store("a", SUMMARY)
+    assert cache.get("a").fresh
+    cache.close()
+
+
+def test_concurrent_writers(cache):
+    def write(start):
+        for i in range(start, start + 50):
+            cache.store(f"pkg-{i}", {"n": i})
+
+    threads = [threading.Thread(target=write, args=(i * 50,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(cache.get(f"pkg-{i}").summary == {"n": i} for i in range(400))
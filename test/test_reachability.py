@@ -0,0 +1,105 @@
+"""SCC / bitset blast radius against per-package upward walks."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from extract_dependencies import (
+    build_dependency_map,
+    build_reverse_dependencies,
+    compute_blast_radii,
+    new_package_entry,
+    simulate_compromise,
+)
+from lockfile_resolver import walk_lockfile
+from lockfile_stream import load_lockfile
+from reachability import (
+    bitset_positions,
+    csr_from_dependency_map,
+    dependent_sets_csr,
+    strongly_connected_components,
+    transitive_dependent_counts,
+)
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _random_map(seed: int, n: int = 60, edges: int = 150) -> dict:
+    """Random dependency map with cycles and self-loops."""
+    rng = random.Random(seed)
+    ids = [f"p{i}@1.0.0" for i in range(n)]
+    deps = {pkg_id: new_package_entry(f"p{i}", "1.0.0", 1, False) for i, pkg_id in enumerate(ids)}
+    for _ in range(edges):
+        parent, child = rng.choice(ids), rng.choice(ids)
+        if child not in deps[parent]["dependencies"]:
+            deps[parent]["dependencies"].append(child)
+    return deps
+
+
+def _recursive_dependents(pkg_id: str, reverse_map: dict, seen: set = None) -> set:
+    """The recursive upward walk reachability.py replaced, as a reference."""
+    seen = set() if seen is None else seen
+    for parent in reverse_map[pkg_id]:
+        if parent not in seen:
+            seen.add(parent)
+            _recursive_dependents(parent, reverse_map, seen)
+    return seen
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_counts_match_recursive_walk_and_simulate_compromise(seed):
+    deps = _random_map(seed)
+    reverse_map = build_reverse_dependencies(deps)
+    counts = transitive_dependent_counts(deps)
+    for pkg_id in deps:
+        expected = _recursive_dependents(pkg_id, reverse_map)
+        assert expected == simulate_compromise(pkg_id, deps, _reverse_map=reverse_map)
+        assert counts[pkg_id] == len(expected)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_dependent_sets_match_simulate_compromise(seed):
+    deps = _random_map(seed, n=40, edges=90)
+    ids, offsets, targets = csr_from_dependency_map(deps)
+    sets = dependent_sets_csr(offsets, targets, range(len(ids)))
+    for i, pkg_id in enumerate(ids):
+        assert {ids[j] for j in bitset_positions(sets[i])} == simulate_compromise(pkg_id, deps)
+
+
+def test_cycle_members_count_themselves():
+    deps = _random_map(0, n=4, edges=0)
+    a, b, c, d = deps
+    deps[a]["dependencies"] = [b]
+    deps[b]["dependencies"] = [c]
+    deps[c]["dependencies"] = [b, d]
+    deps[d]["dependencies"] = [d]
+    assert transitive_dependent_counts(deps) == {a: 0, b: 3, c: 3, d: 4}
+
+
+def test_components_match_networkx():
+    nx = pytest.importorskip("networkx")
+    deps = _random_map(3, n=80, edges=160)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(deps)
+    graph.add_edges_from((parent, child) for parent, meta in deps.items() for child in meta["dependencies"])
+    components = strongly_connected_components(deps)
+    assert sorted(map(sorted, components)) == sorted(map(sorted, nx.strongly_connected_components(graph)))
+
+
+def test_deep_chain_does_not_recurse():
+    # Deeper than the default recursion limit, which the old walk could not handle
+    deps = _random_map(0, n=5000, edges=0)
+    ids = list(deps)
+    for parent, child in zip(ids, ids[1:]):
+        deps[parent]["dependencies"] = [child]
+    counts = transitive_dependent_counts(deps)
+    assert [counts[pkg_id] for pkg_id in ids] == list(range(len(ids)))
+
+
+def test_compute_blast_radii_on_lockfile():
+    deps = build_dependency_map(walk_lockfile(load_lockfile(ROOT_DIR / "test" / "package-lock.json")))
+    compute_blast_radii(deps)
+    reverse_map = build_reverse_dependencies(deps)
+    for pkg_id, meta in deps.items():
+        assert meta["blast_radius"] == len(simulate_compromise(pkg_id, deps, _reverse_map=reverse_map))
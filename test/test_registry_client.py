@@ -0,0 +1,193 @@
+"""Asyncio registry client against a local http.server registry."""
+
+import asyncio
+import gzip
+import io
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from metadata_cache import MetadataCache
+from registry_client import RegistryClient, fetch_summaries, summarize_packument
+
+PACKUMENT = {
+    "_id": "demo",
+    "name": "demo",
+    "dist-tags": {"latest": "1.1.0", "next": "2.0.0-rc.1"},
+    "versions": {
+        version: {"name": "demo", "version": version, "dependencies": {"x": "^1"}, "readme": "{ \"not\": [json }"}
+        for version in ("1.0.0", "1.1.0", "2.0.0-rc.1")
+    },
+    "time": {"created": "2020-01-01T00:00:00.000Z", "1.0.0": "2020-01-01T00:00:00.000Z",
+             "modified": "2024-05-06T07:08:09.000Z"},
+    "maintainers": [{"name": "a"}, {"name": "b"}],
+}
+SUMMARY = {
+    "modified": "2024-05-06T07:08:09.000Z",
+    "created": "2020-01-01T00:00:00.000Z",
+    "maintainer_count": 2,
+    "latest_version": "1.1.0",
+    "version_count": 3,
+}
+ETAG = '"v1"'
+
+
+class Registry(BaseHTTPRequestHandler):
+    """Serves PACKUMENT under several framings, chosen by package name."""
+
+    protocol_version = "HTTP/1.1"
+    requests: list = []   # (path, headers, client address) per request
+    failures: dict = {}   # path → 503 responses still to send
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        Registry.requests.append((self.path, dict(self.headers), self.client_address))
+        body = json.dumps(PACKUMENT).encode("utf-8")
+        name = self.path.lstrip("/")
+
+        if Registry.failures.get(self.path):
+            Registry.failures[self.path] -= 1
+            self._send(503, b"busy", [("Content-Length", "4"), ("Retry-After", "0")])
+        elif name == "missing":
+            self._send(404, b"{}", [("Content-Length", "2")])
+        elif self.headers.get("If-None-Match") == ETAG:
+            self._send(304, headers=[("ETag", ETAG)])
+        elif name in ("demo", "retry"):
+            self._send(200, body, [("Content-Length", str(len(body))), ("ETag", ETAG),
+                                   ("Last-Modified", "Mon, 06 May 2024 07:08:09 GMT")])
+        elif name == "gzip-chunked":
+            data = gzip.compress(body)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(data), 97):
+                piece = data[start:start + 97]
+                self.wfile.write(f"{len(piece):x};ext=1\r\n".encode("ascii") + piece + b"\r\n")
+            self.wfile.write(b"0\r\nX-Trailer: t\r\n\r\n")
+        elif name == "until-close":
+            # HTTP/1.0 style: no length, the body ends when the server closes
+            self.protocol_version = "HTTP/1.0"
+            self.close_connection = True
+            self._send(200, body)
+        elif name == "garbage":
+            self._send(200, b"{not json", [("Content-Length", "9")])
+        else:
+            self._send(400, b"", [("Content-Length", "0")])
+
+
+@pytest.fixture
+def registry():
+    Registry.requests = []
+    Registry.failures = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Registry)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _run(registry, *names, cache=None, offline=False, **options):
+    async def run():
+        options.setdefault("backoff", 0.01)
+        async with RegistryClient(registry, **options) as client:
+            return [await client.fetch_summary(name, cache, offline) for name in names]
+
+    return asyncio.run(run())
+
+
+def test_summarize_packument_skips_versions():
+    assert summarize_packument(io.BytesIO(json.dumps(PACKUMENT).encode("utf-8"))) == SUMMARY
+
+
+@pytest.mark.parametrize("name", ["demo", "gzip-chunked", "until-close"])
+def test_body_framings(registry, name):
+    assert _run(registry, name) == [SUMMARY]
+    assert Registry.requests[0][1]["Accept-Encoding"] == "gzip"
+
+
+def test_keep_alive_reuses_one_connection(registry):
+    assert _run(registry, "demo", "gzip-chunked", "demo") == [SUMMARY] * 3
+    assert len({address for _, _, address in Registry.requests}) == 1
+
+
+def test_retries_503_then_succeeds(registry):
+    Registry.failures["/retry"] = 2
+    assert _run(registry, "retry") == [SUMMARY]
+    assert [path for path, _, _ in Registry.requests] == ["/retry"] * 3
+
+
+def test_gives_up_after_retries_and_logs(registry, caplog):
+    Registry.failures["/retry"] = 10
+    with caplog.at_level(logging.WARNING, logger="registry_client"):
+        assert _run(registry, "retry", retries=1) == [{}]
+    assert len(Registry.requests) == 2
+    assert "retry" in caplog.text
+
+
+def test_malformed_packument_falls_back_and_logs(registry, caplog):
+    with caplog.at_level(logging.WARNING, logger="registry_client"):
+        assert _run(registry, "garbage", retries=0) == [{}]
+    assert "garbage" in caplog.text
+
+
+def test_unreachable_registry(caplog):
+    with caplog.at_level(logging.WARNING, logger="registry_client"):
+        assert _run("http://127.0.0.1:9", "demo", retries=0) == [{}]
+    assert "demo" in caplog.text
+
+
+def test_cache_stores_revalidates_and_skips_fresh_rows(registry, tmp_path):
+    cache = MetadataCache(tmp_path / "meta.sqlite3", ttl=3600)
+    assert _run(registry, "demo", cache=cache) == [SUMMARY]
+    row = cache.get("demo")
+    assert (row.summary, row.etag) == (SUMMARY, ETAG)
+
+    # Fresh row: no request at all
+    assert _run(registry, "demo", cache=cache) == [SUMMARY]
+    assert len(Registry.requests) == 1
+
+    # Stale row: conditional request, 304, row touched
+    cache.ttl = 0
+    assert _run(registry, "demo", cache=cache) == [SUMMARY]
+    headers = Registry.requests[-1][1]
+    assert headers["If-None-Match"] == ETAG
+    assert headers["If-Modified-Since"] == "Mon, 06 May 2024 07:08:09 GMT"
+    assert cache.get("demo").fetched_at > row.fetched_at
+    cache.close()
+
+
+def test_404_is_stored_as_negative_entry(registry, tmp_path):
+    cache = MetadataCache(tmp_path / "meta.sqlite3")
+    assert _run(registry, "missing", cache=cache) == [{}]
+    assert cache.get("missing").summary == {}
+    cache.close()
+
+
+def test_offline_uses_only_the_cache(registry, tmp_path):
+    cache = MetadataCache(tmp_path / "meta.sqlite3", ttl=0)
+    cache.store("demo", SUMMARY)
+    assert _run(registry, "demo", "other", cache=cache, offline=True) == [SUMMARY, {}]
+    assert Registry.requests == []
+    cache.close()
+
+
+def test_fetch_summaries_reports_progress(registry):
+    progress = []
+    names = ["demo", "gzip-chunked", "missing"]
+    result = fetch_summaries(names, registry, concurrency=2, on_progress=lambda *step: progress.append(step))
+    assert result == {"demo": SUMMARY, "gzip-chunked": SUMMARY, "missing": {}}
+    assert progress == [(1, 3), (2, 3), (3, 3)]
@@ -0,0 +1,85 @@
+"""Snapshots: write → load round trip, and analyses served from the mapping."""
+
+from pathlib import Path
+
+import pytest
+
+from analysis_store import AnalysisStore
+from extract_dependencies import analyze_dependency_map, compute_structural_health, extract_dependencies
+from graph_clusters import ClusterTree
+from graph_core import DependencyGraph
+from graph_index import GraphIndex
+from graph_payload import graph_payload, node_positions
+from snapshot import Snapshot, load_snapshot, open_snapshot, write_snapshot
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LOCKFILE = ROOT_DIR / "test" / "package-lock.json"
+
+
+@pytest.fixture(scope="module")
+def deps():
+    deps = extract_dependencies(lockfile=LOCKFILE)
+    # Registry fields of every kind: whole and fractional numbers, and unknown
+    for i, meta in enumerate(deps.values()):
+        meta["days_since_publish"] = None if i % 3 == 0 else i * 7
+        meta["package_age_days"] = i + 0.5
+        meta["maintainer_count"] = i % 4 or None
+        meta["version_count"] = i
+        meta["latest_version"] = None if i % 2 else f"{i}.0.0"
+    analyze_dependency_map(deps)
+    return deps
+
+
+def test_write_load_round_trip(deps, tmp_path):
+    path = tmp_path / "analysis.dbs"
+    meta = {"health": compute_structural_health(deps), "created_at": 1.5}
+    write_snapshot(deps, path, meta=meta)
+
+    loaded, loaded_meta = load_snapshot(path)
+    assert loaded == deps
+    assert list(loaded) == list(deps)
+    assert loaded_meta == meta
+
+
+def test_mapped_view_matches_map(deps, tmp_path):
+    path = tmp_path / "analysis.dbs"
+    write_snapshot(deps, path)
+
+    graph, _ = open_snapshot(path)
+    assert not graph.risk_score.flags.writeable  # still backed by the file
+    assert {pkg_id: dict(meta) for pkg_id, meta in graph.view().items()} == deps
+    with Snapshot(path) as snapshot:
+        assert graph.structural_health() == snapshot.to_graph().structural_health()
+
+
+def test_mapped_graph_serves_like_the_map(deps, tmp_path):
+    path = tmp_path / "analysis.dbs"
+    write_snapshot(deps, path)
+    graph, _ = open_snapshot(path)
+    built = DependencyGraph.from_dependency_map(deps)
+
+    mapped, plain = GraphIndex.from_graph(graph), GraphIndex(deps)
+    assert mapped.reverse_map == plain.reverse_map
+    assert mapped.positions == plain.positions
+    targets = list(deps)
+    assert mapped.simulate_batch(targets) == plain.simulate_batch(targets)
+    for pkg_id in targets:
+        assert sorted(mapped.dominated(pkg_id)) == sorted(plain.dominated(pkg_id))
+        assert mapped.attack_paths(pkg_id, 3) == plain.attack_paths(pkg_id, 3)
+
+    assert graph_payload(graph) == graph_payload(built)
+    assert ClusterTree(graph, node_positions(graph)).top_view() == \
+        ClusterTree(built, node_positions(built)).top_view()
+
+
+def test_store_reopens_from_the_mapping(deps, tmp_path):
+    health = compute_structural_health(deps)
+    created = AnalysisStore(tmp_path).create(deps, health)
+
+    analysis = AnalysisStore(tmp_path).get(created.id)
+    assert analysis.health == health
+    assert not analysis.graph.fanin.flags.writeable
+    assert {pkg_id: dict(meta) for pkg_id, meta in analysis.deps.items()} == deps
+    target = next(pkg_id for pkg_id, meta in deps.items() if meta["blast_radius"])
+    assert analysis.index.simulate(target) == created.index.simulate(target)
+    assert analysis.clusters.top_view() == created.clusters.top_view()
@@ -0,0 +1,184 @@
+"""Per-analysis storage for the web app.
+
+Every upload becomes an Analysis with its own ID, dependency map, health
+summary and artifact directory (the graph payload lives there). Analyses are
+written to disk once as a binary snapshot and kept in an in-memory LRU
+bounded by an approximate memory budget; an evicted or unknown-to-this-process
+analysis is reloaded from its snapshot on demand, so several WSGI worker
+processes can serve the same analysis.
+
+A reloaded analysis keeps the snapshot mapped: its DependencyGraph reads the
+CSR and metric columns from the file, ``deps`` is the graph's read-through
+view, and the index, cluster tree and graph payload are built from the
+columns, so no per-package dicts are created to serve it.
+"""
+
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+from graph_clusters import ClusterTree
+from graph_core import DependencyGraph
+from graph_index import GraphIndex
+from graph_payload import node_positions, read_positions
+from snapshot import SnapshotError, open_snapshot, write_snapshot
+
+ANALYSIS_DIR = Path(__file__).resolve().parent.parent / "data" / "analyses"
+MEMORY_BUDGET = 512 * 1024 * 1024  # bytes of analyses kept in memory (estimated)
+MAX_STORED_ANALYSES = 200          # analyses kept on disk; oldest are deleted
+SNAPSHOT_FILE = "analysis.dbs"
+GRAPH_ARTIFACT = "graph.json"      # nodes/edges payload (graph_payload.py)
+
+# Rough in-memory cost of one dependency-map entry and one edge
+_BYTES_PER_PACKAGE = 1200
+_BYTES_PER_EDGE = 120
+
+_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def estimate_size(dependency_map: dict) -> int:
+    edges = sum(len(meta["dependencies"]) for meta in dependency_map.values())
+    return len(dependency_map) * _BYTES_PER_PACKAGE + edges * _BYTES_PER_EDGE
+
+
+class Analysis:
+    """One analyzed lockfile: dependency map, health summary and artifact dir.
+
+    deps is a plain dependency map for a fresh analysis, or the view of graph
+    (a DependencyGraph mapped from the snapshot) for a reloaded one.
+    """
+
+    def __init__(self, analysis_id: str, deps, health: dict, directory: Path,
+                 created_at: float = None, graph: DependencyGraph = None):
+        self.id = analysis_id
+        self.deps = deps
+        self.health = health
+        self.directory = directory
+        self.created_at = created_at or time.time()
+        if graph is None:
+            self.size = estimate_size(deps)
+        else:
+            self.size = len(graph) * _BYTES_PER_PACKAGE + graph.edge_count * _BYTES_PER_EDGE
+        self._graph = graph
+        self._graph_lock = threading.Lock()
+        self._positions = None
+        self._positions_lock = threading.Lock()
+        self._index = None
+        self._index_lock = threading.Lock()
+        self._clusters = None
+        self._clusters_lock = threading.Lock()
+
+    @property
+    def graph(self) -> DependencyGraph:
+        """Columnar graph of deps, built on first use unless loaded from the snapshot."""
+        with self._graph_lock:
+            if self._graph is None:
+                self._graph = DependencyGraph.from_dependency_map(self.deps)
+            return self._graph
+
+    @property
+    def positions(self) -> tuple:
+        """(x, y) node layout shared by the graph payload and the cluster view:
+        read back from the stored payload if there is one, else computed once."""
+        with self._positions_lock:
+            if self._positions is None:
+                graph = self.graph
+                self._positions = (read_positions(self.artifact(GRAPH_ARTIFACT), len(graph))
+                                   or node_positions(graph))
+            return self._positions
+
+    @property
+    def index(self) -> GraphIndex:
+        """Compromise-simulation index, built on first use."""
+        with self._index_lock:
+            if self._index is None:
+                self._index = GraphIndex.from_graph(self.graph)
+            return self._index
+
+    @property
+    def clusters(self) -> ClusterTree:
+        """Level-of-detail cluster hierarchy for the graph page, built on first use."""
+        with self._clusters_lock:
+            if self._clusters is None:
+                self._clusters = ClusterTree(self.graph, self.positions)
+            return self._clusters
+
+    def artifact(self, name: str) -> Path:
+        return self.directory / name
+
+
+class AnalysisStore:
+    """Analysis ID → Analysis, LRU in memory and persisted under ANALYSIS_DIR."""
+
+    def __init__(self, root: Path = ANALYSIS_DIR, memory_budget: int = MEMORY_BUDGET,
+                 max_stored: int = MAX_STORED_ANALYSES):
+        self.root = Path(root)
+        self.memory_budget = memory_budget
+        self.max_stored = max_stored
+        self._analyses: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def create(self, deps: dict, health: dict) -> Analysis:
+        analysis_id = uuid.uuid4().hex
+        directory = self.root / analysis_id
+        directory.mkdir(parents=True, exist_ok=True)
+        analysis = Analysis(analysis_id, deps, health, directory)
+
+        write_snapshot(deps, directory / SNAPSHOT_FILE,
+                       meta={"created_at": analysis.created_at, "health": health})
+
+        self._remember(analysis)
+        self._prune_disk()
+        return analysis
+
+    def get(self, analysis_id: str):
+        """Return the Analysis, reloading it from disk if needed; None if unknown."""
+        if not analysis_id or not _ID_PATTERN.fullmatch(analysis_id):
+            return None
+
+        with self._lock:
+            analysis = self._analyses.get(analysis_id)
+            if analysis is not None:
+                self._analyses.move_to_end(analysis_id)
+                return analysis
+
+        directory = self.root / analysis_id
+        try:
+            graph, stored = open_snapshot(directory / SNAPSHOT_FILE)
+        except (OSError, SnapshotError):
+            return None
+
+        analysis = Analysis(analysis_id, graph.view(), stored["health"], directory,
+                            created_at=stored.get("created_at"), graph=graph)
+        self._remember(analysis)
+        return analysis
+
+    def _remember(self, analysis: Analysis) -> None:
+        with self._lock:
+            previous = self._analyses.pop(analysis.id, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._analyses[analysis.id] = analysis
+            self._bytes += analysis.size
+            # Always keep the newest analysis, even if it alone exceeds the budget
+            while self._bytes > self.memory_budget and len(self._analyses) > 1:
+                _, evicted = self._analyses.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def _prune_disk(self) -> None:
+        try:
+            directories = [d for d in self.root.iterdir() if d.is_dir() and _ID_PATTERN.fullmatch(d.name)]
+        except OSError:
+            return
+        directories.sort(key=lambda d: d.stat().st_mtime)
+        for directory in directories[:max(0, len(directories) - self.max_stored)]:
+            with self._lock:
+                evicted = self._analyses.pop(directory.name, None)
+                if evicted is not None:
+                    self._bytes -= evicted.size
+            shutil.rmtree(directory, ignore_errors=True)
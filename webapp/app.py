@@ -1,602 +1,189 @@
 import json
+import os
 import sys
 from pathlib import Path
 
-import networkx as nx
-from flask import Flask, render_template, request, jsonify
-from pyvis.network import Network
+from flask import Flask, Response, render_template, request, jsonify, send_file
 
 BASE_DIR = Path(__file__).resolve().parent
 ROOT_DIR = BASE_DIR.parent
 TEMPLATE_DIR = BASE_DIR / "templates"
-GRAPH_HTML = TEMPLATE_DIR / "graph.html"
 
 sys.path.insert(0, str(ROOT_DIR / "ingestion" / "npm"))
 
 from extract_dependencies import (
     extract_dependencies,
-    compute_fanout,
-    compute_blast_radii,
-    detect_chokepoints,
-    compute_risk_scores,
+    analyze_dependency_map,
     compute_structural_health,
-    simulate_compromise,
-    build_reverse_dependencies,
 )
-
-app = Flask(__name__)
-app.config["MAX_CONTENT_LENGTH"] = 32 * 1024 * 1024
-
-# In-memory cache for current analysis session
-analysis_cache: dict = {}
-health_cache: dict = {}
+from analysis_store import GRAPH_ARTIFACT, AnalysisStore
+from incremental import reanalyze, risk_delta
+from jobs import JobQueue
+from result_cache import ResultCache, digest_stream, result_key
+from lockfile_formats import load_any_lockfile, lockfile_package_names
+from lockfile_stream import LockfileFormatError
+from metadata_cache import get_default_cache
+from graph_payload import is_current, write_graph_payload
+from graph_clusters import LOD_THRESHOLD
+from graph_index import MAX_PATHS, overlap_stats
+from package_filter import select_packages
+from instrumentation import METRICS, Recorder, count, enable_allocation_tracking, stage
+
+app = Flask(__name__, static_folder=str(ROOT_DIR / "lib"), static_url_path="/lib")
+app.config["MAX_CONTENT_LENGTH"] = 64 * 1024 * 1024
+
+MAX_LOCKFILE_PACKAGES = 50000  # hard cap on `packages` entries per upload
+ENRICH_FETCH_LIMIT = 500       # max registry fetches (cache misses) per upload before enrichment is skipped
+SSE_HEARTBEAT = 15             # seconds between keep-alive comments on idle event streams
+CHOKEPOINT_FANIN = 5           # chokepoint thresholds used by the web pipeline
+CHOKEPOINT_DEPTH = 2
+PIPELINE_VERSION = 2           # bump when scoring changes so cached results are not reused
+BATCH_MAX_TARGETS = 5000       # targets per /simulate/batch request
+DOMINATED_LIST_LIMIT = 200     # dominated package IDs listed in /node_metadata
+
+# Allocation peaks per stage need tracemalloc, which slows every request down
+if os.environ.get("DEPBLAST_TRACK_ALLOCATIONS"):
+    enable_allocation_tracking()
+
+# Analyses are keyed by ID so concurrent users never see each other's graph
+analysis_store = AnalysisStore()
+job_queue = JobQueue()
+result_cache = ResultCache()
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def risk_level_to_color(level: str) -> str:
-    return {
-        "critical": "#ef4444",
-        "high":     "#f97316",
-        "medium":   "#f59e0b",
-        "low":      "#22c55e",
-        "unknown":  "#64748b",
-    }.get(level, "#64748b")
-
-
-def build_dependency_graph(dependency_map: dict) -> None:
-    """Build and save the interactive PyVis graph with click-to-simulate support."""
-    graph = nx.DiGraph()
-
-    for pkg, meta in dependency_map.items():
-        graph.add_node(
-            pkg,
-            depth=meta["depth"],
-            fanout=meta["fanout"],
-            blast=meta["blast_radius"],
-            risk=meta["risk_score"],
-            level=meta["risk_level"],
-            is_dev=meta["is_dev"],
-            chokepoint=meta["is_chokepoint"],
-        )
-        for child in meta["dependencies"]:
-            graph.add_edge(pkg, child)
-
-    net = Network(
-        height="100vh",
-        width="100%",
-        bgcolor="#060d1a",
-        font_color="#94a3b8",
-        directed=True,
-    )
-
-    net.set_options("""
-    var options = {
-      "physics": {
-        "enabled": true,
-        "solver": "forceAtlas2Based",
-        "forceAtlas2Based": {
-          "gravitationalConstant": -120,
-          "centralGravity": 0.006,
-          "springLength": 280,
-          "springConstant": 0.025,
-          "damping": 0.42,
-          "avoidOverlap": 1
-        },
-        "stabilization": { "enabled": true, "iterations": 2000, "updateInterval": 25, "fit": true },
-        "minVelocity": 0.75
-      },
-      "interaction": {
-        "hover": true,
-        "tooltipDelay": 80,
-        "hideEdgesOnDrag": true,
-        "zoomView": true,
-        "zoomSpeed": 1.1
-      },
-      "nodes": { "scaling": { "min": 8, "max": 55 } },
-      "edges": {
-        "color": { "color": "#1e3a5f", "highlight": "#3b82f6", "hover": "#60a5fa" },
-        "smooth": { "type": "continuous" },
-        "arrows": { "to": { "enabled": true, "scaleFactor": 0.5 } }
-      }
-    }
-    """)
-
-    for node, attrs in graph.nodes(data=True):
-        color = risk_level_to_color(attrs.get("level", "unknown"))
-        size = 8 + min(attrs.get("fanout", 0) * 2, 40) + (5 if attrs.get("chokepoint") else 0)
-        border = "#fbbf24" if attrs.get("chokepoint") else color
-        shape = "diamond" if attrs.get("chokepoint") else ("dot" if not attrs.get("is_dev") else "square")
-
-        meta = dependency_map[node]
-        maintainer_line = f"<br>Maintainers: {meta.get('maintainer_count', '?')}" if meta.get("maintainer_count") is not None else ""
-        stale_line = f"<br>Last publish: {meta.get('days_since_publish', '?')} days ago" if meta.get("days_since_publish") is not None else ""
-
-        net.add_node(
-            node,
-            label=meta["name"],
-            size=size,
-            color={"background": color, "border": border, "highlight": {"background": "#ffffff", "border": "#fbbf24"}},
-            borderWidth=3 if attrs.get("chokepoint") else 1,
-            shape=shape,
-            title=(
-                f"<div style='font-family:monospace;padding:8px;max-width:260px'>"
-                f"<b style='color:#e2e8f0'>{node}</b><br>"
-                f"<span style='color:{color}'>▲ {attrs.get('level','?').upper()}</span><br>"
-                f"Risk Score: <b>{attrs.get('risk', 0):.1f}</b><br>"
-                f"Depth: {attrs.get('depth', 0)} | Fan-in: {attrs.get('fanout', 0)}<br>"
-                f"Blast Radius: <b>{attrs.get('blast', 0)}</b> pkgs"
-                f"{maintainer_line}{stale_line}<br>"
-                f"{'🎯 CHOKEPOINT' if attrs.get('chokepoint') else ''}"
-                f"{'[DEV]' if attrs.get('is_dev') else '[PROD]'}"
-                f"</div>"
-            )
-        )
-
-    for src, dst in graph.edges():
-        net.add_edge(src, dst, width=1)
-
-    TEMPLATE_DIR.mkdir(exist_ok=True)
-    net.save_graph(str(GRAPH_HTML))
-
-    # Inject custom styles + click-to-simulate JS
-    _inject_graph_enhancements()
-
-
-def _inject_graph_enhancements():
-    """Read the raw pyvis output and inject our custom UI layer."""
-    html = GRAPH_HTML.read_text(encoding="utf-8")
-
-    custom_css = """
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=JetBrains+Mono:wght@400;500&display=swap');
-    *, *::before, *::after { box-sizing: border-box; margin: 0; padding: 0; }
-    html, body { height: 100%; width: 100%; overflow: hidden; background: #060d1a; font-family: 'Inter', sans-serif; }
-    .card, .card-body { border: none !important; padding: 0 !important; margin: 0 !important; background: transparent !important; }
-    #mynetwork {
-        position: fixed !important; inset: 0 !important;
-        width: 100vw !important; height: 100vh !important;
-        background: #060d1a !important; border: none !important;
-    }
+def build_dependency_graph(graph, output_path: Path, positions: tuple = None) -> None:
+    """Write the nodes/edges payload the static graph page (templates/graph.html)
+    draws, from an analysis' DependencyGraph and, if known, its node positions."""
+    write_graph_payload(graph, output_path, positions)
 
-    /* ── Loading bar ── */
-    #loadingBar {
-        position: fixed !important; inset: 0 !important;
-        width: 100% !important; height: 100% !important;
-        background: #060d1a !important;
-        display: flex !important; align-items: center !important; justify-content: center !important;
-        z-index: 9999; transition: opacity 0.6s ease !important;
-    }
-    div.outerBorder {
-        position: relative !important; top: auto !important;
-        width: 420px !important; height: auto !important;
-        background: rgba(6,13,26,0.97) !important;
-        border: 1px solid rgba(59,130,246,0.3) !important;
-        border-radius: 18px !important;
-        box-shadow: 0 0 60px rgba(59,130,246,0.12), 0 25px 50px rgba(0,0,0,0.6) !important;
-        padding: 36px 32px 32px !important;
-        overflow: hidden; filter: none !important;
-    }
-    div.outerBorder::before {
-        content: ''; position: absolute; top: 0; left: 0; right: 0; height: 2px;
-        background: linear-gradient(90deg, transparent, #3b82f6, #22c55e, transparent);
-        animation: scanline 2s ease-in-out infinite;
-    }
-    @keyframes scanline { 0% { transform: translateX(-100%); } 100% { transform: translateX(100%); } }
-
-    .db-loading-header { display: flex; align-items: center; gap: 14px; margin-bottom: 28px; }
-    .db-spinner {
-        width: 44px; height: 44px; flex-shrink: 0; border-radius: 50%;
-        border: 3px solid rgba(59,130,246,0.2);
-        border-top-color: #3b82f6; border-right-color: #22c55e;
-        animation: db-spin 0.9s linear infinite;
-    }
-    @keyframes db-spin { 100% { transform: rotate(360deg); } }
-    .db-loading-title { font-family: 'JetBrains Mono', monospace; font-size: 0.85rem; font-weight: 600; color: #e2e8f0; letter-spacing: 0.06em; text-transform: uppercase; margin-bottom: 4px; }
-    .db-loading-sub { font-family: 'JetBrains Mono', monospace; font-size: 0.72rem; color: #3b82f6; }
-
-    #border { position: relative !important; top: auto !important; left: auto !important; width: 100% !important; height: 6px !important; border-radius: 999px !important; border: none !important; background: rgba(30,41,59,0.8) !important; box-shadow: none !important; overflow: hidden; margin-top: 0 !important; }
-    #bar { position: absolute !important; top: 0 !important; left: 0 !important; height: 100% !important; border-radius: 999px !important; border: none !important; background: linear-gradient(90deg, #2563eb, #22c55e) !important; box-shadow: 0 0 10px rgba(59,130,246,0.5) !important; transition: width 0.3s ease !important; min-width: 4px !important; }
-    #text { position: relative !important; top: auto !important; left: auto !important; width: 100% !important; height: auto !important; font-family: 'JetBrains Mono', monospace !important; font-size: 0.72rem !important; color: #3b82f6 !important; text-align: right; margin: 8px 0 0 !important; font-weight: 600; }
-
-    /* ── Sidebar panel ── */
-    #db-sidebar {
-        position: fixed; top: 20px; right: 20px; bottom: 20px;
-        width: 320px; z-index: 100;
-        background: rgba(6, 13, 26, 0.93);
-        border: 1px solid rgba(59,130,246,0.25);
-        border-radius: 16px;
-        box-shadow: 0 0 40px rgba(0,0,0,0.5), 0 0 0 1px rgba(255,255,255,0.03);
-        display: none; flex-direction: column;
-        overflow: hidden;
-        backdrop-filter: blur(16px);
-        animation: slideIn 0.25s ease;
-    }
-    @keyframes slideIn { from { opacity: 0; transform: translateX(20px); } to { opacity: 1; transform: translateX(0); } }
-    #db-sidebar.open { display: flex; }
 
-    .sb-header {
-        padding: 18px 20px 14px;
-        border-bottom: 1px solid rgba(255,255,255,0.06);
-        display: flex; align-items: flex-start; justify-content: space-between; gap: 10px;
-    }
-    .sb-pkg-name { font-family: 'JetBrains Mono', monospace; font-size: 0.82rem; color: #e2e8f0; font-weight: 600; word-break: break-all; line-height: 1.4; }
-    .sb-version { font-family: 'JetBrains Mono', monospace; font-size: 0.72rem; color: #64748b; margin-top: 2px; }
-    .sb-close { background: none; border: none; color: #64748b; cursor: pointer; font-size: 1.1rem; padding: 2px; flex-shrink: 0; line-height: 1; transition: color 0.15s; }
-    .sb-close:hover { color: #e2e8f0; }
-
-    .sb-body { flex: 1; overflow-y: auto; padding: 16px 20px; display: flex; flex-direction: column; gap: 14px; }
-    .sb-body::-webkit-scrollbar { width: 4px; }
-    .sb-body::-webkit-scrollbar-track { background: transparent; }
-    .sb-body::-webkit-scrollbar-thumb { background: rgba(59,130,246,0.3); border-radius: 2px; }
-
-    .sb-badge { display: inline-flex; align-items: center; gap: 6px; padding: 4px 10px; border-radius: 6px; font-size: 0.72rem; font-weight: 700; letter-spacing: 0.06em; text-transform: uppercase; font-family: 'JetBrains Mono', monospace; }
-    .badge-critical { background: rgba(239,68,68,0.15); color: #ef4444; border: 1px solid rgba(239,68,68,0.3); }
-    .badge-high     { background: rgba(249,115,22,0.15); color: #f97316; border: 1px solid rgba(249,115,22,0.3); }
-    .badge-medium   { background: rgba(245,158,11,0.15); color: #f59e0b; border: 1px solid rgba(245,158,11,0.3); }
-    .badge-low      { background: rgba(34,197,94,0.15);  color: #22c55e; border: 1px solid rgba(34,197,94,0.3); }
-
-    .sb-metric-row { display: flex; flex-direction: column; gap: 8px; }
-    .sb-metric { display: flex; justify-content: space-between; align-items: center; }
-    .sb-metric-label { font-size: 0.78rem; color: #64748b; }
-    .sb-metric-value { font-family: 'JetBrains Mono', monospace; font-size: 0.82rem; color: #cbd5e1; font-weight: 500; }
-    .sb-metric-value.accent { color: #3b82f6; font-weight: 700; }
-
-    .sb-risk-bar-wrap { height: 6px; background: rgba(255,255,255,0.06); border-radius: 3px; overflow: hidden; margin-top: 4px; }
-    .sb-risk-bar { height: 100%; border-radius: 3px; transition: width 0.4s ease; }
-
-    .sb-section-title { font-size: 0.7rem; font-weight: 700; letter-spacing: 0.1em; text-transform: uppercase; color: #475569; margin-bottom: 2px; }
-
-    .sb-chokepoint-badge {
-        display: flex; align-items: center; gap: 8px; padding: 10px 12px;
-        background: rgba(251,191,36,0.08); border: 1px solid rgba(251,191,36,0.25);
-        border-radius: 10px; font-size: 0.78rem; color: #fbbf24;
-    }
-
-    .sb-footer { padding: 14px 20px; border-top: 1px solid rgba(255,255,255,0.06); display: flex; flex-direction: column; gap: 8px; }
+def _run_full_analysis(lock_data, enrich_npm: bool = False, progress=None) -> dict:
+    """Run the full DepBlast analysis pipeline and return the dependency map.
 
-    .btn-simulate {
-        width: 100%; padding: 11px; border: none; border-radius: 10px; cursor: pointer;
-        font-family: 'Inter', sans-serif; font-size: 0.82rem; font-weight: 600;
-        background: linear-gradient(135deg, #dc2626, #991b1b);
-        color: white; letter-spacing: 0.04em;
-        box-shadow: 0 4px 14px rgba(220,38,38,0.3);
-        transition: all 0.2s ease;
-    }
-    .btn-simulate:hover { transform: translateY(-1px); box-shadow: 0 6px 20px rgba(220,38,38,0.4); }
-    .btn-simulate:disabled { opacity: 0.5; cursor: not-allowed; transform: none; }
-
-    .btn-reset {
-        width: 100%; padding: 9px; border: 1px solid rgba(255,255,255,0.1); border-radius: 10px; cursor: pointer;
-        font-family: 'Inter', sans-serif; font-size: 0.78rem; font-weight: 500;
-        background: transparent; color: #64748b;
-        transition: all 0.2s ease;
-    }
-    .btn-reset:hover { border-color: rgba(255,255,255,0.2); color: #94a3b8; }
-
-    /* ── Simulation Overlay ── */
-    #db-sim-result {
-        position: fixed; bottom: 20px; left: 50%; transform: translateX(-50%);
-        background: rgba(6,13,26,0.95); border: 1px solid rgba(220,38,38,0.4);
-        border-radius: 12px; padding: 14px 22px;
-        display: none; align-items: center; gap: 12px;
-        font-size: 0.82rem; color: #e2e8f0;
-        box-shadow: 0 0 30px rgba(220,38,38,0.2);
-        backdrop-filter: blur(16px); z-index: 200;
-        animation: fadeUp 0.25s ease;
-        white-space: nowrap;
-    }
-    #db-sim-result.show { display: flex; }
-    @keyframes fadeUp { from { opacity: 0; transform: translate(-50%, 10px); } to { opacity: 1; transform: translate(-50%, 0); } }
-    .sim-count { font-family: 'JetBrains Mono', monospace; font-weight: 700; color: #ef4444; font-size: 1.1rem; }
-
-    /* ── Top-left legend ── */
-    #db-legend {
-        position: fixed; top: 20px; left: 20px; z-index: 100;
-        background: rgba(6,13,26,0.85); border: 1px solid rgba(255,255,255,0.06);
-        border-radius: 12px; padding: 12px 16px;
-        backdrop-filter: blur(12px);
-        display: flex; flex-direction: column; gap: 6px;
-    }
-    .legend-row { display: flex; align-items: center; gap: 8px; font-size: 0.72rem; color: #64748b; }
-    .legend-dot { width: 10px; height: 10px; border-radius: 50%; flex-shrink: 0; }
-    .legend-diamond { width: 10px; height: 10px; transform: rotate(45deg); flex-shrink: 0; background: #fbbf24; }
-    </style>
+    progress, if given, is called as progress(stage, **fields) as each stage
+    starts; enrichment additionally reports done/total about once per percent.
     """
+    def report(stage, **fields):
+        if progress is not None:
+            progress(stage, **fields)
+
+    def report_enrich(done, total):
+        if done == total or done % max(1, total // 100) == 0:
+            report("enrich", done=done, total=total)
+
+    if not isinstance(lock_data, dict):
+        with stage("parse"):
+            lock_data = load_any_lockfile(lock_data)
+    report("parse", packages=len(lock_data["packages"]))
+    deps = extract_dependencies(enrich_npm=enrich_npm, lockfile=lock_data, on_progress=report_enrich)
+    report("blast", packages=len(deps))
+    analyze_dependency_map(deps, CHOKEPOINT_FANIN, CHOKEPOINT_DEPTH)
+    return deps
 
-    sidebar_html = """
-    <!-- DepBlast Sidebar -->
-    <div id="db-sidebar">
-      <div class="sb-header">
-        <div>
-          <div class="sb-pkg-name" id="sb-name">—</div>
-          <div class="sb-version" id="sb-version"></div>
-        </div>
-        <button class="sb-close" id="sb-close">✕</button>
-      </div>
-      <div class="sb-body">
-        <div id="sb-badge-wrap"></div>
-        <div id="sb-chokepoint-wrap"></div>
-
-        <div class="sb-section-title">Risk Metrics</div>
-        <div class="sb-metric-row">
-          <div class="sb-metric">
-            <span class="sb-metric-label">Risk Score</span>
-            <span class="sb-metric-value accent" id="sb-risk-score">—</span>
-          </div>
-          <div class="sb-risk-bar-wrap"><div class="sb-risk-bar" id="sb-risk-bar" style="width:0%"></div></div>
-
-          <div class="sb-metric"><span class="sb-metric-label">Blast Radius</span><span class="sb-metric-value" id="sb-blast">—</span></div>
-          <div class="sb-metric"><span class="sb-metric-label">Depth</span><span class="sb-metric-value" id="sb-depth">—</span></div>
-          <div class="sb-metric"><span class="sb-metric-label">Fan-in (dependents)</span><span class="sb-metric-value" id="sb-fanout">—</span></div>
-          <div class="sb-metric"><span class="sb-metric-label">Type</span><span class="sb-metric-value" id="sb-type">—</span></div>
-        </div>
-
-        <div class="sb-section-title" id="sb-npm-title" style="display:none">NPM Intelligence</div>
-        <div class="sb-metric-row" id="sb-npm-metrics">
-          <div class="sb-metric" id="sb-npm-maintainers-row" style="display:none"><span class="sb-metric-label">Maintainers</span><span class="sb-metric-value" id="sb-maintainers">—</span></div>
-          <div class="sb-metric" id="sb-npm-stale-row" style="display:none"><span class="sb-metric-label">Last published</span><span class="sb-metric-value" id="sb-stale">—</span></div>
-          <div class="sb-metric" id="sb-npm-age-row" style="display:none"><span class="sb-metric-label">Package age</span><span class="sb-metric-value" id="sb-age">—</span></div>
-        </div>
-      </div>
-      <div class="sb-footer">
-        <button class="btn-simulate" id="btn-simulate">☢ Simulate Compromise</button>
-        <button class="btn-reset" id="btn-reset">Clear Simulation</button>
-      </div>
-    </div>
-
-    <!-- Simulation result toast -->
-    <div id="db-sim-result">
-      <span>☢ Blast radius:</span>
-      <span class="sim-count" id="sim-count">0</span>
-      <span>packages impacted</span>
-    </div>
-
-    <!-- Legend -->
-    <div id="db-legend">
-      <div class="legend-row"><div class="legend-dot" style="background:#ef4444"></div> Critical</div>
-      <div class="legend-row"><div class="legend-dot" style="background:#f97316"></div> High</div>
-      <div class="legend-row"><div class="legend-dot" style="background:#f59e0b"></div> Medium</div>
-      <div class="legend-row"><div class="legend-dot" style="background:#22c55e"></div> Low</div>
-      <div class="legend-row"><div class="legend-diamond"></div> Chokepoint</div>
-      <div class="legend-row"><div class="legend-dot" style="background:#64748b;border-radius:2px"></div> Dev dep</div>
-    </div>
-    """
 
-    sidebar_js = """
-    <script>
-    // ── Sidebar logic ────────────────────────────────────────────────────────
-    const sidebar   = document.getElementById('db-sidebar');
-    const sbClose   = document.getElementById('sb-close');
-    const btnSim    = document.getElementById('btn-simulate');
-    const btnReset  = document.getElementById('btn-reset');
-    const simResult = document.getElementById('db-sim-result');
-    const simCount  = document.getElementById('sim-count');
-
-    let selectedNodeId = null;
-    let originalColors = {};
-
-    const LEVEL_COLORS = {
-        critical: '#ef4444', high: '#f97316', medium: '#f59e0b', low: '#22c55e', unknown: '#64748b'
-    };
-    const BADGE_CLASSES = {
-        critical: 'badge-critical', high: 'badge-high', medium: 'badge-medium', low: 'badge-low'
-    };
-
-    function formatDays(d) {
-        if (d === null || d === undefined) return null;
-        if (d < 30) return d + ' days';
-        if (d < 365) return Math.round(d/30) + ' months';
-        return (d/365).toFixed(1) + ' years';
-    }
+def _result_cache_key(lockfile_digest: str, enrich: bool) -> str:
+    """Every input besides the lockfile bytes that changes the computed map.
+    Enriched results embed registry ages, so they are only reused the same day."""
+    from datetime import date
 
-    function openSidebar(nodeId, nodeData) {
-        selectedNodeId = nodeId;
-        sidebar.classList.add('open');
-
-        const parts = nodeId.split('@');
-        const version = parts.length > 1 ? '@' + parts[parts.length - 1] : '';
-        const name = parts.length > 1 ? parts.slice(0, parts.length - 1).join('@') : nodeId;
-
-        document.getElementById('sb-name').textContent = name;
-        document.getElementById('sb-version').textContent = version;
-
-        // Badge
-        const level = nodeData.level || 'unknown';
-        document.getElementById('sb-badge-wrap').innerHTML =
-            `<span class="sb-badge ${BADGE_CLASSES[level] || ''}">${level.toUpperCase()}</span>`;
-
-        // Chokepoint
-        document.getElementById('sb-chokepoint-wrap').innerHTML =
-            nodeData.chokepoint
-            ? `<div class="sb-chokepoint-badge">🎯 Structural Chokepoint — high blast-radius, many dependents</div>`
-            : '';
-
-        // Metrics
-        const riskMax = 300;
-        const riskPct = Math.min((nodeData.risk / riskMax) * 100, 100);
-        document.getElementById('sb-risk-score').textContent = nodeData.risk?.toFixed(1) ?? '—';
-        const bar = document.getElementById('sb-risk-bar');
-        bar.style.width = riskPct + '%';
-        bar.style.background = LEVEL_COLORS[level] || '#64748b';
-
-        document.getElementById('sb-blast').textContent = (nodeData.blast ?? '—') + ' pkgs';
-        document.getElementById('sb-depth').textContent = nodeData.depth ?? '—';
-        document.getElementById('sb-fanout').textContent = nodeData.fanout ?? '—';
-        document.getElementById('sb-type').textContent = nodeData.is_dev ? 'Dev dependency' : 'Production';
-
-        // NPM data
-        let hasNpm = false;
-        if (nodeData.maintainer_count !== null && nodeData.maintainer_count !== undefined) {
-            document.getElementById('sb-npm-maintainers-row').style.display = 'flex';
-            document.getElementById('sb-maintainers').textContent =
-                nodeData.maintainer_count + (nodeData.maintainer_count === 1 ? ' ⚠ Solo' : '');
-            hasNpm = true;
-        } else {
-            document.getElementById('sb-npm-maintainers-row').style.display = 'none';
-        }
-        const staleDays = formatDays(nodeData.days_since_publish);
-        if (staleDays) {
-            document.getElementById('sb-npm-stale-row').style.display = 'flex';
-            document.getElementById('sb-stale').textContent = staleDays + ' ago';
-            hasNpm = true;
-        } else {
-            document.getElementById('sb-npm-stale-row').style.display = 'none';
-        }
-        const ageDays = formatDays(nodeData.package_age_days);
-        if (ageDays) {
-            document.getElementById('sb-npm-age-row').style.display = 'flex';
-            document.getElementById('sb-age').textContent = ageDays;
-            hasNpm = true;
-        } else {
-            document.getElementById('sb-npm-age-row').style.display = 'none';
-        }
-        document.getElementById('sb-npm-title').style.display = hasNpm ? 'block' : 'none';
+    params = {
+        "pipeline_version": PIPELINE_VERSION,
+        "chokepoint_fanin": CHOKEPOINT_FANIN,
+        "chokepoint_depth": CHOKEPOINT_DEPTH,
+        "enrich": enrich,
     }
+    if enrich:
+        params["enriched_on"] = date.today().isoformat()
+    return result_key(lockfile_digest, params)
+
+
+def _cached_full_analysis(cache_key: str, lock_data, enrich_npm: bool = False, progress=None):
+    """Return (deps, health, cache_hit), running the pipeline only on a cache miss."""
+    with stage("cache"):
+        cached = result_cache.get(cache_key)
+    if cached is not None:
+        count("result_cache_hits")
+        return cached[0], cached[1], True
+    count("result_cache_misses")
+
+    deps = _run_full_analysis(lock_data, enrich_npm=enrich_npm, progress=progress)
+    with stage("health"):
+        health = compute_structural_health(deps)
+    with stage("cache"):
+        result_cache.put(cache_key, deps, health)
+    return deps, health, False
 
-    function closeSidebar() {
-        sidebar.classList.remove('open');
-        selectedNodeId = null;
-    }
 
-    sbClose.addEventListener('click', closeSidebar);
-
-    // ── Wait for vis network, then bind click ────────────────────────────────
-    const _waitForNetwork = setInterval(() => {
-        if (typeof network === 'undefined') return;
-        clearInterval(_waitForNetwork);
-
-        network.on('click', function(params) {
-            if (params.nodes.length > 0) {
-                const nodeId = params.nodes[0];
-                // Pull stored node data from the dataset
-                const nodeDataRaw = network.body.data.nodes.get(nodeId);
-                // We'll fetch extra metadata via API
-                fetch('/node_metadata?id=' + encodeURIComponent(nodeId))
-                    .then(r => r.json())
-                    .then(data => {
-                        openSidebar(nodeId, data);
-                    })
-                    .catch(() => {
-                        openSidebar(nodeId, {});
-                    });
-            } else {
-                closeSidebar();
+def _analysis_summary(deps: dict, health: dict, enrich_disabled_auto: bool) -> dict:
+    """The dashboard payload for a finished analysis."""
+    # Top risks
+    top_risk = sorted(deps.items(), key=lambda x: x[1]["risk_score"], reverse=True)[:10]
+
+    # Top blast-radius packages (most dangerous single points of failure)
+    top_blast = sorted(deps.items(), key=lambda x: x[1]["blast_radius"], reverse=True)[:5]
+
+    return {
+        "success": True,
+        "enrich_auto_disabled": enrich_disabled_auto,
+        "health": health,
+        "top_risks": [
+            {
+                "name": pkg,
+                "version": meta["version"],
+                "risk_score": meta["risk_score"],
+                "risk_level": meta["risk_level"],
+                "blast_radius": meta["blast_radius"],
+                "is_chokepoint": meta["is_chokepoint"],
+                "dominated_count": meta.get("dominated_count", 0),
+                "is_dev": meta["is_dev"],
+                "maintainer_count": meta.get("maintainer_count"),
+                "days_since_publish": meta.get("days_since_publish"),
             }
-        });
-
-        network.once('stabilizationIterationsDone', function() {
-            const lb = document.getElementById('loadingBar');
-            if (lb) lb.style.pointerEvents = 'none';
-        });
-    }, 100);
-
-    // ── Simulate ─────────────────────────────────────────────────────────────
-    btnSim.addEventListener('click', () => {
-        if (!selectedNodeId) return;
-        btnSim.disabled = true;
-        btnSim.textContent = 'Simulating…';
-
-        // Reset previous highlight
-        resetHighlight();
-
-        fetch('/simulate', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ package: selectedNodeId })
-        })
-        .then(r => r.json())
-        .then(data => {
-            if (data.error) { alert(data.error); return; }
-            highlightBlastRadius(selectedNodeId, data.impacted_packages);
-            simCount.textContent = data.impacted_count;
-            simResult.classList.add('show');
-        })
-        .finally(() => {
-            btnSim.disabled = false;
-            btnSim.textContent = '☢ Simulate Compromise';
-        });
-    });
-
-    btnReset.addEventListener('click', () => {
-        resetHighlight();
-        simResult.classList.remove('show');
-    });
-
-    function highlightBlastRadius(sourceId, impacted) {
-        const nodes = network.body.data.nodes;
-        const edges = network.body.data.edges;
-        const impactedSet = new Set(impacted);
-        const allIds = nodes.getIds();
-
-        const nodeUpdates = allIds.map(id => {
-            if (id === sourceId) {
-                return { id, color: { background: '#ef4444', border: '#fbbf24' }, size: 30 };
-            } else if (impactedSet.has(id)) {
-                return { id, color: { background: '#f97316', border: '#ef4444' } };
-            } else {
-                return { id, color: { background: '#1e293b', border: '#1e293b' }, opacity: 0.35 };
+            for pkg, meta in top_risk
+        ],
+        "top_blast": [
+            {
+                "name": pkg,
+                "blast_radius": meta["blast_radius"],
+                "risk_level": meta["risk_level"],
             }
-        });
-        nodes.update(nodeUpdates);
-    }
-
-    function resetHighlight() {
-        // Reload the page cleanly resets all node styles from pyvis
-        // Instead we'll soft-reset by reloading the network data
-        location.reload();
+            for pkg, meta in top_blast
+        ],
     }
 
-    // ── Loading screen injection ─────────────────────────────────────────────
-    document.addEventListener('DOMContentLoaded', function() {
-        document.body.style.overflow = 'hidden';
-        const outer = document.querySelector('div.outerBorder');
-        if (!outer) return;
-        const header = document.createElement('div');
-        header.className = 'db-loading-header';
-        header.innerHTML = `
-            <div class="db-spinner"></div>
-            <div>
-                <div class="db-loading-title">Building Graph</div>
-                <div class="db-loading-sub">Simulating physics model…</div>
-            </div>`;
-        outer.insertBefore(header, outer.firstChild);
-    });
-    </script>
-    """
-
-    html = html.replace("</style>", custom_css + "</style>", 1)
-    html = html.replace("</body>", sidebar_html + sidebar_js + "</body>")
-    GRAPH_HTML.write_text(html, encoding="utf-8")
 
+def _analysis_job(job, lock_json, enrich: bool, enrich_disabled_auto: bool, cache_key: str,
+                  recorder: Recorder, cached: tuple = None) -> dict:
+    """Background pipeline for /analyze; runs on the job queue's worker pool.
+    cached is the (deps, health) the request already found in the result cache
+    (lock_json is then None), so a later eviction cannot leave the job without
+    input. recorder already holds the request handler's stages and gets the rest."""
+    with recorder.activate():
+        if cached is not None:
+            count("result_cache_hits")
+            (deps, health), cache_hit = cached, True
+        else:
+            deps, health, cache_hit = _cached_full_analysis(cache_key, lock_json, enrich_npm=enrich,
+                                                            progress=job.publish)
+        if cache_hit:
+            job.publish("cache", packages=len(deps))
+        with stage("store"):
+            analysis = analysis_store.create(deps, health)
 
-def _run_full_analysis(lock_json: dict, enrich_npm: bool = False) -> dict:
-    """Run the full DepBlast analysis pipeline and return the dependency map."""
-    import extract_dependencies as extractor
-    from pathlib import Path as _Path
-    import tempfile, os
-
-    # Write to temp file and swap LOCK_FILE pointer
-    tmp = ROOT_DIR / "_depblast_temp_lock.json"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(lock_json, f)
-
-    orig = extractor.LOCK_FILE
-    extractor.LOCK_FILE = tmp
-
-    try:
-        deps = extractor.extract_dependencies(enrich_npm=enrich_npm)
-        extractor.compute_fanout(deps)
-        extractor.compute_blast_radii(deps)
-        extractor.detect_chokepoints(deps)
-        extractor.compute_risk_scores(deps)
-    finally:
-        extractor.LOCK_FILE = orig
-        tmp.unlink(missing_ok=True)
+        job.publish("render", packages=len(deps))
+        with stage("render"):
+            build_dependency_graph(analysis.graph, analysis.artifact(GRAPH_ARTIFACT), analysis.positions)
 
-    return deps
+    summary = _analysis_summary(deps, health, enrich_disabled_auto)
+    summary["cache_hit"] = cache_hit
+    summary["analysis_id"] = analysis.id
+    summary["graph_url"] = f"/graph?analysis={analysis.id}"
+    summary["metrics"] = recorder.report()
+    return summary
 
 
 # ---------------------------------------------------------------------------
@@ -610,8 +197,7 @@ def home():
 
 @app.route("/analyze", methods=["POST"])
 def analyze_dependencies():
-    global analysis_cache, health_cache
-
+    """Validate the upload and queue the analysis; progress is streamed from /jobs/<id>/events."""
     if "file" not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
 
@@ -620,88 +206,151 @@ def analyze_dependencies():
         return jsonify({"error": "No file selected"}), 400
 
     enrich = request.form.get("enrich", "false").lower() == "true"
+    recorder = Recorder()
 
     try:
-        raw = uploaded_file.read().decode("utf-8")
-        lock_json = json.loads(raw)
-
-        if "packages" not in lock_json:
-            return jsonify({"error": "Invalid package-lock.json — 'packages' field missing"}), 400
-
-        pkg_count = len(lock_json.get("packages", {}))
+        with recorder.stage("hash"):
+            lockfile_digest = digest_stream(uploaded_file.stream)
+
+        # Identical lockfile analyzed before — skip parsing altogether
+        cache_key = _result_cache_key(lockfile_digest, enrich)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            job = job_queue.submit(_analysis_job, None, enrich, False, cache_key, recorder, cached)
+            return jsonify({
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}",
+                "events_url": f"/jobs/{job.id}/events",
+            }), 202
+
+        try:
+            with recorder.stage("parse"):
+                lock_json = load_any_lockfile(uploaded_file.stream)
+        except LockfileFormatError as err:
+            return jsonify({"error": str(err)}), 400
+
+        pkg_count = len(lock_json["packages"])
 
         # Hard cap — prevent hanging on giant monorepos
-        if pkg_count > 5000:
-            return jsonify({"error": f"Lockfile too large ({pkg_count} packages). Limit is 5000."}), 400
+        if pkg_count > MAX_LOCKFILE_PACKAGES:
+            return jsonify({"error": f"Lockfile too large ({pkg_count} packages). Limit is {MAX_LOCKFILE_PACKAGES}."}), 400
 
-        # Auto-disable NPM enrichment for large files to keep response time reasonable
-        if enrich and pkg_count > 500:
+        # Auto-disable NPM enrichment only when too many names would hit the
+        # network; anything fresh in the metadata cache costs nothing.
+        names = lockfile_package_names(lock_json)
+        if enrich and get_default_cache().count_stale(names) > ENRICH_FETCH_LIMIT:
             enrich = False  # will be communicated back in response
             enrich_disabled_auto = True
         else:
             enrich_disabled_auto = False
 
-        deps = _run_full_analysis(lock_json, enrich_npm=enrich)
-        analysis_cache = deps
+        cache_key = _result_cache_key(lockfile_digest, enrich)
+        job = job_queue.submit(_analysis_job, lock_json, enrich, enrich_disabled_auto, cache_key, recorder)
+        return jsonify({
+            "job_id": job.id,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events",
+        }), 202
 
-        health = compute_structural_health(deps)
-        health_cache = health
+    except Exception as err:
+        import traceback
+        return jsonify({"error": str(err), "trace": traceback.format_exc()}), 500
 
-        build_dependency_graph(deps)
 
-        # Top risks
-        top_risk = sorted(deps.items(), key=lambda x: x[1]["risk_score"], reverse=True)[:10]
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Poll a background analysis: state, latest progress, and the result once done."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    return jsonify(job.snapshot())
 
-        # Top blast-radius packages (most dangerous single points of failure)
-        top_blast = sorted(deps.items(), key=lambda x: x[1]["blast_radius"], reverse=True)[:5]
 
-        return jsonify({
-            "success": True,
-            "enrich_auto_disabled": enrich_disabled_auto,
-            "health": health,
-            "top_risks": [
-                {
-                    "name": pkg,
-                    "version": meta["version"],
-                    "risk_score": meta["risk_score"],
-                    "risk_level": meta["risk_level"],
-                    "blast_radius": meta["blast_radius"],
-                    "is_chokepoint": meta["is_chokepoint"],
-                    "is_dev": meta["is_dev"],
-                    "maintainer_count": meta.get("maintainer_count"),
-                    "days_since_publish": meta.get("days_since_publish"),
-                }
-                for pkg, meta in top_risk
-            ],
-            "top_blast": [
-                {
-                    "name": pkg,
-                    "blast_radius": meta["blast_radius"],
-                    "risk_level": meta["risk_level"],
-                }
-                for pkg, meta in top_blast
-            ],
-        })
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """Server-Sent Events stream of a job's progress, ending with 'done' or 'failed'.
+    Honours Last-Event-ID so a reconnecting EventSource resumes where it left off."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
 
-    except Exception as err:
-        import traceback
-        return jsonify({"error": str(err), "trace": traceback.format_exc()}), 500
+    last_seen = request.headers.get("Last-Event-ID", "0")
+    after = int(last_seen) if last_seen.isdigit() else 0
+
+    def stream(after):
+        while True:
+            events = job.wait_events(after, timeout=SSE_HEARTBEAT)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                after = event["seq"]
+                yield f"id: {after}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event["event"] in ("done", "failed"):
+                    return
+
+    return Response(stream(after), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def _requested_analysis(analysis_id: str):
+    """Look up an analysis, or return the (response, status) to send instead."""
+    analysis = analysis_store.get(analysis_id)
+    if analysis is None:
+        return None, (jsonify({"error": "No analysis data available. Please upload a lock file first."}), 404)
+    return analysis, None
 
 
 @app.route("/graph")
 def show_graph():
-    if not GRAPH_HTML.exists():
+    analysis = analysis_store.get(request.args.get("analysis", ""))
+    if analysis is None:
         return "<h2>No graph generated yet. Please analyze a project first.</h2>", 404
-    return render_template("graph.html")
+    return render_template("graph.html", analysis_id=analysis.id)
+
+
+@app.route("/graph/data")
+def graph_data():
+    """Nodes/edges payload for the graph page; rebuilt if the artifact is missing
+    or outdated. Graphs above LOD_THRESHOLD packages get the clustered top level
+    instead, unless ?view=full is given (?view=clusters forces clustering)."""
+    analysis, error = _requested_analysis(request.args.get("analysis", ""))
+    if error:
+        return error
+    view = request.args.get("view", "auto")
+    if view == "clusters" or (view != "full" and len(analysis.deps) > LOD_THRESHOLD):
+        return jsonify(analysis.clusters.top_view())
+    path = analysis.artifact(GRAPH_ARTIFACT)
+    if not is_current(path):
+        build_dependency_graph(analysis.graph, path, analysis.positions)
+    return send_file(path, mimetype="application/json")
+
+
+@app.route("/graph/cluster")
+def graph_cluster():
+    """Children of one cluster of the clustered graph view, plus the edges that
+    connect them; `expanded` lists the clusters the page already has open."""
+    analysis, error = _requested_analysis(request.args.get("analysis", ""))
+    if error:
+        return error
+    clusters = analysis.clusters
+    cluster = clusters.parse_cluster(request.args.get("id", ""))
+    if cluster is None:
+        return jsonify({"error": "Unknown cluster"}), 404
+    expanded = clusters.expanded_items(filter(None, request.args.get("expanded", "").split(",")))
+    return jsonify(clusters.expand(cluster, expanded))
 
 
 @app.route("/node_metadata")
 def node_metadata():
     """Return cached metadata for a node to populate the sidebar."""
+    analysis, error = _requested_analysis(request.args.get("analysis", ""))
+    if error:
+        return error
     pkg_id = request.args.get("id", "")
-    if pkg_id not in analysis_cache:
+    if pkg_id not in analysis.deps:
         return jsonify({}), 404
-    meta = analysis_cache[pkg_id]
+    meta = analysis.deps[pkg_id]
     return jsonify({
         "risk": meta["risk_score"],
         "level": meta["risk_level"],
@@ -710,6 +359,9 @@ def node_metadata():
         "fanout": meta["fanout"],
         "is_dev": meta["is_dev"],
         "chokepoint": meta["is_chokepoint"],
+        "dominator": meta.get("dominator"),
+        "dominated_count": meta.get("dominated_count", 0),
+        "dominated": sorted(analysis.index.dominated(pkg_id))[:DOMINATED_LIST_LIMIT],
         "maintainer_count": meta.get("maintainer_count"),
         "days_since_publish": meta.get("days_since_publish"),
         "package_age_days": meta.get("package_age_days"),
@@ -718,28 +370,188 @@ def node_metadata():
 
 @app.route("/simulate", methods=["POST"])
 def simulate_attack():
-    if not analysis_cache:
-        return jsonify({"error": "No analysis data available. Please upload a lock file first."}), 400
+    """Impacted set of one compromised package (or several, see below).
 
+    With "format": "indices" the single-target response lists positions in the
+    graph payload's package order instead of IDs, and "expanded" (the cluster
+    IDs open on a clustered graph page) adds the collapsed clusters that hide
+    impacted packages, so the page can update just the nodes it draws.
+    """
     payload = request.get_json(silent=True) or {}
+    analysis, error = _requested_analysis(payload.get("analysis_id", ""))
+    if error:
+        return error
+    graph_index = analysis.index
+
+    # Multi-target: {"packages": [...]} → union + per-target attribution
+    targets = payload.get("packages")
+    if targets is not None:
+        if not isinstance(targets, list) or not targets:
+            return jsonify({"error": "'packages' must be a non-empty list"}), 400
+        missing = [t for t in targets if t not in graph_index]
+        if missing:
+            return jsonify({"error": f"Packages not found in current analysis: {missing[:10]}"}), 404
+
+        result = graph_index.simulate_many(targets)
+        return jsonify({
+            "targets": targets,
+            "impacted_count": len(result["union"]),
+            "impacted_packages": list(result["union"]),
+            "per_target": {
+                target: {"impacted_count": len(impacted), "impacted_packages": list(impacted)}
+                for target, impacted in result["per_target"].items()
+            },
+            "attribution": result["attribution"],
+        })
+
     target = payload.get("package")
 
-    if not target or target not in analysis_cache:
+    if not target or target not in graph_index:
         return jsonify({"error": f"Package '{target}' not found in current analysis"}), 404
 
-    affected = simulate_compromise(target, analysis_cache)
+    affected = graph_index.simulate(target)
 
-    return jsonify({
+    if payload.get("format") != "indices":
+        return jsonify({
+            "target": target,
+            "impacted_count": len(affected),
+            "impacted_packages": list(affected),
+        })
+
+    result = {
         "target": target,
+        "target_index": graph_index.positions[target],
         "impacted_count": len(affected),
-        "impacted_packages": list(affected),
+        "impacted_indices": graph_index.indices(affected),
+    }
+    expanded = payload.get("expanded")
+    if isinstance(expanded, list):
+        clusters = analysis.clusters
+        nodes = result["impacted_indices"] + [result["target_index"]]
+        result["impacted_clusters"] = clusters.visible_clusters(nodes, clusters.expanded_items(expanded))
+    return jsonify(result)
+
+
+@app.route("/paths")
+def find_attack_paths():
+    """Shortest dependency chains from a compromised package up to the project.
+
+    Query parameters: analysis, package, k (chains per destination, 1 to
+    MAX_PATHS, default 1) and optionally entry (limit to one direct
+    dependency). "expanded" (open cluster IDs on a clustered graph page,
+    comma-separated) adds to_root_items, the node IDs to draw for each chain.
+    """
+    analysis, error = _requested_analysis(request.args.get("analysis", ""))
+    if error:
+        return error
+    graph_index = analysis.index
+    target = request.args.get("package", "")
+    if target not in graph_index:
+        return jsonify({"error": f"Package '{target}' not found in current analysis"}), 404
+    try:
+        k = int(request.args.get("k", 1))
+    except ValueError:
+        return jsonify({"error": "'k' must be an integer"}), 400
+    if not 1 <= k <= MAX_PATHS:
+        return jsonify({"error": f"'k' must be between 1 and {MAX_PATHS}"}), 400
+    entry = request.args.get("entry") or None
+    if entry is not None and (entry not in graph_index or not analysis.deps[entry]["direct"]):
+        return jsonify({"error": f"'{entry}' is not a direct dependency in this analysis"}), 404
+
+    result = graph_index.attack_paths(target, k, entry)
+    positions = graph_index.positions
+    response = {
+        **result,
+        "k": k,
+        "entry_count": len(result["entries"]),
+        "to_root_indices": [[positions[pkg_id] for pkg_id in path] for path in result["to_root"]],
+    }
+    if "expanded" in request.args:
+        clusters = analysis.clusters
+        expanded = clusters.expanded_items(filter(None, request.args["expanded"].split(",")))
+        response["to_root_items"] = [clusters.visible_path(indices, expanded)
+                                     for indices in response["to_root_indices"]]
+    return jsonify(response)
+
+
+@app.route("/simulate/batch", methods=["POST"])
+def simulate_batch():
+    """Simulate many compromised packages in one call.
+
+    Targets are the listed "packages", every package matching the "where"
+    filter expression (e.g. "maintainer_count == 1", see package_filter.py),
+    or both. Returns each target's impacted set, the union, and overlap
+    stats. "format": "indices" sends positions in the graph payload order
+    instead of IDs; "include_sets": false sends counts only.
+    """
+    payload = request.get_json(silent=True) or {}
+    analysis, error = _requested_analysis(payload.get("analysis_id", ""))
+    if error:
+        return error
+
+    listed = payload.get("packages")
+    where = payload.get("where")
+    if listed is None and not where:
+        return jsonify({"error": "Provide 'packages' (a list of package IDs) and/or 'where' (a filter expression)"}), 400
+    if listed is not None and (not isinstance(listed, list) or not all(isinstance(t, str) for t in listed)):
+        return jsonify({"error": "'packages' must be a list of package IDs"}), 400
+
+    targets = list(listed or [])
+    if where:
+        try:
+            targets += select_packages(analysis.deps, where)
+        except ValueError as err:
+            return jsonify({"error": f"Invalid 'where' expression: {err}"}), 400
+    targets = list(dict.fromkeys(targets))
+
+    missing = [t for t in targets if t not in analysis.deps]
+    if missing:
+        return jsonify({"error": f"Packages not found in current analysis: {missing[:10]}"}), 404
+    if len(targets) > BATCH_MAX_TARGETS:
+        return jsonify({"error": f"Too many targets ({len(targets)}). Limit is {BATCH_MAX_TARGETS}."}), 400
+
+    graph_index = analysis.index
+    with stage("simulate_batch"):
+        per_target = graph_index.simulate_batch(targets)
+    stats = overlap_stats(per_target)
+    union = set().union(*per_target.values())
+
+    compact = payload.get("format") == "indices"
+    include_sets = payload.get("include_sets", True)
+
+    def impacted(packages) -> dict:
+        if not include_sets:
+            return {}
+        if compact:
+            return {"impacted_indices": graph_index.indices(packages)}
+        return {"impacted_packages": sorted(packages)}
+
+    return jsonify({
+        "targets": targets,
+        "target_count": len(targets),
+        "impacted_count": len(union),
+        **impacted(union),
+        "shared_count": stats["shared_count"],
+        "max_targets_per_package": stats["max_targets_per_package"],
+        "top_overlaps": stats["top_overlaps"],
+        "per_target": {
+            target: {
+                "impacted_count": len(packages),
+                "unique_count": stats["unique_counts"][target],
+                **impacted(packages),
+            }
+            for target, packages in per_target.items()
+        },
     })
 
 
 @app.route("/api/v1/scan", methods=["POST"])
 def ci_scan():
     """CI/CD-ready endpoint.
-    POST multipart/form-data with 'file' = package-lock.json
+    POST multipart/form-data with 'file' = package-lock.json, yarn.lock or
+    pnpm-lock.yaml (detected from the contents).
+    Optional 'baseline' = the base branch's lockfile for an
+    incremental scan; the response then carries a risk delta.
     Returns pass/fail + summary JSON.
     """
     if "file" not in request.files:
@@ -749,14 +561,34 @@ def ci_scan():
     threshold_score = float(request.form.get("threshold", 150))
     max_chokepoints = int(request.form.get("max_chokepoints", 3))
 
+    recorder = Recorder()
     try:
-        raw = uploaded_file.read().decode("utf-8")
-        lock_json = json.loads(raw)
-        if "packages" not in lock_json:
-            return jsonify({"error": "Invalid package-lock.json"}), 400
-
-        deps = _run_full_analysis(lock_json, enrich_npm=False)
-        health = compute_structural_health(deps)
+        with recorder.activate():
+            cache_key = _result_cache_key(digest_stream(uploaded_file.stream), enrich=False)
+            delta = None
+            try:
+                baseline_file = request.files.get("baseline")
+                if baseline_file is None:
+                    deps, health, cache_hit = _cached_full_analysis(cache_key, uploaded_file.stream)
+                else:
+                    # PR scans: analyze the base-branch lockfile (usually cached) and
+                    # update only what the diff touches instead of starting over.
+                    baseline_key = _result_cache_key(digest_stream(baseline_file.stream), enrich=False)
+                    baseline, _, _ = _cached_full_analysis(baseline_key, baseline_file.stream)
+
+                    cached = result_cache.get(cache_key)
+                    cache_hit = cached is not None
+                    if cache_hit:
+                        deps, health = cached
+                        delta = risk_delta(baseline, deps)
+                    else:
+                        deps, delta = reanalyze(baseline, uploaded_file.stream,
+                                                fanin_threshold=CHOKEPOINT_FANIN,
+                                                depth_threshold=CHOKEPOINT_DEPTH)
+                        health = compute_structural_health(deps)
+                        result_cache.put(cache_key, deps, health)
+            except LockfileFormatError as err:
+                return jsonify({"error": str(err)}), 400
 
         top_risk = sorted(deps.items(), key=lambda x: x[1]["risk_score"], reverse=True)[:5]
         max_score = top_risk[0][1]["risk_score"] if top_risk else 0
@@ -766,6 +598,7 @@ def ci_scan():
 
         return jsonify({
             "pass": passed,
+            "cache_hit": cache_hit,
             "summary": {
                 "total_deps": health.get("total", 0),
                 "prod_deps": health.get("prod_deps", 0),
@@ -781,12 +614,20 @@ def ci_scan():
             "thresholds": {
                 "max_risk_score": threshold_score,
                 "max_chokepoints": max_chokepoints
-            }
+            },
+            "delta": delta,
+            "metrics": recorder.report(),
         })
 
     except Exception as err:
         return jsonify({"error": str(err)}), 500
 
 
+@app.route("/metrics")
+def metrics():
+    """Pipeline stage timings, counters and histograms in Prometheus text format."""
+    return Response(METRICS.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)
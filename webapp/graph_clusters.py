@@ -0,0 +1,340 @@
+"""Level-of-detail view of large graphs: packages collapsed into clusters.
+
+Every package is assigned to one breadth-first spanning tree hanging off the
+direct dependencies (a shared package goes to the nearest one). Opening a
+level of that tree shows each sibling either as a package or, when it has
+dependencies of its own, as a *subtree* cluster holding it and everything
+below it. Siblings are further collapsed into *scope* clusters (three or more
+``@scope/*`` packages) and *leaves* clusters (three or more low-risk,
+non-chokepoint packages without dependencies). If a level still has more than
+MAX_ITEMS entries, the least risky ones are folded into a *more* cluster.
+
+Clusters carry the summed blast radius, the highest risk score and level, and
+the package count of their members, and sit at the centroid of their members'
+positions, the same ones the analysis' graph payload stores. /graph/data sends
+only the top level for graphs above LOD_THRESHOLD packages. /graph/cluster
+returns a single cluster's children and edges when the page expands it.
+
+Items are numbered packages first (0..n-1), then clusters (n + cluster index).
+Payloads carry each package item's number in an `index` column (-1 for
+clusters), which is how /simulate's compact impacted sets refer to them.
+"""
+
+from collections import deque
+
+from graph_payload import FLAG_CHOKEPOINT, FLAG_DEV, PAYLOAD_VERSION
+from risk_scoring import RISK_LEVELS
+
+LOD_THRESHOLD = 1000     # packages above which /graph/data sends the clustered view
+MAX_ITEMS = 300          # entries shown per opened level (top level or expanded cluster)
+MIN_GROUP = 3            # smallest scope / leaf group worth collapsing
+CLUSTER_PREFIX = "cluster:"
+FLAG_CLUSTER = 4
+
+_LOW_RISK = (RISK_LEVELS.index("unknown"), RISK_LEVELS.index("low"))
+
+
+def _adjacency(offsets, targets) -> list:
+    """CSR arrays → one list of neighbours per node."""
+    offsets = offsets.tolist()
+    targets = targets.tolist()
+    return [targets[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+class Cluster:
+    __slots__ = ("kind", "label", "parent", "plan", "items", "size", "blast", "risk", "level", "x", "y")
+
+    def __init__(self, kind: str, label: str, parent: int, plan: tuple):
+        self.kind = kind
+        self.label = label
+        self.parent = parent   # enclosing cluster index, -1 at the top level
+        self.plan = plan       # how to build items: ("subtree", node) or ("group", nodes, scope, leaves)
+        self.items: list = []
+
+
+class ClusterTree:
+    """Cluster hierarchy of one analyzed DependencyGraph; built once per analysis."""
+
+    def __init__(self, graph, positions: tuple):
+        self.ids = graph.ids
+        n = len(self.ids)
+
+        self.names = graph.names
+        self.level = graph.risk_level.tolist()
+        self.risk = graph.risk_score.tolist()
+        self.blast = graph.blast_radius.tolist()
+        self.fanin = graph.fanin.tolist()
+        self.flags = (graph.is_chokepoint * FLAG_CHOKEPOINT | graph.is_dev * FLAG_DEV).tolist()
+        depth = graph.depth.tolist()
+
+        self.children = _adjacency(graph.fwd_offsets, graph.fwd_targets)
+        self.parents = _adjacency(graph.rev_offsets, graph.rev_targets)
+        self.x, self.y = positions
+
+        self.tree_children, order = self._spanning_tree(depth)
+        # Highest risk score anywhere in each package's spanning subtree
+        self.subtree_risk = list(self.risk)
+        for node in reversed(order):
+            for child in self.tree_children[node]:
+                if self.subtree_risk[child] > self.subtree_risk[node]:
+                    self.subtree_risk[node] = self.subtree_risk[child]
+
+        self.owner = [-1] * n   # innermost cluster listing each package, -1 = top level
+        self.clusters: list = []
+        roots = [node for node in order if self.tree_parent[node] == -1]
+        self.top = self._group(roots, -1, scope=True, leaves=True)
+        built = 0
+        while built < len(self.clusters):
+            self._build(built)
+            built += 1
+        self._aggregate()
+
+        # Links between top-level items never change, so top_view reuses them
+        position = {item: i for i, item in enumerate(self.top)}
+        self.top_edges = [position[item] for link in self._links(range(n), set()) for item in link]
+
+    # -----------------------------------------------------------------------
+    # Construction
+    # -----------------------------------------------------------------------
+
+    def _spanning_tree(self, depth: list):
+        """Multi-source BFS from the direct (or parentless) packages; returns
+        (tree_children, BFS order). Packages only reachable through cycles
+        start trees of their own."""
+        n = len(self.ids)
+        self.tree_parent = [-1] * n
+        seen = [False] * n
+        tree_children = [[] for _ in range(n)]
+        order: list = []
+
+        def bfs(starts):
+            queue = deque(starts)
+            for node in starts:
+                seen[node] = True
+            while queue:
+                node = queue.popleft()
+                order.append(node)
+                for child in self.children[node]:
+                    if not seen[child]:
+                        seen[child] = True
+                        self.tree_parent[child] = node
+                        tree_children[node].append(child)
+                        queue.append(child)
+
+        bfs([i for i in range(n) if depth[i] <= 1 or not self.parents[i]])
+        for i in range(n):
+            if not seen[i]:
+                bfs([i])
+        return tree_children, order
+
+    def _new_cluster(self, kind: str, label: str, parent: int, plan: tuple) -> int:
+        self.clusters.append(Cluster(kind, label, parent, plan))
+        return len(self.ids) + len(self.clusters) - 1
+
+    def _build(self, c: int) -> None:
+        cluster = self.clusters[c]
+        item = len(self.ids) + c
+        if cluster.plan[0] == "subtree":
+            node = cluster.plan[1]
+            self.owner[node] = item
+            cluster.items = [node] + self._group(self.tree_children[node], item, scope=True, leaves=True)
+        else:
+            _, nodes, scope, leaves = cluster.plan
+            cluster.items = self._group(nodes, item, scope=scope, leaves=leaves)
+        cluster.plan = None
+
+    def _group(self, siblings: list, parent: int, scope: bool, leaves: bool) -> list:
+        """Items for one opened level: packages plus (not yet built) clusters."""
+        plan = []   # (kind, label, sibling nodes)
+        rest = siblings
+        if scope:
+            by_scope: dict = {}
+            for node in rest:
+                name = self.names[node]
+                if name.startswith("@"):
+                    by_scope.setdefault(name.split("/", 1)[0], []).append(node)
+            grouped = set()
+            for scope_name, members in by_scope.items():
+                if len(members) >= MIN_GROUP:
+                    plan.append(("scope", f"{scope_name}/*", members))
+                    grouped.update(members)
+            rest = [node for node in rest if node not in grouped]
+        if leaves:
+            low = [node for node in rest
+                   if not self.tree_children[node] and self.level[node] in _LOW_RISK
+                   and not self.flags[node] & FLAG_CHOKEPOINT]
+            if len(low) >= MIN_GROUP:
+                plan.append(("leaves", "low-risk leaves", low))
+                low = set(low)
+                rest = [node for node in rest if node not in low]
+        plan.extend(("subtree" if self.tree_children[node] else "package", self.names[node], [node])
+                    for node in rest)
+
+        more = []
+        if len(plan) > MAX_ITEMS:
+            plan.sort(key=lambda entry: max(self.subtree_risk[node] for node in entry[2]), reverse=True)
+            for entry in plan[MAX_ITEMS - 1:]:
+                more.extend(entry[2])
+            plan = plan[:MAX_ITEMS - 1]
+
+        items = []
+        for kind, label, nodes in plan:
+            if kind == "package":
+                self.owner[nodes[0]] = parent
+                items.append(nodes[0])
+            elif kind == "subtree":
+                items.append(self._new_cluster(kind, label, parent, ("subtree", nodes[0])))
+            else:
+                items.append(self._new_cluster(kind, label, parent, ("group", nodes, False, kind == "scope")))
+        if more:
+            items.append(self._new_cluster("more", "more", parent, ("group", more, scope, leaves)))
+        return items
+
+    def _aggregate(self) -> None:
+        """Size, summed blast radius, max risk and centroid, innermost clusters first."""
+        n = len(self.ids)
+        for cluster in reversed(self.clusters):
+            size = blast = 0
+            risk, level, x, y = 0.0, 0, 0.0, 0.0
+            for item in cluster.items:
+                if item < n:
+                    item_size, item_blast, item_risk, item_level = 1, self.blast[item], self.risk[item], self.level[item]
+                    item_x, item_y = self.x[item], self.y[item]
+                else:
+                    child = self.clusters[item - n]
+                    item_size, item_blast, item_risk, item_level = child.size, child.blast, child.risk, child.level
+                    item_x, item_y = child.x, child.y
+                size += item_size
+                blast += item_blast
+                x += item_x * item_size
+                y += item_y * item_size
+                risk = max(risk, item_risk)
+                level = max(level, item_level)
+            cluster.size = size
+            cluster.blast = blast
+            cluster.risk = risk
+            cluster.level = level
+            cluster.x = round(x / size) if size else 0
+            cluster.y = round(y / size) if size else 0
+
+    # -----------------------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------------------
+
+    def item_id(self, item: int) -> str:
+        n = len(self.ids)
+        return self.ids[item] if item < n else f"{CLUSTER_PREFIX}{item - n}"
+
+    def parse_cluster(self, cluster_id: str):
+        """Cluster index for an item ID such as 'cluster:12', or None."""
+        if not cluster_id.startswith(CLUSTER_PREFIX):
+            return None
+        number = cluster_id[len(CLUSTER_PREFIX):]
+        if not number.isdigit() or int(number) >= len(self.clusters):
+            return None
+        return int(number)
+
+    def _visible(self, node: int, expanded: set) -> int:
+        """The item standing in for a package: its outermost collapsed cluster."""
+        chain = []
+        item = self.owner[node]
+        while item != -1:
+            chain.append(item)
+            item = self.clusters[item - len(self.ids)].parent
+        for item in reversed(chain):
+            if item not in expanded:
+                return item
+        return node
+
+    def _members(self, item: int) -> list:
+        n = len(self.ids)
+        members, stack = [], [item]
+        while stack:
+            item = stack.pop()
+            if item < n:
+                members.append(item)
+            else:
+                stack.extend(self.clusters[item - n].items)
+        return members
+
+    def _links(self, members: list, expanded: set) -> list:
+        links = set()
+        for node in members:
+            for other in self.children[node]:
+                links.add((self._visible(node, expanded), self._visible(other, expanded)))
+            for other in self.parents[node]:
+                links.add((self._visible(other, expanded), self._visible(node, expanded)))
+        return sorted((a, b) for a, b in links if a != b)
+
+    def _columns(self, items: list) -> dict:
+        n = len(self.ids)
+        columns = {"ids": [], "index": [], "level": [], "fanin": [], "flags": [], "x": [], "y": [],
+                   "clusters": {}}
+        for item in items:
+            item_id = self.item_id(item)
+            columns["ids"].append(item_id)
+            columns["index"].append(item if item < n else -1)
+            if item < n:
+                columns["level"].append(self.level[item])
+                columns["fanin"].append(self.fanin[item])
+                columns["flags"].append(self.flags[item])
+                columns["x"].append(self.x[item])
+                columns["y"].append(self.y[item])
+            else:
+                cluster = self.clusters[item - n]
+                columns["level"].append(cluster.level)
+                columns["fanin"].append(cluster.size)
+                columns["flags"].append(FLAG_CLUSTER)
+                columns["x"].append(cluster.x)
+                columns["y"].append(cluster.y)
+                columns["clusters"][item_id] = {
+                    "kind": cluster.kind,
+                    "label": cluster.label,
+                    "size": cluster.size,
+                    "blast": cluster.blast,
+                    "risk": cluster.risk,
+                }
+        return columns
+
+    def top_view(self) -> dict:
+        """Graph payload of the top level, in the same shape as graph_payload()."""
+        payload = {"version": PAYLOAD_VERSION, "mode": "clusters", "packages": len(self.ids)}
+        payload.update(self._columns(self.top))
+        payload["edges"] = list(self.top_edges)
+        return payload
+
+    def expand(self, cluster: int, expanded: set) -> dict:
+        """Children of one cluster and every edge touching them, given the
+        clusters the page already has open; links are flat pairs of item IDs."""
+        n = len(self.ids)
+        expanded = expanded | {n + cluster}
+        children = self.clusters[cluster].items
+        links = []
+        for a, b in self._links(self._members(n + cluster), expanded):
+            links.append(self.item_id(a))
+            links.append(self.item_id(b))
+        payload = self._columns(children)
+        payload["links"] = links
+        return payload
+
+    def visible_clusters(self, nodes, expanded: set) -> list:
+        """IDs of the collapsed clusters that currently hide any of nodes."""
+        n = len(self.ids)
+        hidden = {self._visible(node, expanded) for node in nodes}
+        return sorted(self.item_id(item) for item in hidden if item >= n)
+
+    def visible_path(self, nodes, expanded: set) -> list:
+        """Item IDs drawn for a chain of packages; consecutive packages hidden
+        in the same collapsed cluster become one step."""
+        items: list = []
+        for node in nodes:
+            item_id = self.item_id(self._visible(node, expanded))
+            if not items or items[-1] != item_id:
+                items.append(item_id)
+        return items
+
+    def expanded_items(self, cluster_ids) -> set:
+        """Item numbers of the given cluster IDs, ignoring unknown ones."""
+        n = len(self.ids)
+        indices = (self.parse_cluster(cluster_id) for cluster_id in cluster_ids)
+        return {n + c for c in indices if c is not None}
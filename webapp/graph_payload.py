@@ -0,0 +1,94 @@
+"""Compact nodes/edges payload behind the static graph page.
+
+templates/graph.html is rendered once per request with nothing but the
+analysis ID; it fetches this payload from /graph/data and builds the vis.js
+datasets in the browser. Everything the page needs to draw a node fits in
+parallel columns (risk level code, fan-in, flag bits) and edges are a flat
+list of node-index pairs, so a few thousand packages cost a few hundred KB
+instead of a multi-MB HTML page with an inline tooltip per node. Tooltips
+and the sidebar load their details lazily from /node_metadata.
+
+Node positions (graph_layout.py) are stored with the payload, so the page
+draws with physics off and every reload looks the same. The web app computes
+them once per analysis (node_positions) and the cluster view reuses them;
+read_positions gets them back from a stored payload.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from graph_layout import compute_layout
+from instrumentation import stage
+
+PAYLOAD_VERSION = 2  # 2: x/y layout columns
+
+FLAG_CHOKEPOINT = 1
+FLAG_DEV = 2
+
+
+def _edge_sources(graph) -> np.ndarray:
+    return np.repeat(np.arange(len(graph), dtype=np.int32), np.diff(graph.fwd_offsets))
+
+
+def node_positions(graph) -> tuple:
+    """(x, y) coordinate lists of a DependencyGraph's packages."""
+    with stage("layout"):
+        return compute_layout(graph.depth, _edge_sources(graph), graph.fwd_targets)
+
+
+def _read_payload(path: Path):
+    """The payload stored at path, or None if it is missing or in an older format."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return payload if payload.get("version") == PAYLOAD_VERSION else None
+
+
+def is_current(path: Path) -> bool:
+    """True if path holds a payload in this format; older ones have no layout."""
+    return _read_payload(path) is not None
+
+
+def read_positions(path: Path, count: int):
+    """(x, y) from a payload written by write_graph_payload for count packages,
+    or None if there is no such payload."""
+    payload = _read_payload(path)
+    if payload is None or len(payload["x"]) != count:
+        return None
+    return payload["x"], payload["y"]
+
+
+def graph_payload(graph, positions: tuple = None) -> dict:
+    """Payload of an analyzed DependencyGraph, straight from its columns and
+    forward CSR; positions are computed unless given."""
+    sources = _edge_sources(graph)
+    flags = graph.is_chokepoint * FLAG_CHOKEPOINT | graph.is_dev * FLAG_DEV
+    x, y = positions or node_positions(graph)
+    edges = np.column_stack((sources, graph.fwd_targets)).ravel()
+
+    return {
+        "version": PAYLOAD_VERSION,
+        "ids": graph.ids,
+        "level": graph.risk_level.tolist(),
+        "fanin": graph.fanin.tolist(),
+        "flags": flags.tolist(),
+        "x": x,
+        "y": y,
+        "edges": edges.tolist(),
+    }
+
+
+def write_graph_payload(graph, path: Path, positions: tuple = None) -> None:
+    """Write the payload as compact JSON, atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(graph_payload(graph, positions), f, separators=(",", ":"))
+    os.replace(tmp, path)
@@ -0,0 +1,111 @@
+"""Background analysis jobs with progress events.
+
+A JobQueue runs pipeline functions on a small worker pool. Each Job keeps an
+append-only list of progress events that request handlers can wait on, which
+is what the Server-Sent Events endpoint streams to the browser.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+ANALYSIS_WORKERS = 4     # analyses that may run concurrently
+MAX_RETAINED_JOBS = 200  # finished jobs kept for status / result lookups
+
+
+class Job:
+    """State and progress log of one background analysis."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.state = "queued"        # queued → running → done | failed
+        self.created_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.events: list = []
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed")
+
+    def _append(self, event: str, data: dict) -> None:
+        with self._cond:
+            self.events.append({"seq": len(self.events) + 1, "event": event, "data": data})
+            self._cond.notify_all()
+
+    def publish(self, stage: str, **fields) -> None:
+        """Record progress for a pipeline stage, e.g. publish("enrich", done=50, total=900)."""
+        self._append("progress", {"stage": stage, **fields})
+
+    def start(self) -> None:
+        self.state = "running"
+        self._append("state", {"state": "running"})
+
+    def finish(self, result) -> None:
+        self.result = result
+        self.finished_at = time.time()
+        self.state = "done"
+        self._append("done", result)
+
+    def fail(self, error: str, trace: str = None) -> None:
+        self.error = error
+        self.finished_at = time.time()
+        self.state = "failed"
+        self._append("failed", {"error": error, "trace": trace})
+
+    def wait_events(self, after_seq: int, timeout: float) -> list:
+        """Events with seq > after_seq, blocking up to timeout for new ones."""
+        with self._cond:
+            if len(self.events) <= after_seq and not self.finished:
+                self._cond.wait(timeout)
+            return self.events[after_seq:]
+
+    def snapshot(self) -> dict:
+        progress = next((e["data"] for e in reversed(self.events) if e["event"] == "progress"), None)
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "progress": progress,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Runs ``fn(job, *args)`` on a thread pool; the return value becomes the job result."""
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, retain: int = MAX_RETAINED_JOBS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="depblast-job")
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.retain = retain
+
+    def submit(self, fn, *args) -> Job:
+        job = Job()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - self.retain)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _run(job: Job, fn, args) -> None:
+        job.start()
+        try:
+            job.finish(fn(job, *args))
+        except Exception as err:
+            job.fail(str(err), traceback.format_exc())
@@ -0,0 +1,115 @@
+"""Content-addressed cache of finished analyses.
+
+Entries are keyed by the SHA-256 of the uploaded lockfile bytes combined with
+every parameter that changes the computed dependency map, so re-scanning an
+unchanged lockfile skips the whole pipeline. Results live in an in-memory LRU
+and as JSON files under data/results/, each tier bounded by size; the least
+recently used entries are evicted first.
+
+Both tiers hold the serialized JSON, so every hit decodes objects of its own:
+callers are free to mutate what get() returns (the analysis store keeps it,
+incremental re-analysis updates it) without corrupting the cache.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+RESULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "results"
+MEMORY_LIMIT = 128 * 1024 * 1024   # bytes of serialized results kept in memory
+DISK_LIMIT = 1024 * 1024 * 1024    # bytes of result files kept on disk
+
+_HASH_CHUNK = 64 * 1024
+
+
+def digest_stream(stream) -> str:
+    """SHA-256 of a seekable binary stream; the stream is rewound afterwards."""
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(_HASH_CHUNK), b""):
+        sha.update(chunk)
+    stream.seek(0)
+    return sha.hexdigest()
+
+
+def result_key(lockfile_digest: str, params: dict) -> str:
+    """Cache key for one lockfile analyzed under one set of parameters."""
+    material = lockfile_digest + json.dumps(params, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """key → (dependency map, health summary), in memory and on disk."""
+
+    def __init__(self, root: Path = RESULT_CACHE_DIR, memory_limit: int = MEMORY_LIMIT,
+                 disk_limit: int = DISK_LIMIT):
+        self.root = Path(root)
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._entries: OrderedDict = OrderedDict()  # key → serialized {"deps", "health"}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str):
+        """Return (deps, health) or None; freshly decoded, so the caller owns them."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+
+        if data is None:
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                stored = json.loads(data)
+                os.utime(path)  # mtime doubles as last-access time for disk eviction
+            except (OSError, ValueError):
+                return None
+            self._remember(key, data)
+        else:
+            stored = json.loads(data)
+        return stored["deps"], stored["health"]
+
+    def put(self, key: str, deps: dict, health: dict) -> None:
+        data = json.dumps({"deps": deps, "health": health}, separators=(",", ":")).encode("utf-8")
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomic, so concurrent workers never read half a file
+
+        self._remember(key, data)
+        self._evict_disk()
+
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.memory_limit and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _evict_disk(self) -> None:
+        files = []
+        for path in self.root.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size